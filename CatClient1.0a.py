@@ -1,11 +1,30 @@
 import os, sys, json, shutil, zipfile, threading
+import argparse
+import asyncio
+import collections
+import contextlib
+import contextvars
+import concurrent.futures
+import hashlib
+import io
+import heapq
+import logging
+import logging.handlers
+import statistics
+import struct
+import time
+import traceback
+import urllib.parse
 import urllib.request
 import urllib.error
 import ssl  # Added for SSL context handling
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import re
+import shlex
+import sqlite3
 import subprocess
+import tarfile
 import uuid as uuidlib
 import platform
 
@@ -21,22 +40,6 @@ def get_ssl_context(verify=False):
         ctx = ssl._create_unverified_context()
     return ctx
 
-# --- Directory Setup ---
-mc_dir = os.path.expanduser("~/Library/Application Support/minecraft")
-if not os.path.isdir(mc_dir):
-    os.makedirs(mc_dir, exist_ok=True)
-
-VERSIONS_DIR = os.path.join(mc_dir, "versions")
-ASSETS_DIR = os.path.join(mc_dir, "assets")
-MODPACKS_DIR = os.path.join(mc_dir, "modpacks")
-LIBRARIES_DIR = os.path.join(mc_dir, "libraries")
-
-os.makedirs(VERSIONS_DIR, exist_ok=True)
-os.makedirs(MODPACKS_DIR, exist_ok=True)
-os.makedirs(os.path.join(ASSETS_DIR, "indexes"), exist_ok=True)
-os.makedirs(os.path.join(ASSETS_DIR, "objects"), exist_ok=True)
-os.makedirs(LIBRARIES_DIR, exist_ok=True)
-
 # URLs
 VERSION_MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
 ASSET_BASE_URL = "http://resources.download.minecraft.net/"
@@ -45,33 +48,227 @@ FORGE_MAVEN_URL = "https://maven.minecraftforge.net/"
 TLMODS_BASE_URL = "https://tlmods.org"
 LUNAR_CLIENT_RESOURCES = "https://api.lunarclientprod.com"  # Added for Lunar Client
 
-# --- Account Management ---
-accounts = []
-accounts_file = os.path.join(mc_dir, "launcher_accounts.json")
-if os.path.isfile(accounts_file):
-    try:
-        with open(accounts_file, 'r') as f:
-            accounts = json.load(f)
-    except json.JSONDecodeError:
-        print(f"Warning: Could not parse {accounts_file}. Starting with empty accounts.")
-        accounts = []
-    except Exception as e:
-        print(f"Warning: Error loading accounts: {e}")
-        accounts = []
+# --- Launcher Roots ---
+MINECRAFT_DIR_ENV = "CATCLIENT_MINECRAFT_DIR"
+
+def default_minecraft_dir():
+    """Standard .minecraft location for this platform; CATCLIENT_MINECRAFT_DIR overrides it"""
+    if os.environ.get(MINECRAFT_DIR_ENV):
+        return os.path.expanduser(os.environ[MINECRAFT_DIR_ENV])
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/minecraft")
+    if sys.platform.startswith("win"):
+        return os.path.join(os.environ.get("APPDATA") or os.path.expanduser("~"), ".minecraft")
+    return os.path.expanduser("~/.minecraft")
+
+class Launcher:
+    """One launcher root directory with its accounts, version manifest and catalog.
+
+    Nothing touches the disk until first use. Module functions act on the launcher
+    made current by active() in the calling thread, or on default_launcher(), so
+    several roots can be driven from one process:
+
+        with Launcher("/tmp/mc").active():
+            install_version("1.20.4")
+
+    The methods below wrap the common operations in that block.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(os.path.expanduser(root or default_minecraft_dir()))
+        self.versions_dir = os.path.join(self.root, "versions")
+        self.assets_dir = os.path.join(self.root, "assets")
+        self.modpacks_dir = os.path.join(self.root, "modpacks")
+        self.libraries_dir = os.path.join(self.root, "libraries")
+        self.instances_dir = os.path.join(self.root, "instances")
+        self.logs_dir = os.path.join(self.root, "launcher_logs")
+        self.launch_metrics_file = os.path.join(self.root, "launch_metrics.jsonl")
+        self.installers_cache_dir = os.path.join(self.root, "cache", "installers")
+        self.processor_cache_dir = os.path.join(self.root, "cache", "processors")
+        self.accounts_file = os.path.join(self.root, "launcher_accounts.json")
+        self.servers_file = os.path.join(self.root, "launcher_servers.json")
+        self.catalog_path = os.path.join(self.root, "launcher_catalog.sqlite")
+        self.version_manifest_path = os.path.join(self.root, "version_manifest_v2.json")
+        self.all_versions = {}  # version id -> version JSON URL, filled by load_version_manifest
+        self._accounts = None
+        self._catalog = None
+        self._prepared = False
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return f"Launcher({self.root!r})"
+
+    def prepare(self):
+        """Create the directory layout on first use"""
+        if self._prepared:
+            return
+        with self._lock:
+            if not self._prepared:
+                for path in (self.versions_dir, self.modpacks_dir, self.libraries_dir,
+                             os.path.join(self.assets_dir, "indexes"), os.path.join(self.assets_dir, "objects")):
+                    os.makedirs(path, exist_ok=True)
+                self._prepared = True
+
+    @contextlib.contextmanager
+    def active(self):
+        """Make this the launcher module functions use in the current thread or task"""
+        self.prepare()
+        token = _current_launcher.set(self)
+        try:
+            yield self
+        finally:
+            _current_launcher.reset(token)
+
+    @property
+    def accounts(self):
+        if self._accounts is None:
+            with self._lock:
+                if self._accounts is None:
+                    self._accounts = self._load_accounts()
+        return self._accounts
+
+    def _load_accounts(self):
+        if not os.path.isfile(self.accounts_file):
+            return []
+        try:
+            with open(self.accounts_file, 'r') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            print(f"Warning: Could not parse {self.accounts_file}. Starting with empty accounts.")
+        except Exception as e:
+            print(f"Warning: Error loading accounts: {e}")
+        return []
+
+    def save_accounts(self):
+        try:
+            with open(self.accounts_file, 'w') as f:
+                json.dump(self.accounts, f, indent=4)
+        except Exception as e:
+            print(f"Error saving accounts: {e}")
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    self._catalog = LauncherCatalog(self.catalog_path, self.root)
+        return self._catalog
+
+    # Programmatic API: the module functions of the same name, run against this root
+    def load_version_manifest(self, ssl_verify=False):
+        with self.active():
+            return load_version_manifest(ssl_verify)
+
+    def install_version(self, version_id, status_callback=None, ssl_verify=False, **kwargs):
+        with self.active():
+            if not self.all_versions:
+                load_version_manifest(ssl_verify)
+            return install_version(version_id, status_callback, ssl_verify, **kwargs)
+
+    def install_loader(self, mc_version, loader, loader_version=None, **kwargs):
+        with self.active():
+            if not self.all_versions:
+                load_version_manifest(kwargs.get("ssl_verify", False))
+            return install_loader(mc_version, loader, loader_version, **kwargs)
+
+    def install_modpack(self, source, **kwargs):
+        with self.active():
+            if not self.all_versions:
+                load_version_manifest(kwargs.get("ssl_verify", False))
+            return install_modpack(source, **kwargs)
+
+    def plan_install(self, version_id, ssl_verify=False, save_metadata=False):
+        with self.active():
+            if not self.all_versions:
+                load_version_manifest(ssl_verify)
+            return plan_install(version_id, ssl_verify, save_metadata)
 
+    def launch_game(self, version_id, account="Player", **kwargs):
+        """Start a version; account is an account dict or a username for offline play"""
+        if isinstance(account, str):
+            account = make_offline_account(account)
+        with self.active():
+            if kwargs.get("install", True) and not self.all_versions:
+                load_version_manifest(kwargs.get("ssl_verify", False))
+            return launch_game(version_id, account, **kwargs)
+
+    def add_account(self, acc_type, email_username, password_token=None):
+        with self.active():
+            return add_account(acc_type, email_username, password_token)
+
+    def installed_versions(self):
+        with self.active():
+            return scan_installed_versions()
+
+    def export_bundle(self, version_id, output, status_callback=None):
+        with self.active():
+            return export_version_bundle(version_id, output, status_callback)
+
+    def import_bundle(self, source, finalize=True, status_callback=None):
+        with self.active():
+            return import_version_bundle(source, finalize, status_callback)
+
+_current_launcher = contextvars.ContextVar("catclient_launcher")
+_default_launcher = None
+_default_launcher_lock = threading.Lock()
+
+def default_launcher():
+    """Launcher for default_minecraft_dir(), created on first use"""
+    global _default_launcher
+    if _default_launcher is None:
+        with _default_launcher_lock:
+            if _default_launcher is None:
+                _default_launcher = Launcher()
+    return _default_launcher
+
+def current_launcher():
+    """Launcher of the innermost active() block in this context, else the default one"""
+    launcher = _current_launcher.get(None) or default_launcher()
+    launcher.prepare()
+    return launcher
+
+def bind_launcher(fn):
+    """Wrap fn to run against the caller's launcher when it is called from another thread"""
+    launcher = current_launcher()
+
+    def run(*args, **kwargs):
+        with launcher.active():
+            return fn(*args, **kwargs)
+    return run
+
+# Module attributes from before launchers had their own roots
+_LAUNCHER_ATTRIBUTES = {
+    "mc_dir": "root", "VERSIONS_DIR": "versions_dir", "ASSETS_DIR": "assets_dir", "MODPACKS_DIR": "modpacks_dir",
+    "LIBRARIES_DIR": "libraries_dir", "INSTANCES_DIR": "instances_dir", "LAUNCHER_LOGS_DIR": "logs_dir",
+    "LAUNCH_METRICS_FILE": "launch_metrics_file", "INSTALLERS_CACHE_DIR": "installers_cache_dir",
+    "PROCESSOR_CACHE_DIR": "processor_cache_dir", "accounts_file": "accounts_file", "SERVERS_FILE": "servers_file",
+    "CATALOG_PATH": "catalog_path", "version_manifest_path": "version_manifest_path", "all_versions": "all_versions",
+    "accounts": "accounts", "catalog": "catalog",
+}
+
+def __getattr__(name):
+    if name in _LAUNCHER_ATTRIBUTES:
+        return getattr(current_launcher(), _LAUNCHER_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- Account Management ---
 def save_accounts():
-    try:
-        with open(accounts_file, 'w') as f:
-            json.dump(accounts, f, indent=4)
-    except Exception as e:
-        print(f"Error saving accounts: {e}")
+    current_launcher().save_accounts()
+
+def offline_uuid_for(username):
+    """Stable offline-mode UUID for a username"""
+    return str(uuidlib.uuid3(uuidlib.NAMESPACE_DNS, username))
+
+def make_offline_account(username):
+    """Offline account dict that is not persisted to the accounts file"""
+    return {"type": "offline", "username": username, "uuid": offline_uuid_for(username), "token": "0"}
 
 def add_account(acc_type, email_username, password_token=None):
     """Adds/updates an account."""
     if not email_username: return
 
     # Generate UUID for offline mode consistently
-    offline_uuid = str(uuidlib.uuid3(uuidlib.NAMESPACE_DNS, email_username))
+    offline_uuid = offline_uuid_for(email_username)
 
     if acc_type == "tlauncher":
         acc = {"type": "tlauncher", "username": email_username, "password": password_token or "", "uuid": offline_uuid, "token": "null"}
@@ -86,6 +283,7 @@ def add_account(acc_type, email_username, password_token=None):
         return
 
     # Check if account exists (by type and username) and update, otherwise add
+    accounts = current_launcher().accounts
     found = False
     for i, existing_acc in enumerate(accounts):
         if existing_acc.get("type") == acc_type and existing_acc.get("username") == email_username:
@@ -98,20 +296,403 @@ def add_account(acc_type, email_username, password_token=None):
     save_accounts()
     print(f"Account '{email_username}' ({acc_type}) added/updated.")
 
+# --- Bandwidth Control ---
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_CONNECTIONS_PER_HOST = 8
+THROUGHPUT_WINDOW_SECONDS = 5.0
+
+class TokenBucket:
+    """Token bucket limiting a byte rate; rate None means unlimited."""
+
+    def __init__(self, rate=None):
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = rate
+            self.capacity = max(DOWNLOAD_CHUNK_SIZE, rate or 0)  # Up to one second of burst
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+
+    def consume(self, amount):
+        """Block until amount bytes may be transferred"""
+        while True:
+            with self._lock:
+                if not self.rate:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # Large requests go through in capacity-sized pieces
+                take = min(amount, self.capacity)
+                if self.tokens >= take:
+                    self.tokens -= take
+                    amount -= take
+                    if amount <= 0:
+                        return
+                    continue
+                delay = (take - self.tokens) / self.rate
+            time.sleep(delay)
+
+class ThroughputMeter:
+    """Bytes per second over a sliding window."""
+
+    def __init__(self, window=THROUGHPUT_WINDOW_SECONDS):
+        self.window = window
+        self.total = 0
+        self.started = time.monotonic()
+        self._samples = collections.deque()
+        self._lock = threading.Lock()
+
+    def record(self, amount):
+        now = time.monotonic()
+        with self._lock:
+            self.total += amount
+            self._samples.append((now, amount))
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def rate(self):
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            # A meter younger than its window averages over its age, so early ETAs aren't inflated
+            return sum(amount for _, amount in self._samples) / max(min(self.window, now - self.started), 1.0)
+
+class BandwidthShare:
+    """Slice of the global limit owned by one install, sized by its weight."""
+
+    def __init__(self, name, weight):
+        self.name = name
+        self.weight = weight
+        self.bucket = TokenBucket()
+        self.meter = ThroughputMeter()
+        self.active_transfers = 0
+        self.closed = False
+
+class BandwidthManager:
+    """Global bandwidth cap, per-host connection budget and weighted sharing between installs.
+
+    All downloads draw from one token bucket; each concurrent install additionally
+    draws from its own bucket whose rate is limit * weight / sum(weights), so a big
+    install can't starve a small one started after it. Only installs with a transfer
+    in flight count towards sum(weights), so one waiting on hashing, extraction or
+    the scheduler queue doesn't hold back bandwidth the others could use.
+    """
+
+    def __init__(self):
+        self.limit = None
+        self.max_per_host = MAX_CONNECTIONS_PER_HOST
+        self.bucket = TokenBucket()
+        self.meter = ThroughputMeter()
+        self.active_connections = 0
+        self._shares = []
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def set_limit(self, bytes_per_second):
+        """Cap total download throughput; None or 0 removes the cap"""
+        with self._lock:
+            self.limit = bytes_per_second or None
+            self.bucket.set_rate(self.limit)
+            self._rebalance()
+
+    def set_max_per_host(self, connections):
+        with self._lock:
+            self.max_per_host = max(1, int(connections))
+            self._host_slots = {}  # New semaphores for connections opened from now on
+
+    def _rebalance(self):
+        active_weight = sum(share.weight for share in self._shares if share.active_transfers)
+        for share in self._shares:
+            # An idle share is sized as if it were the next to become active
+            total_weight = active_weight if share.active_transfers else active_weight + share.weight
+            share.bucket.set_rate(self.limit * share.weight / total_weight if self.limit else None)
+
+    def _transfer_started(self, share):
+        with self._lock:
+            share.active_transfers += 1
+            if share.active_transfers == 1 and not share.closed:
+                self._rebalance()
+
+    def _transfer_finished(self, share):
+        with self._lock:
+            share.active_transfers -= 1
+            if share.active_transfers == 0 and not share.closed:
+                self._rebalance()
+
+    def current_share(self):
+        return getattr(self._local, "share", None)
+
+    def set_current_share(self, share):
+        self._local.share = share
+
+    @contextlib.contextmanager
+    def share(self, name, weight=1.0):
+        """Run an install inside its own fair share (nested installs reuse the outer one)"""
+        if self.current_share() is not None:
+            yield self.current_share()
+            return
+        share = BandwidthShare(name, weight)
+        with self._lock:
+            self._shares.append(share)
+            self._rebalance()
+        self.set_current_share(share)
+        try:
+            yield share
+        finally:
+            self.set_current_share(None)
+            with self._lock:
+                share.closed = True
+                self._shares.remove(share)
+                self._rebalance()
+
+    @contextlib.contextmanager
+    def host_slot(self, url, blocking=True):
+        """Hold one of the per-host connection slots for the duration of a transfer.
+
+        Yields True once a slot is held; with blocking=False, yields False right away
+        when all of the host's slots are taken.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        share = self.current_share()
+        with self._lock:
+            slot = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+        if not slot.acquire(blocking):
+            yield False
+            return
+        try:
+            with self._lock:
+                self.active_connections += 1
+            if share is not None:
+                self._transfer_started(share)
+            try:
+                yield True
+            finally:
+                if share is not None:
+                    self._transfer_finished(share)
+                with self._lock:
+                    self.active_connections -= 1
+        finally:
+            slot.release()
+
+    def throttle(self, amount):
+        """Account for amount bytes received, sleeping as needed to honor the limits"""
+        share = self.current_share()
+        if share is not None and not share.closed:
+            share.bucket.consume(amount)
+            share.meter.record(amount)
+        self.bucket.consume(amount)
+        self.meter.record(amount)
+
+    def stats(self):
+        """Limits and live throughput, for the UI and headless progress output"""
+        with self._lock:
+            shares = [{"name": s.name, "weight": s.weight, "rate_limit": s.bucket.rate, "rate": s.meter.rate(),
+                       "active": s.active_transfers > 0} for s in self._shares]
+            return {"limit": self.limit, "max_per_host": self.max_per_host, "rate": self.meter.rate(),
+                    "total_bytes": self.meter.total, "active_connections": self.active_connections, "shares": shares}
+
+bandwidth = BandwidthManager()
+
+def format_rate(bytes_per_second):
+    if bytes_per_second is None:
+        return "unlimited"
+    if bytes_per_second >= 1024 * 1024:
+        return f"{bytes_per_second / (1024 * 1024):.1f} MB/s"
+    return f"{bytes_per_second / 1024:.0f} KB/s"
+
+def format_size(num_bytes):
+    if num_bytes >= 1024 ** 3:
+        return f"{num_bytes / 1024 ** 3:.2f} GB"
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    if num_bytes >= 1024:
+        return f"{num_bytes / 1024:.0f} KB"
+    return f"{num_bytes} B"
+
+def format_eta(seconds):
+    if seconds is None:
+        return "unknown"
+    seconds = int(seconds + 0.5)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+def _copy_response(response, out_file, limit=None):
+    """Stream a response (at most limit bytes of it) to a file in chunks, under the bandwidth limits.
+
+    Returns the number of bytes written.
+    """
+    copied = 0
+    while limit is None or copied < limit:
+        chunk = response.read(DOWNLOAD_CHUNK_SIZE if limit is None else min(DOWNLOAD_CHUNK_SIZE, limit - copied))
+        if not chunk:
+            break
+        bandwidth.throttle(len(chunk))
+        out_file.write(chunk)
+        copied += len(chunk)
+    return copied
+
+# --- File Locking ---
+LOCK_POLL_INTERVAL = 0.1
+LOCK_TIMEOUT = 600  # Seconds to wait for another process's download of the same file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """Exclusive cross-process lock on path + ".lock", usable as a context manager.
+
+    The OS drops the lock when its holder exits, so a launcher that crashed
+    mid-download never leaves a path locked: the orphaned lock file is simply
+    taken over by the next process. Holders unlink the file on release; a
+    waiter that locked an already-unlinked file notices and retries.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.lock_path = path + ".lock"
+        self.timeout = timeout
+        self.contended = False  # True when another process held the lock first
+        self._fd = None
+
+    @staticmethod
+    def _try_lock(fd):
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except (BlockingIOError, PermissionError):
+            return False
+
+    @staticmethod
+    def _unlock(fd):
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                locked = self._try_lock(fd)
+            except OSError as e:
+                # Filesystems without lock support (some network mounts): proceed unlocked
+                print(f"Warning: Cannot lock {self.lock_path} ({e}); continuing without a lock")
+                os.close(fd)
+                return self
+            if locked:
+                try:
+                    current = os.fstat(fd).st_ino == os.stat(self.lock_path).st_ino
+                except FileNotFoundError:
+                    current = False
+                if current:
+                    self._fd = fd
+                    os.ftruncate(fd, 0)
+                    os.write(fd, f"{os.getpid()}\n".encode())
+                    return self
+                self._unlock(fd)
+            os.close(fd)
+            self.contended = True
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {self.lock_path} held by another launcher process")
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            os.remove(self.lock_path)
+        except OSError:
+            pass  # Windows keeps files open by a waiter; the next holder reuses it
+        self._unlock(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
 # --- Download Helper ---
-def download_file(url, dest_path, description="file", ssl_verify=False):
-    """Download file from url to dest_path with User-Agent and better error handling."""
+SEGMENT_THRESHOLD = 16 * 1024 * 1024  # Files at least this big are fetched as parallel byte ranges
+SEGMENT_MIN_SIZE = 4 * 1024 * 1024
+MAX_SEGMENTS = 4
+
+_inflight_lock = threading.Lock()
+_inflight_downloads = {}  # absolute dest path -> Future of the fetch in progress
+
+def download_file(url, dest_path, description="file", ssl_verify=False, sha1=None):
+    """Download file from url to dest_path with User-Agent and better error handling.
+
+    Concurrent calls for the same destination in this process wait for one fetch;
+    other processes are kept out by a FileLock. Data goes to a .part file that
+    replaces dest_path only once complete (and matching sha1, when given).
+    """
+    dest_path = os.path.abspath(dest_path)
+    with _inflight_lock:
+        pending = _inflight_downloads.get(dest_path)
+        owner = pending is None
+        if owner:
+            pending = _inflight_downloads[dest_path] = concurrent.futures.Future()
+    if not owner:
+        print(f"Waiting for in-flight download of {os.path.basename(dest_path)}")
+        return pending.result()
+
+    try:
+        _download_file_locked(url, dest_path, description, ssl_verify, sha1)
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    else:
+        pending.set_result(None)
+    finally:
+        with _inflight_lock:
+            _inflight_downloads.pop(dest_path, None)
+
+def _download_file_locked(url, dest_path, description, ssl_verify, sha1):
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    with FileLock(dest_path) as lock:
+        if lock.contended and os.path.isfile(dest_path) and (not sha1 or file_hash(dest_path) == sha1.lower()):
+            print(f"{os.path.basename(dest_path)} was downloaded by another launcher process")
+            return
+        # Only the lock holder writes here, so a .part left by a crashed process is just overwritten
+        part_path = dest_path + ".part"
+        try:
+            _fetch_to(url, part_path, description, ssl_verify)
+            if sha1 and file_hash(part_path) != sha1.lower():
+                raise Exception(f"Downloaded {description} from {url} does not match its SHA1 {sha1}")
+            os.replace(part_path, dest_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+def _fetch_to(url, dest_path, description, ssl_verify):
+    name = os.path.basename(dest_path).removesuffix(".part")
     req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
     
     # Use SSL context based on verification setting
     ssl_context = get_ssl_context(ssl_verify)
     
     try:
-        print(f"Downloading {description}: {os.path.basename(dest_path)} from {url}")
-        with urllib.request.urlopen(req, context=ssl_context) as response, open(dest_path, 'wb') as out_file:
-            shutil.copyfileobj(response, out_file)
-        print(f"Finished downloading {os.path.basename(dest_path)}")
+        print(f"Downloading {description}: {name} from {url}")
+        _transfer(req, dest_path, ssl_context)
+        print(f"Finished downloading {name}")
     except urllib.error.HTTPError as e:
         raise Exception(f"Failed to download {description} from {url}. HTTP Error: {e.code} {e.reason}") from e
     except urllib.error.URLError as e:
@@ -121,9 +702,8 @@ def download_file(url, dest_path, description="file", ssl_verify=False):
             # Retry without SSL verification
             ssl_context_unverified = get_ssl_context(False)
             try:
-                with urllib.request.urlopen(req, context=ssl_context_unverified) as response, open(dest_path, 'wb') as out_file:
-                    shutil.copyfileobj(response, out_file)
-                print(f"Finished downloading {os.path.basename(dest_path)} without SSL verification")
+                _transfer(req, dest_path, ssl_context_unverified)
+                print(f"Finished downloading {name} without SSL verification")
             except Exception as e2:
                 raise Exception(f"Failed to download {description} from {url} even without SSL verification. Error: {e2}") from e2
         else:
@@ -131,32 +711,118 @@ def download_file(url, dest_path, description="file", ssl_verify=False):
     except Exception as e:
         raise Exception(f"Failed to download {description} from {url}. Error: {e}") from e
 
-# --- Version Manifest Loading ---
-version_manifest_path = os.path.join(mc_dir, "version_manifest_v2.json")
-all_versions = {}
+def _transfer(req, dest_path, ssl_context):
+    """Fetch req into dest_path; big files from servers that accept byte ranges arrive in parallel segments"""
+    with bandwidth.host_slot(req.full_url), urllib.request.urlopen(req, context=ssl_context) as response:
+        length = int(response.headers.get("Content-Length") or 0)
+        if length < SEGMENT_THRESHOLD or response.headers.get("Accept-Ranges", "").lower() != "bytes":
+            with open(dest_path, 'wb') as out_file:
+                _copy_response(response, out_file)
+            return
+        if _segmented_transfer(req, response, length, dest_path, ssl_context):
+            return
+    print(f"{req.full_url} advertises byte ranges but ignored them; downloading as a single stream")
+    with bandwidth.host_slot(req.full_url), urllib.request.urlopen(req, context=ssl_context) as response, \
+            open(dest_path, 'wb') as out_file:
+        _copy_response(response, out_file)
+
+def _preallocate(path, length):
+    with open(path, 'wb') as f:
+        try:
+            os.posix_fallocate(f.fileno(), 0, length)
+        except (AttributeError, OSError):  # Windows/macOS, or a filesystem without fallocate
+            f.truncate(length)
+
+def _segmented_transfer(req, response, length, dest_path, ssl_context):
+    """Split a download into byte ranges fetched over several connections into a preallocated file.
 
+    The already open response serves the first range. Helper connections only start
+    when the host has free connection slots, so a busy host gets fewer of them;
+    ranges nobody picked up are fetched by the caller after its own.
+    Returns False when the server answered a range request with something else.
+    """
+    url = response.geturl()  # After redirects, so every range hits the same mirror
+    segment_size = -(-length // min(MAX_SEGMENTS, -(-length // SEGMENT_MIN_SIZE)))
+    ranges = collections.deque((start, min(start + segment_size, length) - 1)
+                               for start in range(segment_size, length, segment_size))
+    _preallocate(dest_path, length)
+    errors = []
+    honored = [True]
+    lock = threading.Lock()
+    share = bandwidth.current_share()
+
+    def fetch_ranges():
+        while True:
+            with lock:
+                if not ranges or errors or not honored[0]:
+                    return
+                start, end = ranges.popleft()
+            try:
+                if not _fetch_range(req, url, start, end, dest_path, ssl_context):
+                    honored[0] = False
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+
+    def helper():
+        bandwidth.set_current_share(share)
+        with bandwidth.host_slot(url, blocking=False) as acquired:
+            if acquired:
+                fetch_ranges()
+
+    helpers = [threading.Thread(target=helper, daemon=True) for _ in range(len(ranges))]
+    for thread in helpers:
+        thread.start()
+    try:
+        with open(dest_path, 'r+b') as out_file:
+            if _copy_response(response, out_file, segment_size) != segment_size:
+                raise Exception(f"Connection closed after part of the first segment of {url}")
+        fetch_ranges()
+    except Exception as e:
+        with lock:
+            errors.append(e)
+    for thread in helpers:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return honored[0]
+
+def _fetch_range(req, url, start, end, dest_path, ssl_context):
+    """Write bytes start..end of url at their offset in dest_path; False if the server sent something else"""
+    headers = dict(req.header_items())
+    headers["Range"] = f"bytes={start}-{end}"
+    range_req = urllib.request.Request(url, headers=headers)
+    with urllib.request.urlopen(range_req, context=ssl_context) as response, open(dest_path, 'r+b') as out_file:
+        if response.status != 206 or not response.headers.get("Content-Range", "").startswith(f"bytes {start}-{end}/"):
+            return False
+        out_file.seek(start)
+        if _copy_response(response, out_file, end - start + 1) != end - start + 1:
+            raise Exception(f"Connection closed during byte range {start}-{end} of {url}")
+        return True
+
+# --- Version Manifest Loading ---
 def load_version_manifest(ssl_verify=False):
     """Load version manifest with fallback handling"""
-    global all_versions
-    global version_manifest_path
+    launcher = current_launcher()
     
     try:
-        if not os.path.isfile(version_manifest_path):
+        if not os.path.isfile(launcher.version_manifest_path):
             print("Downloading version manifest v2...")
             try:
                 download_file("https://launchermeta.mojang.com/mc/game/version_manifest_v2.json", 
-                              version_manifest_path, "version manifest v2", ssl_verify)
+                              launcher.version_manifest_path, "version manifest v2", ssl_verify)
             except Exception as e:
                 print(f"Failed to download v2 manifest: {e}, falling back to v1.")
-                version_manifest_path = os.path.join(mc_dir, "version_manifest.json")
-                download_file(VERSION_MANIFEST_URL, version_manifest_path, 
+                launcher.version_manifest_path = os.path.join(launcher.root, "version_manifest.json")
+                download_file(VERSION_MANIFEST_URL, launcher.version_manifest_path, 
                               "version manifest v1", ssl_verify)
         
-        with open(version_manifest_path, 'r') as f:
+        with open(launcher.version_manifest_path, 'r') as f:
             version_manifest = json.load(f)
             
         # Build list of all versions (id and URL)
-        all_versions = {v['id']: v['url'] for v in version_manifest['versions']}
+        launcher.all_versions = {v['id']: v['url'] for v in version_manifest['versions']}
+        _catalog_call(launcher.catalog.record_manifest, version_manifest['versions'])
         
         return version_manifest
     except Exception as e:
@@ -185,21 +851,720 @@ def run_with_rosetta(cmd):
         return ['arch', '-x86_64'] + cmd
     return cmd  # Already running under Rosetta or not on ARM64
 
+# --- JVM Tuning Profiles ---
+JVM_TUNING_PROFILES = {
+    "balanced": {
+        "description": "G1 with moderate pause target, heap grows on demand",
+        "gc": "g1", "xms_ratio": 0.5, "pause_ms": 200, "reserve_cores": 1,
+        "pretouch": False, "large_pages": False,
+    },
+    "low-latency": {
+        "description": "ZGC/Shenandoah on modern JDKs, G1 with short pauses otherwise",
+        "gc": "zgc", "xms_ratio": 1.0, "pause_ms": 50, "reserve_cores": 2,
+        "pretouch": False, "large_pages": True,
+    },
+    "throughput": {
+        "description": "Parallel GC, fixed pre-touched heap",
+        "gc": "parallel", "xms_ratio": 1.0, "pause_ms": None, "reserve_cores": 0,
+        "pretouch": True, "large_pages": True,
+    },
+    "low-memory": {
+        "description": "Small initial heap, eager uncommit, few GC threads",
+        "gc": "g1", "xms_mb": 256, "pause_ms": 200, "reserve_cores": 1,
+        "pretouch": False, "large_pages": False, "max_gc_threads": 2,
+    },
+}
+DEFAULT_JVM_PROFILE = "balanced"
+GC_FLAGS = {
+    "g1": ["-XX:+UseG1GC"],
+    "zgc": ["-XX:+UseZGC"],
+    "shenandoah": ["-XX:+UseShenandoahGC"],
+    "parallel": ["-XX:+UseParallelGC"],
+    "serial": ["-XX:+UseSerialGC"],
+}
+
+_java_version_cache = {}
+_java_flag_support_cache = {}
+
+def detect_java_version(java_path="java"):
+    """Return the major version of the given Java executable (8, 17, 21...) or None"""
+    if java_path in _java_version_cache:
+        return _java_version_cache[java_path]
+    major = None
+    try:
+        result = subprocess.run([java_path, '-version'], capture_output=True, text=True, check=False, timeout=15)
+        match = re.search(r'version "(\d+)(?:\.(\d+))?', result.stderr + result.stdout)
+        if match:
+            major = int(match.group(1))
+            if major == 1 and match.group(2):  # "1.8.0_381" style
+                major = int(match.group(2))
+    except Exception as e:
+        print(f"Warning: Could not detect Java version for '{java_path}': {e}")
+    _java_version_cache[java_path] = major
+    return major
+
+def java_supports_flag(java_path, *flags):
+    """Check whether the JVM starts with the given flags (e.g. Shenandoah is missing from Oracle builds)"""
+    key = (java_path,) + flags
+    if key not in _java_flag_support_cache:
+        try:
+            result = subprocess.run([java_path] + list(flags) + ['-version'], capture_output=True, check=False, timeout=15)
+            _java_flag_support_cache[key] = result.returncode == 0
+        except Exception:
+            _java_flag_support_cache[key] = False
+    return _java_flag_support_cache[key]
+
+def get_host_memory_mb():
+    """Total physical memory in MB, or None if it can't be determined"""
+    try:
+        if sys.platform == "darwin":
+            result = subprocess.run(['sysctl', '-n', 'hw.memsize'], capture_output=True, text=True, check=False)
+            return int(result.stdout.strip()) // (1024 * 1024)
+        if os.path.isfile("/proc/meminfo"):
+            with open("/proc/meminfo", 'r') as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) // 1024
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except Exception:
+        return None
+
+def count_installed_mods(game_dir):
+    """Number of mod JARs in <game_dir>/mods, used to size the heap for modpacks"""
+    mods_dir = os.path.join(game_dir, "mods") if game_dir else None
+    if not mods_dir or not os.path.isdir(mods_dir):
+        return 0
+    return sum(1 for name in os.listdir(mods_dir) if name.endswith(".jar"))
+
+def _linux_large_pages_flag(heap_mb):
+    """Pick explicit or transparent huge pages depending on what the kernel has configured"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            meminfo = {line.split(':')[0]: line.split()[1] for line in f}
+        huge_total_mb = int(meminfo.get("HugePages_Total", 0)) * int(meminfo.get("Hugepagesize", 0)) // 1024
+        if huge_total_mb >= heap_mb:
+            return "-XX:+UseLargePages"
+        with open("/sys/kernel/mm/transparent_hugepage/enabled", 'r') as f:
+            thp_mode = f.read()
+        if "[always]" in thp_mode or "[madvise]" in thp_mode:
+            return "-XX:+UseTransparentHugePages"
+    except Exception:
+        pass
+    return None
+
+def _gc_thread_counts(cpu_count, profile):
+    """HotSpot's own ParallelGCThreads formula, minus cores kept free for the render thread"""
+    usable = max(1, cpu_count - profile.get("reserve_cores", 0))
+    parallel = usable if usable <= 8 else 8 + (usable - 8) * 5 // 8
+    if profile.get("max_gc_threads"):
+        parallel = min(parallel, profile["max_gc_threads"])
+    concurrent = max(1, (parallel + 3) // 4)
+    return parallel, concurrent
+
+def _jvm_flag_key(flag):
+    """Identity of a JVM flag so an override can replace the generated value"""
+    for prefix in ("-Xmx", "-Xms", "-Xss", "-Xmn"):
+        if flag.startswith(prefix):
+            return prefix
+    if flag.startswith("-XX:"):
+        name = flag[4:].lstrip("+-").split("=", 1)[0]
+        if name.startswith("Use") and name.endswith("GC"):
+            return "gc"
+        return "XX:" + name
+    if flag.startswith("-D"):
+        return "D:" + flag[2:].split("=", 1)[0]
+    return flag
+
+def apply_jvm_overrides(flags, overrides):
+    """Replace generated flags with user-supplied ones of the same kind, appending the rest"""
+    if not overrides:
+        return list(flags)
+    override_keys = {_jvm_flag_key(o) for o in overrides}
+    result = [f for f in flags if _jvm_flag_key(f) not in override_keys]
+    return result + list(overrides)
+
+def resolve_jvm_tuning(profile_name=None, ram_mb=None, java_path="java", game_dir=None, gc=None, overrides=None):
+    """Derive heap, GC and large-page flags for a tuning profile from the JDK and host.
+
+    ram_mb is the requested max heap (None lets the profile size it from the mod count),
+    gc forces a collector ("g1", "zgc", "shenandoah", "parallel", "serial") and
+    overrides is a list of raw JVM flags that win over anything generated here.
+    """
+    profile_name = profile_name or DEFAULT_JVM_PROFILE
+    if profile_name not in JVM_TUNING_PROFILES:
+        raise Exception(f"Unknown JVM tuning profile '{profile_name}'. Available: {', '.join(JVM_TUNING_PROFILES)}")
+    profile = JVM_TUNING_PROFILES[profile_name]
+    notes = []
+
+    java_version = detect_java_version(java_path)
+    host_mb = get_host_memory_mb()
+    cpu_count = os.cpu_count() or 2
+    mod_count = count_installed_mods(game_dir)
+
+    # --- Heap ---
+    if not ram_mb:
+        base = 1024 if profile_name == "low-memory" else 2048
+        ram_mb = -(-(base + 12 * mod_count) // 512) * 512
+        notes.append(f"Heap sized for {mod_count} mods")
+    if host_mb:
+        heap_cap = host_mb - max(1024, host_mb // 4)
+        if heap_cap >= 512 and ram_mb > heap_cap:
+            notes.append(f"Requested {ram_mb}MB heap exceeds safe limit for {host_mb}MB host, using {heap_cap}MB")
+            ram_mb = heap_cap
+    if "xms_mb" in profile:
+        xms_mb = min(profile["xms_mb"], ram_mb)
+    else:
+        xms_mb = max(256, int(ram_mb * profile["xms_ratio"]))
+
+    # --- GC choice ---
+    gc_name = gc or profile["gc"]
+    if gc_name == "zgc" and (java_version is None or java_version < 15):
+        notes.append(f"ZGC needs Java 15+ (found {java_version}), falling back to G1")
+        gc_name = "g1"
+    elif gc_name == "shenandoah" and not java_supports_flag(java_path, "-XX:+UseShenandoahGC"):
+        notes.append("Shenandoah is not available in this JDK build, falling back to G1")
+        gc_name = "g1"
+    if gc_name not in GC_FLAGS:
+        raise Exception(f"Unknown garbage collector '{gc_name}'. Available: {', '.join(GC_FLAGS)}")
+
+    flags = [f"-Xms{xms_mb}M", f"-Xmx{ram_mb}M"] + GC_FLAGS[gc_name]
+    if gc_name == "zgc" and java_version and 21 <= java_version < 23:
+        flags.append("-XX:+ZGenerational")  # Default from Java 23 on
+    if gc_name == "g1" and profile.get("pause_ms"):
+        flags.append(f"-XX:MaxGCPauseMillis={profile['pause_ms']}")
+    if profile_name == "low-memory" and gc_name == "g1":
+        flags.extend(["-XX:MinHeapFreeRatio=10", "-XX:MaxHeapFreeRatio=30", "-XX:+UseStringDeduplication"])
+
+    parallel_threads, concurrent_threads = _gc_thread_counts(cpu_count, profile)
+    if gc_name != "serial":
+        flags.append(f"-XX:ParallelGCThreads={parallel_threads}")
+    if gc_name in ("g1", "zgc", "shenandoah"):
+        flags.append(f"-XX:ConcGCThreads={concurrent_threads}")
+
+    if profile.get("pretouch"):
+        flags.append("-XX:+AlwaysPreTouch")
+    if profile.get("large_pages"):
+        large_pages_flag = _linux_large_pages_flag(ram_mb)
+        if large_pages_flag:
+            flags.append(large_pages_flag)
+
+    return {
+        "profile": profile_name,
+        "java_version": java_version,
+        "host_memory_mb": host_mb,
+        "cpu_count": cpu_count,
+        "mod_count": mod_count,
+        "heap_mb": ram_mb,
+        "gc": gc_name,
+        "flags": apply_jvm_overrides(flags, overrides),
+        "notes": notes,
+    }
+
+# --- Download Scheduling ---
+PRIORITY_CRITICAL = 0   # Client JAR, libraries, natives
+PRIORITY_STARTUP = 1    # Textures, models, fonts, default language: needed for the main menu
+PRIORITY_DEFERRED = 2   # Sounds, music, other languages: fine to arrive while playing
+DOWNLOAD_WORKERS = 16
+PROGRESS_INTERVAL = 0.5  # Seconds between download status updates
+# Asset objects read on the way to the main menu: downloaded first and prefetched at launch
+STARTUP_ASSET_PREFIXES = (
+    "icons/",
+    "minecraft/lang/en_us",
+    "minecraft/sounds.json",
+    "minecraft/font/",
+    "minecraft/shaders/",
+    "minecraft/textures/",
+    "minecraft/models/",
+    "minecraft/sounds/ui/",
+    "minecraft/sounds/music/menu/",
+    "realms/",
+)
+# Asset name prefixes that can arrive after launch
+DEFERRED_ASSET_PREFIXES = (
+    "minecraft/sounds/",
+    "minecraft/lang/",
+    "sounds/", "music/", "records/", "newsound/", "newmusic/", "lang/",
+)
+
+def classify_asset(name):
+    """Download priority of an asset object by its name in the index"""
+    if name.startswith(STARTUP_ASSET_PREFIXES):
+        return PRIORITY_STARTUP
+    if name.startswith(DEFERRED_ASSET_PREFIXES):
+        return PRIORITY_DEFERRED
+    return PRIORITY_STARTUP
+
+class DownloadJob:
+    """One scheduled file; urls are tried in order until one succeeds."""
+
+    def __init__(self, urls, dest_path, description, priority, ssl_verify, fatal, on_done, sha1=None):
+        self.urls = urls
+        self.dest_path = dest_path
+        self.sha1 = sha1
+        self.description = description
+        self.priority = priority
+        self.ssl_verify = ssl_verify
+        self.fatal = fatal
+        self.on_done = [on_done] if on_done else []
+        self.share = bandwidth.current_share()  # Bill the submitting install's fair share
+        self.started = False
+        self.error = None
+        self.done = threading.Event()
+
+class DownloadScheduler:
+    """Priority queue of downloads served by a shared pool of worker threads.
+
+    Lower priorities are always started first, so critical files are never stuck
+    behind music. Jobs outlive the install call that queued them, which lets deferred
+    assets keep downloading in the background after the game has launched.
+    """
+
+    def __init__(self, workers=DOWNLOAD_WORKERS):
+        self.workers = workers
+        self._queue = []
+        self._seq = 0
+        self._active = {}      # dest_path -> queued or running job
+        self._threads = []
+        self._cond = threading.Condition()
+
+    def submit(self, urls, dest_path, description="file", priority=PRIORITY_STARTUP, ssl_verify=False,
+               fatal=False, on_done=None, sha1=None):
+        """Queue a download; a file that is already queued or running is not fetched twice"""
+        dest_path = os.path.abspath(dest_path)
+        with self._cond:
+            existing = self._active.get(dest_path)
+            if existing:
+                if on_done:
+                    existing.on_done.append(on_done)
+                existing.fatal = existing.fatal or fatal
+                if priority < existing.priority:
+                    # Re-queue at the higher priority; the stale heap entry is skipped by workers
+                    existing.priority = priority
+                    self._push(existing)
+                return existing
+            job = DownloadJob([u for u in urls if u], dest_path, description, priority, ssl_verify, fatal, on_done, sha1)
+            self._active[dest_path] = job
+            self._push(job)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            return job
+
+    def _push(self, job):
+        self._seq += 1
+        heapq.heappush(self._queue, (job.priority, self._seq, job))
+        self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    while not self._queue:
+                        self._cond.wait()
+                    priority, _, job = heapq.heappop(self._queue)
+                    if priority == job.priority and not job.done.is_set() and not job.started:
+                        job.started = True
+                        break
+            self._run(job)
+
+    def _run(self, job):
+        errors = []
+        bandwidth.set_current_share(job.share)
+        for url in job.urls:
+            try:
+                download_file(url, job.dest_path, job.description, job.ssl_verify, job.sha1)
+                errors = []
+                break
+            except Exception as e:
+                errors.append(e)
+        if errors or not job.urls:
+            job.error = errors[-1] if errors else Exception(f"No download URL for {job.description}")
+        bandwidth.set_current_share(None)
+        with self._cond:
+            self._active.pop(job.dest_path, None)
+        job.done.set()
+        for callback in job.on_done:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Warning: Download callback failed for {job.description}: {e}")
+
+    def wait_for(self, jobs):
+        """Block until the given jobs finish; raises for failed fatal jobs, warns for the rest"""
+        for job in jobs:
+            job.done.wait()
+        for job in jobs:
+            if job.error:
+                if job.fatal:
+                    raise job.error
+                print(f"Warning: {job.error}")
+
+    def pending(self, max_priority=PRIORITY_DEFERRED):
+        """Number of queued or running downloads at or above the given priority"""
+        with self._cond:
+            return sum(1 for job in self._active.values() if job.priority <= max_priority)
+
+download_scheduler = DownloadScheduler()
+
+class TransferProgress:
+    """Files and bytes finished out of those queued by one install step, with a throughput-based ETA.
+
+    Sizes come from the version JSON and asset index; files without one count
+    towards the file total only. Throughput is the install's own bandwidth share
+    while it is open, and the global meter for downloads that outlive it.
+    """
+
+    def __init__(self, label, status_callback=None, interval=PROGRESS_INTERVAL):
+        self.label = label
+        self.status_callback = status_callback
+        self.interval = interval
+        self.share = bandwidth.current_share()
+        self.files = self.total_files = 0
+        self.bytes = self.total_bytes = 0
+        self.started = time.monotonic()
+        self._reported = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, size):
+        """Count one more queued file of size bytes (None if unknown)"""
+        with self._lock:
+            self.total_files += 1
+            self.total_bytes += size or 0
+
+    def expect(self, size):
+        """add() a file and return an on_done callback that finishes it"""
+        self.add(size)
+        return lambda job: self.finish(size)
+
+    def finish(self, size):
+        now = time.monotonic()
+        with self._lock:
+            self.files += 1
+            self.bytes += size or 0
+            due = now - self._reported >= self.interval or self.files == self.total_files
+            if due:
+                self._reported = now
+        if due and self.status_callback:
+            self.status_callback(self.message())
+
+    def rate(self):
+        meter = self.share.meter if self.share is not None and not self.share.closed else bandwidth.meter
+        rate = meter.rate()
+        if not rate:
+            elapsed = time.monotonic() - self.started
+            rate = self.bytes / elapsed if elapsed > 0 else 0
+        return rate
+
+    def eta(self):
+        """Seconds until the queued bytes are in at the current rate, None while nothing has arrived"""
+        rate = self.rate()
+        return max(0, self.total_bytes - self.bytes) / rate if rate else None
+
+    def message(self):
+        text = f"{self.label}: {self.files}/{self.total_files} files"
+        if self.total_bytes:
+            text += f", {format_size(self.bytes)}/{format_size(self.total_bytes)}"
+        if self.files < self.total_files:
+            text += f" at {format_rate(self.rate())}, ETA {format_eta(self.eta())}"
+        return text
+
+# --- Launcher Catalog ---
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id TEXT PRIMARY KEY, type TEXT, release_time TEXT, url TEXT,
+    inherits_from TEXT, asset_index TEXT, installed_at REAL);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY, kind TEXT NOT NULL, name TEXT, url TEXT, sha1 TEXT, size INTEGER,
+    state TEXT NOT NULL DEFAULT 'missing', checked_at REAL);
+CREATE TABLE IF NOT EXISTS version_artifacts (
+    version_id TEXT NOT NULL, path TEXT NOT NULL, PRIMARY KEY (version_id, path)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS version_artifacts_path ON version_artifacts (path);
+CREATE INDEX IF NOT EXISTS artifacts_name ON artifacts (name);
+CREATE TABLE IF NOT EXISTS asset_objects (
+    hash TEXT PRIMARY KEY, size INTEGER, state TEXT NOT NULL DEFAULT 'missing', checked_at REAL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS asset_index_objects (
+    index_id TEXT NOT NULL, name TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (index_id, name)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS asset_index_objects_hash ON asset_index_objects (hash);
+"""
+# A file that merely exists must not erase an earlier hash verification
+_KEEP_VERIFIED = "CASE WHEN excluded.state = 'present' AND {table}.state = 'verified' THEN 'verified' ELSE excluded.state END"
+
+class LauncherCatalog:
+    """SQLite index of manifest versions, their resolved libraries and asset objects.
+
+    Each file has a state: 'missing', 'present' (exists, hash not checked) or
+    'verified' (SHA1 matched when downloaded or during verify()). Artifact paths
+    are stored relative to the launcher directory. Connections are per thread;
+    WAL mode lets other launcher processes read while one installs.
+    """
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = root
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(CATALOG_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def record_manifest(self, versions):
+        """Upsert the entries of a Mojang version manifest"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO versions (id, type, release_time, url) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET type=excluded.type, release_time=excluded.release_time, url=excluded.url",
+                [(v["id"], v.get("type"), v.get("releaseTime"), v.get("url")) for v in versions])
+
+    def record_version(self, version_id, version_data, artifacts, index_id=None, objects=None):
+        """Store an installed version's resolved files in one transaction.
+
+        artifacts is a list of dicts with path (absolute), kind, name, url, sha1,
+        size and state; objects maps asset names to dicts with hash, size and state.
+        A state of None means the download is still running and keeps what is known.
+        """
+        rows = [(self.relpath(a["path"]), a["kind"], a.get("name"), a.get("url"), a.get("sha1"), a.get("size"),
+                 a["state"]) for a in artifacts]
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO versions (id, type, release_time, inherits_from, asset_index, installed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET inherits_from=excluded.inherits_from, "
+                "asset_index=excluded.asset_index, installed_at=excluded.installed_at, "
+                "type=COALESCE(versions.type, excluded.type), release_time=COALESCE(versions.release_time, excluded.release_time)",
+                (version_id, version_data.get("type"), version_data.get("releaseTime"),
+                 version_data.get("inheritsFrom"), index_id, now))
+            conn.executemany(
+                "INSERT INTO artifacts (path, kind, name, url, sha1, size, state, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, COALESCE(?7, 'missing'), ?8) ON CONFLICT(path) DO UPDATE SET "
+                "kind=excluded.kind, name=excluded.name, url=excluded.url, sha1=excluded.sha1, size=excluded.size, "
+                "state=CASE WHEN ?7 IS NULL THEN artifacts.state ELSE " + _KEEP_VERIFIED.format(table="artifacts") + " END, "
+                "checked_at=excluded.checked_at", [row + (now,) for row in rows])
+            conn.execute("DELETE FROM version_artifacts WHERE version_id = ?", (version_id,))
+            conn.executemany("INSERT OR IGNORE INTO version_artifacts (version_id, path) VALUES (?, ?)",
+                             [(version_id, row[0]) for row in rows])
+            if index_id and objects is not None:
+                conn.execute("DELETE FROM asset_index_objects WHERE index_id = ?", (index_id,))
+                conn.executemany("INSERT OR IGNORE INTO asset_index_objects (index_id, name, hash) VALUES (?, ?, ?)",
+                                 [(index_id, name, o["hash"]) for name, o in objects.items()])
+                conn.executemany(
+                    "INSERT INTO asset_objects (hash, size, state, checked_at) VALUES (?, ?, COALESCE(?3, 'missing'), ?4) "
+                    "ON CONFLICT(hash) DO UPDATE SET size=excluded.size, state=CASE WHEN ?3 IS NULL THEN asset_objects.state "
+                    "ELSE " + _KEEP_VERIFIED.format(table="asset_objects") + " END, checked_at=excluded.checked_at",
+                    [(o["hash"], o.get("size"), o["state"], now) for o in objects.values()])
+
+    def set_object_state(self, hash_val, size, state):
+        """Record the outcome of a background asset download"""
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO asset_objects (hash, size, state, checked_at) VALUES (?, ?, ?, ?) "
+                         "ON CONFLICT(hash) DO UPDATE SET state=excluded.state, checked_at=excluded.checked_at",
+                         (hash_val, size, state, time.time()))
+
+    def _lineage(self, version_id):
+        """The version and the versions it inherits from"""
+        rows = self._conn().execute(
+            "WITH RECURSIVE lineage(id) AS (SELECT ? UNION SELECT v.inherits_from FROM versions v "
+            "JOIN lineage ON v.id = lineage.id WHERE v.inherits_from IS NOT NULL) SELECT id FROM lineage", (version_id,))
+        return [row[0] for row in rows]
+
+    def missing(self, version_id):
+        """Count and bytes of missing files needed by a version (and its parents), by kind"""
+        lineage = self._lineage(version_id)
+        marks = ",".join("?" * len(lineage))
+        conn = self._conn()
+        result = {}
+        for kind, count, size in conn.execute(
+                f"SELECT a.kind, COUNT(*), COALESCE(SUM(a.size), 0) FROM artifacts a JOIN version_artifacts va "
+                f"ON va.path = a.path WHERE va.version_id IN ({marks}) AND a.state = 'missing' GROUP BY a.kind", lineage):
+            result[kind] = {"files": count, "bytes": size}
+        count, size = conn.execute(
+            f"SELECT COUNT(DISTINCT o.hash), COALESCE(SUM(o.size), 0) FROM (SELECT DISTINCT i.hash FROM versions v "
+            f"JOIN asset_index_objects i ON i.index_id = v.asset_index WHERE v.id IN ({marks})) h "
+            f"JOIN asset_objects o ON o.hash = h.hash WHERE o.state = 'missing'", lineage).fetchone()
+        if count:
+            result["asset"] = {"files": count, "bytes": size}
+        return result
+
+    def flagged_missing(self, version_id):
+        """Absolute paths of a version's (and its parents') recorded files in state 'missing'.
+
+        verify() leaves that state on a file whose SHA1 doesn't match, so these are
+        fetched again even when a file exists at the path.
+        """
+        lineage = self._lineage(version_id)
+        marks = ",".join("?" * len(lineage))
+        conn = self._conn()
+        paths = [path for (path,) in conn.execute(
+            f"SELECT a.path FROM artifacts a JOIN version_artifacts va ON va.path = a.path "
+            f"WHERE va.version_id IN ({marks}) AND a.state = 'missing'", lineage)]
+        paths += [f"assets/objects/{h[:2]}/{h}" for (h,) in conn.execute(
+            f"SELECT DISTINCT o.hash FROM versions v JOIN asset_index_objects i ON i.index_id = v.asset_index "
+            f"JOIN asset_objects o ON o.hash = i.hash WHERE v.id IN ({marks}) AND o.state = 'missing'", lineage)]
+        return {os.path.abspath(os.path.join(self.root, path)) for path in paths}
+
+    def versions_using(self, library):
+        """Installed versions that use a library, given as group:artifact[:version] or a libraries/ path"""
+        rows = self._conn().execute(
+            "SELECT DISTINCT va.version_id FROM artifacts a JOIN version_artifacts va ON va.path = a.path "
+            "WHERE a.name = ?1 OR a.name LIKE ?1 || ':%' OR a.path = ?1 OR a.path = 'libraries/' || ?1 "
+            "ORDER BY va.version_id", (library,))
+        return [row[0] for row in rows]
+
+    def is_verified(self, path_or_hash):
+        row = self._conn().execute(
+            "SELECT state FROM artifacts WHERE path = ? UNION ALL SELECT state FROM asset_objects WHERE hash = ?",
+            (self.relpath(path_or_hash) if os.path.isabs(path_or_hash) else path_or_hash, path_or_hash)).fetchone()
+        return bool(row) and row[0] == "verified"
+
+    def verify(self, version_id, status_callback=None):
+        """Hash every recorded file of a version against its SHA1 and store the result"""
+        lineage = self._lineage(version_id)
+        marks = ",".join("?" * len(lineage))
+        conn = self._conn()
+        files = [(os.path.join(self.root, path), sha1, "artifacts", "path", path) for path, sha1 in conn.execute(
+            f"SELECT DISTINCT a.path, a.sha1 FROM artifacts a JOIN version_artifacts va ON va.path = a.path "
+            f"WHERE va.version_id IN ({marks})", lineage)]
+        files += [(os.path.join(self.root, "assets", "objects", h[:2], h), h, "asset_objects", "hash", h) for (h,) in conn.execute(
+            f"SELECT DISTINCT i.hash FROM versions v JOIN asset_index_objects i ON i.index_id = v.asset_index "
+            f"WHERE v.id IN ({marks})", lineage)]
+
+        def check(entry):
+            full_path, sha1 = entry[:2]
+            if not os.path.isfile(full_path):
+                return "missing"
+            if not sha1:
+                return "present"
+            return "verified" if file_hash(full_path) == sha1.lower() else "missing"
+
+        counts = collections.Counter()
+        updates = collections.defaultdict(list)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+            for done, (entry, state) in enumerate(zip(files, pool.map(check, files)), 1):
+                counts[state] += 1
+                updates[(entry[2], entry[3])].append((state, time.time(), entry[4]))
+                if status_callback and done % 500 == 0:
+                    status_callback(f"Verified {done}/{len(files)} files of {version_id}")
+        with self.transaction() as conn:
+            for (table, key), rows in updates.items():
+                conn.executemany(f"UPDATE {table} SET state = ?, checked_at = ? WHERE {key} = ?", rows)
+        return dict(counts)
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            "versions": conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0],
+            "installed_versions": conn.execute("SELECT COUNT(*) FROM versions WHERE installed_at IS NOT NULL").fetchone()[0],
+            "artifacts": dict(conn.execute("SELECT state, COUNT(*) FROM artifacts GROUP BY state").fetchall()),
+            "asset_objects": dict(conn.execute("SELECT state, COUNT(*) FROM asset_objects GROUP BY state").fetchall()),
+        }
+
+def _catalog_call(method, *args):
+    """Run a catalog method; the catalog is an index, so its failures never stop an install or launch"""
+    try:
+        return method(*args)
+    except sqlite3.Error as e:
+        print(f"Warning: Launcher catalog unavailable ({e})")
+        return None
+
+def _job_state(job, sha1=None):
+    """Catalog state of a file after its download job (None while it is still running)"""
+    if job is None:
+        return "present"
+    if not job.done.is_set():
+        return None
+    if job.error:
+        return "missing"
+    return "verified" if sha1 else "present"
+
 # --- Minecraft Installation Logic ---
-def install_version(version_id, status_callback=None, ssl_verify=False):
-    """Ensure the given Minecraft version (version_id) and its dependencies are installed."""
+def library_allowed(lib):
+    """Evaluate a library's OS rules for macOS"""
+    rules = lib.get("rules", [])
+    if not rules:
+        return True
+    for rule in rules:
+        action = rule.get("action")
+        os_rule = rule.get("os", {})
+        if action == "allow":
+            if not os_rule or os_rule.get("name") == 'osx':
+                return True
+        elif action == "disallow":
+            if not os_rule or os_rule.get("name") == 'osx':
+                return False
+    return False
+
+def native_artifact_for(lib):
+    """The macOS natives classifier artifact of a library (ARM64 build preferred), or None"""
+    natives_info = lib.get("natives")
+    classifiers = lib.get("downloads", {}).get("classifiers", {})
+    if not natives_info or not classifiers:
+        return None
+    # Properly handle ARM64 vs x86_64 architecture for natives
+    if is_arm64() and 'natives-osx-arm64' in classifiers:
+        native_key = 'natives-osx-arm64'
+    else:
+        native_key = natives_info.get('osx', '').replace("${arch}", '64')
+    artifact = classifiers.get(native_key) if native_key else None
+    return artifact if artifact and artifact.get("path") else None
+
+def library_urls(lib, artifact, mirrors=True):
+    """Download URLs of a library or native artifact; Mojang and Forge Maven serve as each other's fallback"""
+    url = artifact.get("url")
+    if not url:
+        url = (FORGE_MAVEN_URL if 'forge' in lib.get('name','').lower() else LIBRARIES_BASE_URL) + artifact["path"]
+    urls = [url]
+    if mirrors and LIBRARIES_BASE_URL in url:
+        urls.append(FORGE_MAVEN_URL + artifact["path"])
+    elif mirrors and FORGE_MAVEN_URL in url:
+        urls.append(LIBRARIES_BASE_URL + artifact["path"])
+    return urls
+
+def install_version(version_id, status_callback=None, ssl_verify=False, stream_assets=False, weight=1.0):
+    """Ensure the given Minecraft version (version_id) and its dependencies are installed.
+
+    With stream_assets, sounds, music and extra languages are left downloading in the
+    background and the call returns once everything needed to reach the main menu is present.
+    weight sets this install's share of the bandwidth limit against concurrent installs.
+    """
+    with bandwidth.share(version_id, weight):
+        return _install_version(version_id, status_callback, ssl_verify, stream_assets)
+
+def _install_version(version_id, status_callback=None, ssl_verify=False, stream_assets=False):
+    launcher = current_launcher()
     if status_callback: status_callback(f"Checking version: {version_id}...")
 
-    version_folder = os.path.join(VERSIONS_DIR, version_id)
+    version_folder = os.path.join(launcher.versions_dir, version_id)
     version_json_path = os.path.join(version_folder, f"{version_id}.json")
     version_jar_path = os.path.join(version_folder, f"{version_id}.jar")
 
     # Check if primary JSON exists, if not, download it
     if not os.path.isfile(version_json_path):
-        if version_id not in all_versions:
+        if version_id not in launcher.all_versions:
             raise Exception(f"Version '{version_id}' not found in Mojang manifest.")
 
-        version_url = all_versions[version_id]
+        version_url = launcher.all_versions[version_id]
         os.makedirs(version_folder, exist_ok=True)
         if status_callback: status_callback(f"Downloading version JSON for {version_id}...")
         download_file(version_url, version_json_path, f"version JSON ({version_id})", ssl_verify)
@@ -219,20 +1584,39 @@ def install_version(version_id, status_callback=None, ssl_verify=False):
     if parent_id:
         if status_callback: status_callback(f"Version {version_id} inherits from {parent_id}. Installing parent...")
         try:
-            install_version(parent_id, status_callback, ssl_verify)
-            parent_json_path = os.path.join(VERSIONS_DIR, parent_id, f"{parent_id}.json")
+            install_version(parent_id, status_callback, ssl_verify, stream_assets)
+            parent_json_path = os.path.join(launcher.versions_dir, parent_id, f"{parent_id}.json")
             with open(parent_json_path, 'r') as pf:
                 parent_data = json.load(pf)
         except Exception as e:
             raise Exception(f"Failed to install parent version {parent_id}: {e}")
 
+    # The catalog can only add work here: a file it lists as missing (e.g. one that failed
+    # "catalog verify") is fetched again, but nothing is skipped without checking the disk
+    flagged = _catalog_call(launcher.catalog.flagged_missing, version_id) or set()
+
+    def on_disk(path):
+        return os.path.isfile(path) and os.path.abspath(path) not in flagged
+
     # --- Download Client JAR ---
+    critical_jobs = []
+    catalog_artifacts = []  # (catalog entry, download job or None)
+    transfers = TransferProgress(f"{version_id} libraries", status_callback)
     client_info = version_data.get("downloads", {}).get("client")
-    if client_info and not os.path.isfile(version_jar_path):
+    client_entry = client_info and {"path": version_jar_path, "kind": "client", "name": version_id,
+                                    "url": client_info.get("url"), "sha1": client_info.get("sha1"),
+                                    "size": client_info.get("size")}
+    if client_info and on_disk(version_jar_path):
+        catalog_artifacts.append((client_entry, None))
+    elif client_info:
         client_url = client_info.get("url")
         if client_url:
             if status_callback: status_callback(f"Downloading client JAR for {version_id}...")
-            download_file(client_url, version_jar_path, f"client JAR ({version_id})", ssl_verify)
+            critical_jobs.append(download_scheduler.submit([client_url], version_jar_path, f"client JAR ({version_id})",
+                                                           PRIORITY_CRITICAL, ssl_verify, fatal=True,
+                                                           on_done=transfers.expect(client_info.get("size")),
+                                                           sha1=client_info.get("sha1")))
+            catalog_artifacts.append((client_entry, critical_jobs[-1]))
         else:
             print(f"Warning: No client JAR URL found for {version_id}")
     elif not os.path.isfile(version_jar_path) and not parent_id:
@@ -243,120 +1627,73 @@ def install_version(version_id, status_callback=None, ssl_verify=False):
 
     # --- Download Libraries ---
     if status_callback: status_callback(f"Checking libraries for {version_id}...")
-    total_libs = len(libraries)
-    for i, lib in enumerate(libraries):
-        # Check rules (OS, architecture)
-        rules = lib.get("rules", [])
-        allowed = True 
-        if rules:
-            allowed = False
-            for rule in rules:
-                action = rule.get("action")
-                os_rule = rule.get("os", {})
-                if action == "allow":
-                    if not os_rule:
-                        allowed = True
-                        break
-                    if os_rule.get("name") == 'osx':
-                        allowed = True
-                        break
-                elif action == "disallow":
-                    if not os_rule:
-                        allowed = False
-                        break
-                    if os_rule.get("name") == 'osx':
-                        allowed = False
-                        break
-
-        if not allowed:
+    natives_to_extract = []
+    for lib in libraries:
+        if not library_allowed(lib):
             continue
 
         # Download main artifact
         artifact = lib.get("downloads", {}).get("artifact")
         if artifact and artifact.get("path"):
-            lib_path = os.path.join(LIBRARIES_DIR, artifact["path"])
-            if not os.path.isfile(lib_path):
-                lib_url = artifact.get("url")
-                if not lib_url:
-                    if 'forge' in lib.get('name','').lower():
-                        lib_url = FORGE_MAVEN_URL + artifact["path"]
-                    else:
-                        lib_url = LIBRARIES_BASE_URL + artifact["path"]
-
-                if status_callback: status_callback(f"Downloading library {i+1}/{total_libs}: {os.path.basename(lib_path)}")
-                try:
-                    download_file(lib_url, lib_path, f"library ({os.path.basename(lib_path)})", ssl_verify)
-                except Exception as e:
-                    print(f"Warning: Failed to download library {lib.get('name')}: {e}. Trying next source if available.")
-                    if LIBRARIES_BASE_URL in lib_url:
-                         fallback_url = FORGE_MAVEN_URL + artifact["path"]
-                         print(f"Trying Forge Maven: {fallback_url}")
-                         try:
-                             download_file(fallback_url, lib_path, f"library ({os.path.basename(lib_path)})", ssl_verify)
-                         except Exception as e2:
-                             print(f"Fallback download failed: {e2}")
-                    elif FORGE_MAVEN_URL in lib_url:
-                         fallback_url = LIBRARIES_BASE_URL + artifact["path"]
-                         print(f"Trying Mojang Libraries: {fallback_url}")
-                         try:
-                             download_file(fallback_url, lib_path, f"library ({os.path.basename(lib_path)})", ssl_verify)
-                         except Exception as e2:
-                             print(f"Fallback download failed: {e2}")
+            lib_path = os.path.join(launcher.libraries_dir, artifact["path"])
+            lib_job = None
+            if not on_disk(lib_path):
+                urls = library_urls(lib, artifact)
+                lib_job = download_scheduler.submit(urls, lib_path, f"library ({os.path.basename(lib_path)})",
+                                                    PRIORITY_CRITICAL, ssl_verify, on_done=transfers.expect(artifact.get("size")),
+                                                    sha1=artifact.get("sha1"))
+                critical_jobs.append(lib_job)
+            catalog_artifacts.append(({"path": lib_path, "kind": "library", "name": lib.get("name"),
+                                       "url": artifact.get("url"), "sha1": artifact.get("sha1"),
+                                       "size": artifact.get("size")}, lib_job))
 
         # Handle macOS natives
-        natives_info = lib.get("natives")
-        classifiers = lib.get("downloads", {}).get("classifiers", {})
-        if natives_info and classifiers:
-            native_os = 'osx'
-            
-            # Properly handle ARM64 vs x86_64 architecture for natives
-            arch = '64'  # Default to 64-bit
-            if is_arm64() and 'natives-osx-arm64' in classifiers:
-                native_key = 'natives-osx-arm64'
-            else:
-                native_key = natives_info.get(native_os, '').replace("${arch}", arch)
-
-            if native_key and native_key in classifiers:
-                native_artifact = classifiers[native_key]
-                if native_artifact.get("path"):
-                    native_path = os.path.join(LIBRARIES_DIR, native_artifact["path"])
-                    if not os.path.isfile(native_path):
-                        native_url = native_artifact.get("url")
-                        if not native_url:
-                             if 'forge' in lib.get('name','').lower():
-                                 native_url = FORGE_MAVEN_URL + native_artifact["path"]
-                             else:
-                                 native_url = LIBRARIES_BASE_URL + native_artifact["path"]
-
-                        if status_callback: status_callback(f"Downloading native library {i+1}/{total_libs}: {os.path.basename(native_path)}")
-                        try:
-                            download_file(native_url, native_path, f"native library ({os.path.basename(native_path)})", ssl_verify)
-                        except Exception as e:
-                            print(f"Warning: Failed to download native {lib.get('name')}: {e}")
-
-                    # Extract natives
-                    natives_dir = os.path.join(version_folder, "natives")
-                    os.makedirs(natives_dir, exist_ok=True)
-                    try:
-                        if os.path.isfile(native_path):
-                            with zipfile.ZipFile(native_path, 'r') as zf:
-                                exclude_prefixes = lib.get("extract", {}).get("exclude", [])
-                                for member in zf.namelist():
-                                    if member.startswith("META-INF/") or any(member.startswith(prefix) for prefix in exclude_prefixes):
-                                        continue
-                                    if not member.endswith('/'):
-                                       zf.extract(member, natives_dir)
-                    except zipfile.BadZipFile:
-                        print(f"Warning: Could not extract natives from corrupted file: {native_path}")
-                    except Exception as e:
-                        print(f"Warning: Failed to extract natives from {native_path}: {e}")
+        native_artifact = native_artifact_for(lib)
+        if native_artifact:
+            native_path = os.path.join(launcher.libraries_dir, native_artifact["path"])
+            native_job = None
+            if not on_disk(native_path):
+                native_job = download_scheduler.submit(
+                    library_urls(lib, native_artifact, mirrors=False), native_path,
+                    f"native library ({os.path.basename(native_path)})", PRIORITY_CRITICAL, ssl_verify,
+                    on_done=transfers.expect(native_artifact.get("size")), sha1=native_artifact.get("sha1"))
+                critical_jobs.append(native_job)
+            catalog_artifacts.append(({"path": native_path, "kind": "native", "name": lib.get("name"),
+                                       "url": native_artifact.get("url"), "sha1": native_artifact.get("sha1"),
+                                       "size": native_artifact.get("size")}, native_job))
+            natives_to_extract.append((native_path, lib.get("extract", {}).get("exclude", [])))
+
+    if critical_jobs and status_callback:
+        status_callback(f"Downloading {len(critical_jobs)} libraries and natives for {version_id} "
+                        f"({format_size(transfers.total_bytes)})...")
+    download_scheduler.wait_for(critical_jobs)
+
+    # Extract natives
+    natives_dir = os.path.join(version_folder, "natives")
+    for native_path, exclude_prefixes in natives_to_extract:
+        os.makedirs(natives_dir, exist_ok=True)
+        try:
+            if os.path.isfile(native_path):
+                with zipfile.ZipFile(native_path, 'r') as zf:
+                    for member in zf.namelist():
+                        if member.startswith("META-INF/") or any(member.startswith(prefix) for prefix in exclude_prefixes):
+                            continue
+                        if not member.endswith('/'):
+                           zf.extract(member, natives_dir)
+        except zipfile.BadZipFile:
+            print(f"Warning: Could not extract natives from corrupted file: {native_path}")
+        except Exception as e:
+            print(f"Warning: Failed to extract natives from {native_path}: {e}")
 
     # --- Download Assets ---
+    idx_id = None
+    catalog_objects = None  # asset name -> (hash, size, download job or None)
+    catalog_recorded = threading.Event()
     asset_index_info = version_data.get("assetIndex") or parent_data.get("assetIndex")
     if asset_index_info and asset_index_info.get("id") and asset_index_info.get("url"):
         idx_id = asset_index_info["id"]
         idx_url = asset_index_info["url"]
-        idx_dest = os.path.join(ASSETS_DIR, "indexes", f"{idx_id}.json")
+        idx_dest = os.path.join(launcher.assets_dir, "indexes", f"{idx_id}.json")
 
         if not os.path.isfile(idx_dest):
             if status_callback: status_callback(f"Downloading asset index {idx_id}...")
@@ -369,18 +1706,48 @@ def install_version(version_id, status_callback=None, ssl_verify=False):
 
             if idx_data and "objects" in idx_data:
                 if status_callback: status_callback(f"Checking assets for index {idx_id}...")
-                total_assets = len(idx_data["objects"])
-                assets_downloaded = 0
-                for i, (asset_name, info) in enumerate(idx_data["objects"].items()):
-                    hash_val = info.get("hash")
-                    if hash_val:
-                        subdir = hash_val[:2]
-                        asset_path = os.path.join(ASSETS_DIR, "objects", subdir, hash_val)
-                        if not os.path.isfile(asset_path):
-                            assets_downloaded += 1
-                            if status_callback: status_callback(f"Downloading asset {assets_downloaded}/{total_assets}: {asset_name}")
-                            asset_url = ASSET_BASE_URL + f"{subdir}/{hash_val}"
-                            download_file(asset_url, asset_path, f"asset ({hash_val[:8]})", ssl_verify)
+                # Legacy layouts are materialized from the complete object set, so never defer them
+                can_defer = stream_assets and not idx_data.get("virtual") and not idx_data.get("map_to_resources")
+                objects = {name: info for name, info in idx_data["objects"].items() if info.get("hash")}
+                catalog_objects = {name: (info["hash"], info.get("size"), None) for name, info in objects.items()}
+                # Always stat: objects deleted since the last install must come back, and recording
+                # the result below keeps the catalog's missing report current
+                missing = []
+                for asset_name, info in objects.items():
+                    hash_val = info["hash"]
+                    asset_path = os.path.join(launcher.assets_dir, "objects", hash_val[:2], hash_val)
+                    if not on_disk(asset_path):
+                        missing.append((asset_name, hash_val, asset_path))
+                startup_jobs, deferred_jobs = [], []
+                job_names = {}  # hash -> asset name
+                asset_transfers = TransferProgress(f"Assets for index {idx_id}", status_callback)
+
+                def report_progress(job):
+                    hash_val = os.path.basename(job.dest_path)
+                    size = objects[job_names[hash_val]].get("size")
+                    if catalog_recorded.is_set():  # Background downloads that outlive the install
+                        _catalog_call(launcher.catalog.set_object_state, hash_val, size, _job_state(job, hash_val))
+                    asset_transfers.finish(size)
+
+                for asset_name, hash_val, asset_path in missing:
+                    priority = classify_asset(asset_name) if can_defer else PRIORITY_STARTUP
+                    asset_url = ASSET_BASE_URL + f"{hash_val[:2]}/{hash_val}"
+                    job_names[hash_val] = asset_name
+                    asset_transfers.add(objects[asset_name].get("size"))
+                    job = download_scheduler.submit([asset_url], asset_path, f"asset ({hash_val[:8]})", priority,
+                                                    ssl_verify, on_done=report_progress, sha1=hash_val)
+                    catalog_objects[asset_name] = (hash_val, objects[asset_name].get("size"), job)
+                    (deferred_jobs if priority == PRIORITY_DEFERRED else startup_jobs).append(job)
+
+                download_scheduler.wait_for(startup_jobs)
+                if deferred_jobs and status_callback:
+                    status_callback(f"{len(deferred_jobs)} sound/language assets will keep downloading in the background")
+                if not can_defer:
+                    download_scheduler.wait_for(deferred_jobs)
+
+            # Pre-1.7 versions read assets by name from a virtual directory
+            if idx_data.get("virtual"):
+                materialize_legacy_assets(idx_id, status_callback=status_callback)
 
         except Exception as e:
              print(f"Warning: Error processing assets for index {idx_id}: {e}")
@@ -388,6 +1755,16 @@ def install_version(version_id, status_callback=None, ssl_verify=False):
     else:
         print(f"Warning: No valid asset index information found for version {version_id}")
 
+    # --- Catalog ---
+    # Set first so a download finishing while we record reports its own state
+    catalog_recorded.set()
+    artifacts = [dict(entry, state=_job_state(job, entry.get("sha1"))) for entry, job in catalog_artifacts]
+    object_states = None
+    if catalog_objects is not None:
+        object_states = {name: {"hash": hash_val, "size": size, "state": _job_state(job, hash_val)}
+                         for name, (hash_val, size, job) in catalog_objects.items()}
+    _catalog_call(launcher.catalog.record_version, version_id, version_data, artifacts, idx_id, object_states)
+
     # --- TLauncher Skin Patch ---
     try:
         with open(version_json_path, 'r+') as vf:
@@ -401,73 +1778,1614 @@ def install_version(version_id, status_callback=None, ssl_verify=False):
     except Exception as e:
         print(f"Warning: Could not set skinVersion in {version_id}.json - {e}")
 
-    if status_callback: status_callback(f"Version {version_id} installation complete.")
+    if status_callback: status_callback(f"Version {version_id} installation complete.")
+
+# --- Install Planning ---
+def _plan_json(path, url, description, ssl_verify, plan, save):
+    """Metadata install_version would read; fetched when it isn't on disk yet, into memory unless save"""
+    if not os.path.isfile(path):
+        plan["metadata"].append({"description": description, "path": path, "url": url})
+        if not save:
+            return fetch_json(url, ssl_verify)
+        download_file(url, path, description, ssl_verify)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _plan_totals(plan):
+    items = plan["items"]
+    plan["files"] = len(items)
+    plan["bytes"] = sum(item["size"] or 0 for item in items)
+    plan["unknown_size"] = sum(1 for item in items if item["size"] is None)
+    by_kind = {}
+    for item in items:
+        totals = by_kind.setdefault(item["kind"], {"files": 0, "bytes": 0})
+        totals["files"] += 1
+        totals["bytes"] += item["size"] or 0
+    plan["by_kind"] = by_kind
+    return plan
+
+def plan_install(version_id, ssl_verify=False, save_metadata=False):
+    """Dry run of install_version: the missing client, libraries, natives and asset objects, with sizes.
+
+    Version JSONs and asset indexes that aren't on disk yet are listed under "metadata"
+    and fetched into memory; save_metadata stores them where install_version looks,
+    so planning right before installing doesn't fetch them twice. Nothing else is
+    written. Each item has kind, name, path, url, size (None when the metadata has
+    none) and sha1.
+    """
+    launcher = current_launcher()
+    plan = {"version_id": version_id, "versions": [], "metadata": [], "items": []}
+    seen = set()
+    flagged = _catalog_call(launcher.catalog.flagged_missing, version_id) or set()  # As in install_version
+
+    def add(kind, name, path, url, size, sha1):
+        if path in seen or (os.path.isfile(path) and os.path.abspath(path) not in flagged):
+            return
+        seen.add(path)
+        plan["items"].append({"kind": kind, "name": name, "path": path, "url": url, "size": size, "sha1": sha1})
+
+    def plan_version(vid):
+        version_folder = os.path.join(launcher.versions_dir, vid)
+        version_json_path = os.path.join(version_folder, f"{vid}.json")
+        if not os.path.isfile(version_json_path) and vid not in launcher.all_versions:
+            raise Exception(f"Version '{vid}' not found in Mojang manifest.")
+        data = _plan_json(version_json_path, launcher.all_versions.get(vid), f"version JSON ({vid})", ssl_verify, plan,
+                          save_metadata)
+        plan["versions"].append(vid)
+        parent_data = plan_version(data["inheritsFrom"]) if data.get("inheritsFrom") else {}
+
+        client_info = data.get("downloads", {}).get("client")
+        if client_info and client_info.get("url"):
+            add("client", vid, os.path.join(version_folder, f"{vid}.jar"), client_info["url"],
+                client_info.get("size"), client_info.get("sha1"))
+        for lib in data.get("libraries", []) + parent_data.get("libraries", []):
+            if not library_allowed(lib):
+                continue
+            artifact = lib.get("downloads", {}).get("artifact")
+            if artifact and artifact.get("path"):
+                add("library", lib.get("name"), os.path.join(launcher.libraries_dir, artifact["path"]),
+                    library_urls(lib, artifact)[0], artifact.get("size"), artifact.get("sha1"))
+            native_artifact = native_artifact_for(lib)
+            if native_artifact:
+                add("native", lib.get("name"), os.path.join(launcher.libraries_dir, native_artifact["path"]),
+                    library_urls(lib, native_artifact, mirrors=False)[0], native_artifact.get("size"),
+                    native_artifact.get("sha1"))
+
+        asset_index_info = data.get("assetIndex") or parent_data.get("assetIndex")
+        if asset_index_info and asset_index_info.get("id") and asset_index_info.get("url"):
+            idx_id = asset_index_info["id"]
+            idx_dest = os.path.join(launcher.assets_dir, "indexes", f"{idx_id}.json")
+            if idx_dest not in seen:
+                seen.add(idx_dest)
+                idx_data = _plan_json(idx_dest, asset_index_info["url"], f"asset index ({idx_id})", ssl_verify, plan,
+                                      save_metadata)
+                for asset_name, info in (idx_data or {}).get("objects", {}).items():
+                    hash_val = info.get("hash")
+                    if hash_val:
+                        add("asset", asset_name, os.path.join(launcher.assets_dir, "objects", hash_val[:2], hash_val),
+                            ASSET_BASE_URL + f"{hash_val[:2]}/{hash_val}", info.get("size"), hash_val)
+        return data
+
+    plan_version(version_id)
+    return _plan_totals(plan)
+
+def combine_plans(plans):
+    """One plan for installing several versions, counting files they share once"""
+    combined = {"version_id": None, "versions": [], "metadata": [], "items": []}
+    seen = set()
+    for plan in plans:
+        combined["versions"] += [vid for vid in plan["versions"] if vid not in combined["versions"]]
+        for key in ("metadata", "items"):
+            for entry in plan[key]:
+                if entry["path"] not in seen:
+                    seen.add(entry["path"])
+                    combined[key].append(entry)
+    return _plan_totals(combined)
+
+def format_plan(plan, rate=None):
+    """Human-readable plan summary; rate (bytes/s) adds a time estimate"""
+    title = plan["version_id"] or ", ".join(plan["versions"])
+    if not plan["files"]:
+        return f"{title}: everything is installed"
+    lines = [f"{title}: {plan['files']} files, {format_size(plan['bytes'])} to download"]
+    for kind in ("client", "library", "native", "asset"):
+        if kind in plan["by_kind"]:
+            totals = plan["by_kind"][kind]
+            lines.append(f"  {kind}: {totals['files']} file{'s' if totals['files'] != 1 else ''}, "
+                         f"{format_size(totals['bytes'])}")
+    if plan["metadata"]:
+        lines.append(f"  plus {len(plan['metadata'])} metadata files: "
+                     + ", ".join(entry["description"] for entry in plan["metadata"]))
+    if plan["unknown_size"]:
+        lines.append(f"  {plan['unknown_size']} files have no size listed")
+    if rate:
+        lines.append(f"  about {format_eta(plan['bytes'] / rate)} at {format_rate(rate)}")
+    return "\n".join(lines)
+
+# --- Legacy Asset Layouts ---
+LAYOUT_MANIFEST_FILE = ".catclient-layout.json"
+FICLONE = 0x40049409  # Linux ioctl: share extents with another file (btrfs, XFS, bcachefs)
+
+_reflink_unsupported = set()
+
+def _reflink(src, dst):
+    """Copy-on-write clone of src at dst; False when the filesystem can't do it"""
+    device = os.stat(os.path.dirname(dst)).st_dev
+    if not sys.platform.startswith("linux") or device in _reflink_unsupported:
+        return False
+    try:
+        import fcntl
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        _reflink_unsupported.add(device)  # Don't retry per file on ext4/tmpfs/...
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+def materialize_file(src, dst):
+    """Place src at dst without duplicating data: reflink, then hardlink, then copy"""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if _reflink(src, dst):
+        return "reflink"
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+def _materialize_layout(objects, target_dir):
+    """Mirror asset objects into target_dir under their real names, touching only what changed"""
+    manifest_path = os.path.join(target_dir, LAYOUT_MANIFEST_FILE)
+    previous = {}
+    if os.path.isfile(manifest_path):
+        try:
+            with open(manifest_path, 'r') as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            previous = {}
+
+    stats = {"reflink": 0, "hardlink": 0, "copy": 0, "unchanged": 0, "removed": 0, "missing": 0}
+    current = {}
+    for name, info in objects.items():
+        hash_val = info.get("hash")
+        if not hash_val:
+            continue
+        dst = os.path.join(target_dir, *name.split("/"))
+        if previous.get(name) == hash_val and os.path.isfile(dst):
+            stats["unchanged"] += 1
+            current[name] = hash_val
+            continue
+        src = os.path.join(current_launcher().assets_dir, "objects", hash_val[:2], hash_val)
+        if not os.path.isfile(src):
+            stats["missing"] += 1
+            continue
+        stats[materialize_file(src, dst)] += 1
+        current[name] = hash_val
+
+    for name in set(previous) - set(objects):
+        try:
+            os.remove(os.path.join(target_dir, *name.split("/")))
+            stats["removed"] += 1
+        except OSError:
+            pass
+
+    os.makedirs(target_dir, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(current, f)
+    return stats
+
+def legacy_assets_dir(asset_index_id, game_dir=None):
+    """Directory old versions read assets from (${game_assets}), or None for modern indexes"""
+    launcher = current_launcher()
+    idx_path = os.path.join(launcher.assets_dir, "indexes", f"{asset_index_id}.json")
+    try:
+        with open(idx_path, 'r') as f:
+            idx_data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if idx_data.get("map_to_resources") and game_dir:
+        return os.path.join(game_dir, "resources")
+    if idx_data.get("virtual"):
+        return os.path.join(launcher.assets_dir, "virtual", asset_index_id)
+    return None
+
+def materialize_legacy_assets(asset_index_id, game_dir=None, status_callback=None):
+    """Lay out assets of `virtual` indexes under assets/virtual/<id> and of
+    `map_to_resources` indexes under <game_dir>/resources, linked from the object store.
+    """
+    launcher = current_launcher()
+    idx_path = os.path.join(launcher.assets_dir, "indexes", f"{asset_index_id}.json")
+    if not os.path.isfile(idx_path):
+        return None
+    with open(idx_path, 'r') as f:
+        idx_data = json.load(f)
+    targets = []
+    if idx_data.get("virtual"):
+        targets.append(os.path.join(launcher.assets_dir, "virtual", asset_index_id))
+    if idx_data.get("map_to_resources") and game_dir:
+        targets.append(os.path.join(game_dir, "resources"))
+    stats = None
+    for target_dir in targets:
+        if status_callback: status_callback(f"Laying out legacy assets in {target_dir}...")
+        stats = _materialize_layout(idx_data.get("objects", {}), target_dir)
+        print(f"Legacy assets ({asset_index_id}) -> {target_dir}: {stats}")
+    return stats
+
+# --- Lunar Client Support ---
+def setup_lunar_client(version_id, status_callback=None):
+    """Set up necessary files for Lunar Client compatibility"""
+    launcher = current_launcher()
+    if status_callback: status_callback(f"Setting up Lunar Client compatibility for {version_id}...")
+    
+    # Create Lunar Client directory structure
+    lunar_dir = os.path.expanduser("~/.lunarclient")
+    lunar_offline_dir = os.path.join(lunar_dir, "offline")
+    lunar_jre_dir = os.path.join(lunar_dir, "jre")
+    
+    os.makedirs(lunar_offline_dir, exist_ok=True)
+    os.makedirs(lunar_jre_dir, exist_ok=True)
+    
+    # Create offline mode marker file if it doesn't exist
+    offline_marker = os.path.join(lunar_offline_dir, ".offline")
+    if not os.path.exists(offline_marker):
+        with open(offline_marker, 'w') as f:
+            f.write("1")  # Just a marker file
+    
+    # Create symbolic link to the Minecraft versions directory
+    lunar_versions_dir = os.path.join(lunar_dir, "game-versions")
+    if not os.path.exists(lunar_versions_dir):
+        try:
+            os.symlink(launcher.versions_dir, lunar_versions_dir)
+        except Exception as e:
+            print(f"Warning: Could not create symlink to versions directory: {e}")
+    
+    # Create settings json if needed
+    settings_path = os.path.join(lunar_dir, "settings.json")
+    if not os.path.exists(settings_path):
+        default_settings = {
+            "gameDir": launcher.root,
+            "jreDir": lunar_jre_dir,
+            "width": 854,
+            "height": 480,
+            "lastVersion": version_id,
+            "offline": True
+        }
+        
+        try:
+            with open(settings_path, 'w') as f:
+                json.dump(default_settings, f, indent=4)
+        except Exception as e:
+            print(f"Warning: Could not create Lunar Client settings: {e}")
+    
+    if status_callback: status_callback(f"Lunar Client setup complete for {version_id}")
+
+# --- Mod Loader Installation ---
+FABRIC_META_URL = "https://meta.fabricmc.net/v2"
+QUILT_META_URL = "https://meta.quiltmc.org/v3"
+NEOFORGE_MAVEN_URL = "https://maven.neoforged.net/releases/"
+
+def fetch_json(url, ssl_verify=False, headers=None, data=None):
+    """GET (or POST when data is given) a JSON document into memory"""
+    request_headers = {'User-Agent': USER_AGENT, 'Accept': 'application/json'}
+    request_headers.update(headers or {})
+    body = None
+    if data is not None:
+        body = json.dumps(data).encode("utf-8")
+        request_headers['Content-Type'] = 'application/json'
+    req = urllib.request.Request(url, data=body, headers=request_headers)
+    try:
+        with urllib.request.urlopen(req, context=get_ssl_context(ssl_verify)) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        raise Exception(f"Request to {url} failed. HTTP Error: {e.code} {e.reason}") from e
+    except urllib.error.URLError as e:
+        raise Exception(f"Request to {url} failed. URL Error: {e}") from e
+
+def file_hash(path, algorithm="sha1"):
+    """Hex digest of a file, read in chunks"""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def maven_path(coordinate):
+    """Repository path for a Maven coordinate group:artifact:version[:classifier][@ext]"""
+    coordinate, _, extension = coordinate.partition("@")
+    parts = coordinate.split(":")
+    group, artifact, version = parts[0], parts[1], parts[2]
+    classifier = f"-{parts[3]}" if len(parts) > 3 else ""
+    return f"{group.replace('.', '/')}/{artifact}/{version}/{artifact}-{version}{classifier}.{extension or 'jar'}"
+
+def _install_meta_profile(profile_url, version_id, status_callback=None, ssl_verify=False):
+    """Install a loader whose launcher profile JSON is served by a metadata API (Fabric, Quilt)"""
+    version_json_path = os.path.join(current_launcher().versions_dir, version_id, f"{version_id}.json")
+    if not os.path.isfile(version_json_path):
+        if status_callback: status_callback(f"Downloading loader profile {version_id}...")
+        download_file(profile_url, version_json_path, f"loader profile ({version_id})", ssl_verify)
+    install_version(version_id, status_callback, ssl_verify)
+    return version_id
+
+def _installer_url(loader, minecraft_version, loader_version):
+    if loader == "neoforge":
+        return f"{NEOFORGE_MAVEN_URL}net/neoforged/neoforge/{loader_version}/neoforge-{loader_version}-installer.jar"
+    full_version = f"{minecraft_version}-{loader_version}"
+    return f"{FORGE_MAVEN_URL}net/minecraftforge/forge/{full_version}/forge-{full_version}-installer.jar"
+
+def install_forge(minecraft_version, loader_version, loader="forge", java_path="java", status_callback=None, ssl_verify=False):
+    """Install Forge/NeoForge from its official installer JAR; returns the installed version id"""
+    launcher = current_launcher()
+    installer_url = _installer_url(loader, minecraft_version, loader_version)
+    installer_path = os.path.join(launcher.installers_cache_dir, os.path.basename(installer_url))
+    if not os.path.isfile(installer_path):
+        if status_callback: status_callback(f"Downloading {loader} {loader_version} installer...")
+        download_file(installer_url, installer_path, f"{loader} installer", ssl_verify)
+
+    with zipfile.ZipFile(installer_path, 'r') as zf:
+        profile = json.loads(zf.read("install_profile.json"))
+        if "versionInfo" in profile:
+            # Legacy installer (1.12.2 and older): version JSON is embedded, universal JAR ships inside
+            version_data = profile["versionInfo"]
+            universal = profile.get("install", {})
+            if universal.get("filePath") and universal.get("path"):
+                lib_path = os.path.join(launcher.libraries_dir, maven_path(universal["path"]))
+                if not os.path.isfile(lib_path):
+                    os.makedirs(os.path.dirname(lib_path), exist_ok=True)
+                    with zf.open(universal["filePath"]) as src, open(lib_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+        else:
+            version_data = json.loads(zf.read(profile.get("json", "/version.json").lstrip("/")))
+            # Libraries bundled under maven/ are not downloadable from any repository
+            for member in zf.namelist():
+                if member.startswith("maven/") and not member.endswith("/"):
+                    lib_path = os.path.join(launcher.libraries_dir, member[len("maven/"):])
+                    if not os.path.isfile(lib_path):
+                        os.makedirs(os.path.dirname(lib_path), exist_ok=True)
+                        with zf.open(member) as src, open(lib_path, 'wb') as dst:
+                            shutil.copyfileobj(src, dst)
+
+    version_id = version_data["id"]
+    version_folder = os.path.join(launcher.versions_dir, version_id)
+    os.makedirs(version_folder, exist_ok=True)
+    with open(os.path.join(version_folder, f"{version_id}.json"), 'w') as f:
+        json.dump(version_data, f, indent=4)
+
+    if "versionInfo" not in profile and profile.get("processors"):
+        # Processors patch the vanilla client JAR and generate libraries the version JSON lists
+        install_version(profile["minecraft"], status_callback, ssl_verify)
+        download_profile_libraries(profile.get("libraries", []), status_callback, ssl_verify)
+        ForgeProcessorRunner(installer_path, profile, java_path, status_callback).run()
+    install_version(version_id, status_callback, ssl_verify)
+    return version_id
+
+def install_loader(minecraft_version, loader=None, loader_version=None, java_path="java", status_callback=None, ssl_verify=False):
+    """Install vanilla or a mod loader on top of it; returns the version id to launch"""
+    if not loader:
+        install_version(minecraft_version, status_callback, ssl_verify)
+        return minecraft_version
+    if loader == "fabric":
+        return _install_meta_profile(f"{FABRIC_META_URL}/versions/loader/{minecraft_version}/{loader_version}/profile/json",
+                                     f"fabric-loader-{loader_version}-{minecraft_version}", status_callback, ssl_verify)
+    if loader == "quilt":
+        return _install_meta_profile(f"{QUILT_META_URL}/versions/loader/{minecraft_version}/{loader_version}/profile/json",
+                                     f"quilt-loader-{loader_version}-{minecraft_version}", status_callback, ssl_verify)
+    if loader in ("forge", "neoforge"):
+        return install_forge(minecraft_version, loader_version, loader, java_path, status_callback, ssl_verify)
+    raise Exception(f"Unsupported mod loader '{loader}'.")
+
+# --- Forge Install Processors ---
+# Processor arguments whose following value is a file the processor writes
+PROCESSOR_OUTPUT_FLAGS = ("--output", "--out-jar", "--out", "--slim", "--extra")
+
+_hash_memo = {}
+_hash_memo_lock = threading.Lock()
+
+def cached_file_sha1(path):
+    """sha1 of a file, memoized on (path, size, mtime) so large JARs are hashed once per run"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _hash_memo_lock:
+        if key in _hash_memo:
+            return _hash_memo[key]
+    digest = file_hash(path, "sha1")
+    with _hash_memo_lock:
+        _hash_memo[key] = digest
+    return digest
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, copying when linking is not possible (other filesystem, no support)"""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _jar_main_class(jar_path):
+    with zipfile.ZipFile(jar_path, 'r') as zf:
+        manifest = zf.read("META-INF/MANIFEST.MF").decode("utf-8", errors="replace")
+    match = re.search(r'^Main-Class:\s*(\S+)', manifest, re.MULTILINE)
+    if not match:
+        raise Exception(f"No Main-Class in {os.path.basename(jar_path)}")
+    return match.group(1)
+
+def download_profile_libraries(libraries, status_callback=None, ssl_verify=False):
+    """Fetch the libraries an install profile's processors need, verifying sha1 where given"""
+    def fetch(lib):
+        artifact = lib.get("downloads", {}).get("artifact", {})
+        path = artifact.get("path") or maven_path(lib["name"])
+        lib_path = os.path.join(current_launcher().libraries_dir, path)
+        if os.path.isfile(lib_path) and (not artifact.get("sha1") or cached_file_sha1(lib_path) == artifact["sha1"]):
+            return
+        url = artifact.get("url")
+        if not url:
+            if os.path.isfile(lib_path):
+                return  # Bundled in the installer's maven/ folder
+            url = FORGE_MAVEN_URL + path
+        download_file(url, lib_path, f"installer library ({os.path.basename(lib_path)})", ssl_verify)
+        if artifact.get("sha1") and cached_file_sha1(lib_path) != artifact["sha1"]:
+            os.remove(lib_path)
+            raise Exception(f"Checksum mismatch for installer library {lib['name']}")
+
+    if status_callback: status_callback(f"Checking {len(libraries)} installer libraries...")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(bind_launcher(fetch), libraries))
+
+class ForgeProcessorRunner:
+    """Runs the processors of a modern Forge/NeoForge install_profile.json.
+
+    Every processor's outputs are cached in the launcher's cache/processors, keyed by the
+    hashes of its JAR, classpath, input files and arguments, so reinstalls and sibling
+    versions sharing a step restore its outputs instead of re-running it.
+    """
+
+    def __init__(self, installer_path, profile, java_path="java", status_callback=None):
+        self.installer_path = installer_path
+        self.profile = profile
+        self.java_path = java_path
+        self.status_callback = status_callback
+        self.launcher = current_launcher()
+        self.extract_dir = os.path.join(self.launcher.installers_cache_dir,
+                                        os.path.splitext(os.path.basename(installer_path))[0])
+        self.stats = {"run": 0, "cached": 0, "up_to_date": 0, "seconds": 0.0}
+        self.data = self._build_data()
+
+    def _build_data(self):
+        minecraft_version = self.profile["minecraft"]
+        data = {
+            "SIDE": "client",
+            "MINECRAFT_JAR": os.path.join(self.launcher.versions_dir, minecraft_version, f"{minecraft_version}.jar"),
+            "MINECRAFT_VERSION": minecraft_version,
+            "ROOT": self.launcher.root,
+            "INSTALLER": self.installer_path,
+            "LIBRARY_DIR": self.launcher.libraries_dir,
+        }
+        for key, sides in self.profile.get("data", {}).items():
+            value = sides.get("client", "")
+            if value.startswith("[") and value.endswith("]"):
+                data[key] = os.path.join(self.launcher.libraries_dir, maven_path(value[1:-1]))
+            elif value.startswith("'") and value.endswith("'"):
+                data[key] = value[1:-1]
+            elif value.startswith("/"):
+                data[key] = self._extract(value)
+            else:
+                data[key] = value
+        return data
+
+    def _extract(self, member):
+        """Unpack a file the profile references inside the installer (e.g. /data/client.lzma)"""
+        dest = os.path.join(self.extract_dir, member.lstrip("/"))
+        if not os.path.isfile(dest):
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with zipfile.ZipFile(self.installer_path, 'r') as zf, zf.open(member.lstrip("/")) as src, open(dest, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        return dest
+
+    def _resolve(self, value):
+        if value.startswith("[") and value.endswith("]"):
+            return os.path.join(self.launcher.libraries_dir, maven_path(value[1:-1]))
+        return re.sub(r'\{(\w+)\}', lambda m: self.data.get(m.group(1), m.group(0)), value)
+
+    def _cache_key(self, processor, jar_path, classpath, args, output_slots):
+        """Content-addressed identity of one processor invocation"""
+        digest = hashlib.sha1()
+        digest.update(f"jar:{cached_file_sha1(jar_path)}\n".encode())
+        for path in classpath:
+            digest.update(f"cp:{cached_file_sha1(path) if os.path.isfile(path) else path}\n".encode())
+        output_paths = {path: slot for slot, path in enumerate(output_slots)}
+        for arg in args:
+            if arg in output_paths:
+                digest.update(f"out:{output_paths[arg]}\n".encode())
+            elif os.path.isfile(arg):
+                digest.update(f"file:{cached_file_sha1(arg)}\n".encode())
+            else:
+                digest.update(f"arg:{arg}\n".encode())
+        return digest.hexdigest()
+
+    def _output_slots(self, args, declared):
+        """Declared outputs plus paths following output flags, in a stable order"""
+        slots = list(declared)
+        for flag, value in zip(args, args[1:]):
+            if flag in PROCESSOR_OUTPUT_FLAGS and value not in slots:
+                slots.append(value)
+        return slots
+
+    def run(self):
+        processors = [p for p in self.profile.get("processors", []) if "client" in p.get("sides", ["client"])]
+        for index, processor in enumerate(processors, 1):
+            name = processor["jar"].split(":")[1]
+            if self.status_callback: self.status_callback(f"Forge processor {index}/{len(processors)}: {name}...")
+            self._run_one(processor, name)
+        print(f"Forge processors: {self.stats['run']} run, {self.stats['cached']} restored from cache, "
+              f"{self.stats['up_to_date']} already up to date ({self.stats['seconds']:.1f}s)")
+        return self.stats
+
+    def _run_one(self, processor, name):
+        started = time.monotonic()
+        jar_path = os.path.join(self.launcher.libraries_dir, maven_path(processor["jar"]))
+        classpath = [os.path.join(self.launcher.libraries_dir, maven_path(c)) for c in processor.get("classpath", [])]
+        args = [self._resolve(a) for a in processor.get("args", [])]
+        declared = {self._resolve(k): self._resolve(v).strip("'") for k, v in processor.get("outputs", {}).items()}
+        output_slots = self._output_slots(args, declared)
+
+        # Outputs with known hashes already in place: nothing to do
+        if declared and all(os.path.isfile(p) and cached_file_sha1(p) == sha for p, sha in declared.items()):
+            self.stats["up_to_date"] += 1
+            return
+
+        key = self._cache_key(processor, jar_path, classpath, args, output_slots)
+        cache_entry = os.path.join(self.launcher.processor_cache_dir, key)
+        manifest_path = os.path.join(cache_entry, "outputs.json")
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, 'r') as f:
+                cached_outputs = json.load(f)
+            if len(cached_outputs) == len(output_slots):
+                for slot, path in enumerate(output_slots):
+                    if not (os.path.isfile(path) and cached_file_sha1(path) == cached_outputs[slot]):
+                        link_or_copy(os.path.join(cache_entry, str(slot)), path)
+                self.stats["cached"] += 1
+                self.stats["seconds"] += time.monotonic() - started
+                return
+
+        # Outputs may be hardlinks into the cache; never let the processor write through them
+        for path in output_slots:
+            if os.path.isfile(path):
+                os.remove(path)
+        command = [self.java_path, "-cp", os.pathsep.join([jar_path] + classpath), _jar_main_class(jar_path)] + args
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            tail = "\n".join((result.stdout + result.stderr).splitlines()[-15:])
+            raise Exception(f"Forge processor {name} failed with exit code {result.returncode}:\n{tail}")
+        for path, expected in declared.items():
+            if expected and cached_file_sha1(path) != expected:
+                raise Exception(f"Forge processor {name} produced {os.path.basename(path)} with an unexpected checksum")
+
+        # Store outputs so the next install with identical inputs can skip this step
+        staging = cache_entry + f".tmp{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        hashes = []
+        for slot, path in enumerate(output_slots):
+            if not os.path.isfile(path):
+                shutil.rmtree(staging, ignore_errors=True)
+                break
+            link_or_copy(path, os.path.join(staging, str(slot)))
+            hashes.append(cached_file_sha1(path))
+        else:
+            with open(os.path.join(staging, "outputs.json"), 'w') as f:
+                json.dump(hashes, f)
+            try:
+                os.replace(staging, cache_entry)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)  # Another install cached it first
+        self.stats["run"] += 1
+        self.stats["seconds"] += time.monotonic() - started
+
+# --- Modpack Installation ---
+MODRINTH_API_URL = "https://api.modrinth.com/v2"
+CURSEFORGE_API_URL = "https://api.curseforge.com/v1"
+CURSEFORGE_API_KEY_ENV = "CURSEFORGE_API_KEY"
+MODPACK_DOWNLOAD_WORKERS = 24
+MODPACK_STATE_FILE = ".catclient-modpack.json"
+# modrinth.index.json dependency keys -> loader names used by install_loader
+MRPACK_LOADERS = {"forge": "forge", "neoforge": "neoforge", "fabric-loader": "fabric", "quilt-loader": "quilt"}
+
+def _safe_join(base_dir, relative_path):
+    """Join a pack-supplied relative path, refusing anything escaping base_dir"""
+    target = os.path.abspath(os.path.join(base_dir, relative_path))
+    if os.path.commonpath([target, os.path.abspath(base_dir)]) != os.path.abspath(base_dir):
+        raise Exception(f"Refusing modpack path outside the pack directory: {relative_path}")
+    return target
+
+def _resolve_curseforge_files(file_refs, ssl_verify=False):
+    """Look up download URLs, names and hashes of CurseForge files in one batch request"""
+    api_key = os.environ.get(CURSEFORGE_API_KEY_ENV)
+    if not api_key:
+        raise Exception(f"CurseForge modpacks need an API key in the {CURSEFORGE_API_KEY_ENV} environment variable.")
+    file_ids = [ref["fileID"] for ref in file_refs if ref.get("required", True)]
+    response = fetch_json(f"{CURSEFORGE_API_URL}/mods/files", ssl_verify, headers={"x-api-key": api_key},
+                          data={"fileIds": file_ids})
+    files = []
+    for info in response.get("data", []):
+        file_id, file_name = info["id"], info["fileName"]
+        urls = [info["downloadUrl"]] if info.get("downloadUrl") else []
+        # Files whose authors disabled third-party distribution are still on the CDN
+        urls.append(f"https://edge.forgecdn.net/files/{file_id // 1000}/{file_id % 1000}/{urllib.parse.quote(file_name)}")
+        sha1 = next((h["value"] for h in info.get("hashes", []) if h.get("algo") == 1), None)
+        files.append({"path": f"mods/{file_name}", "urls": urls, "hashes": {"sha1": sha1} if sha1 else {},
+                      "size": info.get("fileLength")})
+    missing = set(file_ids) - {info["id"] for info in response.get("data", [])}
+    if missing:
+        raise Exception(f"CurseForge did not return {len(missing)} of the pack's files: {sorted(missing)[:10]}")
+    return files
+
+def read_modpack_archive(archive_path, ssl_verify=False):
+    """Normalize a Modrinth .mrpack or CurseForge zip into name, game/loader versions, files and override dirs"""
+    with zipfile.ZipFile(archive_path, 'r') as zf:
+        names = set(zf.namelist())
+        if "modrinth.index.json" in names:
+            index = json.loads(zf.read("modrinth.index.json"))
+            deps = index.get("dependencies", {})
+            loader = next(((MRPACK_LOADERS[k], v) for k, v in deps.items() if k in MRPACK_LOADERS), (None, None))
+            files = [{"path": f["path"], "urls": f.get("downloads", []), "hashes": f.get("hashes", {}),
+                      "size": f.get("fileSize")}
+                     for f in index.get("files", []) if f.get("env", {}).get("client") != "unsupported"]
+            return {"format": "mrpack", "name": index.get("name") or os.path.splitext(os.path.basename(archive_path))[0],
+                    "version": index.get("versionId"), "minecraft": deps.get("minecraft"),
+                    "loader": loader[0], "loader_version": loader[1], "files": files,
+                    "override_dirs": ["overrides/", "client-overrides/"]}
+        if "manifest.json" in names:
+            manifest = json.loads(zf.read("manifest.json"))
+            mc_info = manifest.get("minecraft", {})
+            loaders = mc_info.get("modLoaders", [])
+            primary = next((l for l in loaders if l.get("primary")), loaders[0] if loaders else None)
+            loader, loader_version = (primary["id"].split("-", 1) if primary else (None, None))
+            return {"format": "curseforge", "name": manifest.get("name") or os.path.basename(archive_path),
+                    "version": manifest.get("version"), "minecraft": mc_info.get("version"),
+                    "loader": loader, "loader_version": loader_version,
+                    "files": _resolve_curseforge_files(manifest.get("files", []), ssl_verify),
+                    "override_dirs": [manifest.get("overrides", "overrides").rstrip("/") + "/"]}
+    raise Exception(f"{os.path.basename(archive_path)} is neither a Modrinth .mrpack nor a CurseForge modpack.")
+
+def _fetch_pack_file(entry, dest_path, ssl_verify=False):
+    """Download one pack file from its mirrors and verify the strongest hash provided"""
+    hashes = entry.get("hashes", {})
+    algorithm = "sha512" if hashes.get("sha512") else ("sha1" if hashes.get("sha1") else None)
+    errors = []
+    for url in entry["urls"]:
+        try:
+            download_file(url, dest_path, f"mod ({os.path.basename(dest_path)})", ssl_verify)
+        except Exception as e:
+            errors.append(str(e))
+            continue
+        if algorithm and file_hash(dest_path, algorithm) != hashes[algorithm].lower():
+            os.remove(dest_path)
+            errors.append(f"{algorithm} mismatch from {url}")
+            continue
+        if entry.get("size") is not None and os.path.getsize(dest_path) != entry["size"]:
+            os.remove(dest_path)
+            errors.append(f"size mismatch from {url}")
+            continue
+        return
+    raise Exception(f"Could not fetch {entry['path']}: {'; '.join(errors) or 'no download URLs'}")
+
+def _pack_file_current(entry, dest_path, previous_hashes):
+    """Whether an existing pack file already matches, trusting the last install's record when sizes agree"""
+    if not os.path.isfile(dest_path):
+        return False
+    if entry.get("size") is not None and os.path.getsize(dest_path) != entry["size"]:
+        return False
+    hashes = entry.get("hashes", {})
+    if not hashes:
+        return True  # The size (if listed) is all there is to check
+    if previous_hashes == hashes:
+        return True
+    algorithm = "sha512" if hashes.get("sha512") else "sha1"
+    return file_hash(dest_path, algorithm) == hashes[algorithm].lower()
+
+def _apply_overrides(archive_path, override_dirs, pack_dir, previous_crcs):
+    """Extract override trees into the pack directory, skipping entries unchanged since the last install"""
+    applied = {}
+    with zipfile.ZipFile(archive_path, 'r') as zf:
+        for override_dir in override_dirs:
+            for info in zf.infolist():
+                if info.is_dir() or not info.filename.startswith(override_dir):
+                    continue
+                relative = info.filename[len(override_dir):]
+                dest_path = _safe_join(pack_dir, relative)
+                if previous_crcs.get(relative) != info.CRC or not os.path.isfile(dest_path):
+                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                    with zf.open(info) as src, open(dest_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                applied[relative] = info.CRC
+    return applied
+
+def fetch_modrinth_modpack(slug, game_version=None, status_callback=None, ssl_verify=False):
+    """Download the newest .mrpack of a Modrinth project; returns the local archive path"""
+    if status_callback: status_callback(f"Looking up modpack '{slug}' on Modrinth...")
+    query = f"?game_versions={urllib.parse.quote(json.dumps([game_version]))}" if game_version else ""
+    versions = fetch_json(f"{MODRINTH_API_URL}/project/{urllib.parse.quote(slug)}/version{query}", ssl_verify)
+    for version in versions:
+        pack_file = next((f for f in version.get("files", []) if f["filename"].endswith(".mrpack") and f.get("primary")), None)
+        pack_file = pack_file or next((f for f in version.get("files", []) if f["filename"].endswith(".mrpack")), None)
+        if not pack_file:
+            continue
+        archive_path = os.path.join(current_launcher().modpacks_dir, ".archives", pack_file["filename"])
+        if not os.path.isfile(archive_path) or file_hash(archive_path) != pack_file["hashes"].get("sha1"):
+            if status_callback: status_callback(f"Downloading modpack archive {pack_file['filename']}...")
+            _fetch_pack_file({"path": pack_file["filename"], "urls": [pack_file["url"]], "hashes": pack_file["hashes"]},
+                             archive_path, ssl_verify)
+        return archive_path
+    raise Exception(f"No .mrpack release found for modpack '{slug}' on Modrinth. Import the pack archive instead.")
+
+def install_modpack(source, java_path="java", status_callback=None, ssl_verify=False):
+    """Install a modpack from a .mrpack/CurseForge archive path or a Modrinth slug.
+
+    Mods are fetched in one parallel pass with hash verification, overrides are applied
+    into a per-pack game directory under modpacks/ and the loader is installed
+    through install_version. Files recorded by the previous install of the same pack
+    are reused, and files the pack no longer lists are removed.
+    Returns a dict with version_id and game_dir ready for launch_game.
+    """
+    launcher = current_launcher()
+    archive_path = source if os.path.isfile(source) else fetch_modrinth_modpack(source, None, status_callback, ssl_verify)
+    if status_callback: status_callback(f"Reading modpack {os.path.basename(archive_path)}...")
+    pack = read_modpack_archive(archive_path, ssl_verify)
+    if not pack["minecraft"]:
+        raise Exception(f"Modpack '{pack['name']}' does not declare a Minecraft version.")
+
+    pack_dir = os.path.join(launcher.modpacks_dir, re.sub(r'[^A-Za-z0-9._-]+', '_', pack["name"]).strip("_") or "modpack")
+    os.makedirs(pack_dir, exist_ok=True)
+    state_path = os.path.join(pack_dir, MODPACK_STATE_FILE)
+    previous = {"files": {}, "overrides": {}}
+    if os.path.isfile(state_path):
+        try:
+            with open(state_path, 'r') as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"Warning: Ignoring unreadable modpack state {state_path}")
+
+    version_id = install_loader(pack["minecraft"], pack["loader"], pack["loader_version"], java_path,
+                                status_callback, ssl_verify)
+
+    # --- Mods: one concurrent pass over everything that is missing or changed ---
+    pending = []
+    for entry in pack["files"]:
+        dest_path = _safe_join(pack_dir, entry["path"])
+        if not _pack_file_current(entry, dest_path, previous["files"].get(entry["path"])):
+            pending.append((entry, dest_path))
+    if status_callback: status_callback(f"Modpack '{pack['name']}': {len(pending)} of {len(pack['files'])} files to download...")
+    failures = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MODPACK_DOWNLOAD_WORKERS) as executor:
+        futures = {executor.submit(_fetch_pack_file, entry, dest_path, ssl_verify): entry for entry, dest_path in pending}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            try:
+                future.result()
+            except Exception as e:
+                failures.append(str(e))
+            if status_callback: status_callback(f"Modpack '{pack['name']}': {done}/{len(pending)} files downloaded")
+    if failures:
+        raise Exception(f"{len(failures)} modpack file(s) failed to download. First error: {failures[0]}")
+
+    # --- Remove files dropped since the previous install ---
+    current_paths = {entry["path"] for entry in pack["files"]}
+    removed = 0
+    for old_path in set(previous["files"]) - current_paths:
+        try:
+            os.remove(_safe_join(pack_dir, old_path))
+            removed += 1
+        except OSError:
+            pass
+
+    if status_callback: status_callback(f"Applying overrides for '{pack['name']}'...")
+    overrides = _apply_overrides(archive_path, pack["override_dirs"], pack_dir, previous.get("overrides", {}))
+    # Overrides the new pack version no longer ships (unless it now lists them as files)
+    for old_path in set(previous.get("overrides", {})) - set(overrides) - current_paths:
+        try:
+            os.remove(_safe_join(pack_dir, old_path))
+            removed += 1
+        except OSError:
+            pass
+
+    with open(state_path, 'w') as f:
+        json.dump({"name": pack["name"], "version": pack["version"], "version_id": version_id,
+                   "files": {entry["path"]: entry.get("hashes", {}) for entry in pack["files"]},
+                   "overrides": overrides}, f, indent=4)
+
+    if status_callback: status_callback(f"Modpack '{pack['name']}' installed ({len(pending)} downloaded, {removed} removed).")
+    return {"name": pack["name"], "version_id": version_id, "game_dir": pack_dir, "files": len(pack["files"]),
+            "downloaded": len(pending), "removed": removed}
+
+# --- Install Bundles ---
+BUNDLE_MANIFEST_NAME = "catclient-bundle.json"
+BUNDLE_SHA1_HEADER = "CATCLIENT.sha1"
+# Archive members may only land in these parts of the launcher root
+BUNDLE_ALLOWED_PREFIXES = ("versions/", "libraries/", "assets/indexes/", "assets/objects/")
+
+def resolve_version_closure(version_id):
+    """Every file a version needs offline: (absolute path, archive name, sha1 or None).
+
+    Covers the version and parent JSONs and JARs, rule-filtered libraries, natives,
+    the asset index and its objects. Raises if anything is not installed.
+    """
+    launcher = current_launcher()
+    entries = {}
+    missing = []
+
+    def add(path, expected_sha1=None):
+        relative = os.path.relpath(path, launcher.root).replace(os.sep, "/")
+        if not os.path.isfile(path):
+            missing.append(relative)
+        elif relative not in entries:
+            entries[relative] = (path, relative, expected_sha1)
+
+    chain = []
+    current = version_id
+    while current:
+        json_path = os.path.join(launcher.versions_dir, current, f"{current}.json")
+        if not os.path.isfile(json_path):
+            raise Exception(f"Version '{current}' is not installed.")
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        chain.append((current, data))
+        current = data.get("inheritsFrom")
+
+    asset_index_info = None
+    for vid, data in chain:
+        add(os.path.join(launcher.versions_dir, vid, f"{vid}.json"))  # Locally patched, hashed on export
+        jar_path = os.path.join(launcher.versions_dir, vid, f"{vid}.jar")
+        client_info = data.get("downloads", {}).get("client")
+        if client_info or os.path.isfile(jar_path):
+            add(jar_path, (client_info or {}).get("sha1"))
+        for lib in data.get("libraries", []):
+            if not library_allowed(lib):
+                continue
+            artifact = lib.get("downloads", {}).get("artifact")
+            if artifact and artifact.get("path"):
+                add(os.path.join(launcher.libraries_dir, artifact["path"]), artifact.get("sha1"))
+            native_artifact = native_artifact_for(lib)
+            if native_artifact:
+                add(os.path.join(launcher.libraries_dir, native_artifact["path"]), native_artifact.get("sha1"))
+        asset_index_info = asset_index_info or data.get("assetIndex")
+
+    if asset_index_info and asset_index_info.get("id"):
+        idx_path = os.path.join(launcher.assets_dir, "indexes", f"{asset_index_info['id']}.json")
+        add(idx_path, asset_index_info.get("sha1"))
+        if os.path.isfile(idx_path):
+            with open(idx_path, 'r') as f:
+                for info in json.load(f).get("objects", {}).values():
+                    hash_val = info.get("hash")
+                    if hash_val:
+                        add(os.path.join(launcher.assets_dir, "objects", hash_val[:2], hash_val), hash_val)
+
+    if missing:
+        raise Exception(f"Version '{version_id}' is incomplete, {len(missing)} file(s) missing, e.g. {missing[0]}. "
+                        f"Install it before exporting.")
+    return [vid for vid, _ in chain], list(entries.values())
+
+def export_version_bundle(version_id, output, status_callback=None):
+    """Stream a version's full closure into one compressed tar archive.
+
+    output is a path (.tar.xz for xz, gzip otherwise) or a writable binary file object.
+    Files are streamed straight from disk into the archive; every member carries its
+    sha1 in a PAX header so imports can verify and skip by hash.
+    """
+    chain, entries = resolve_version_closure(version_id)
+    output_path = output if isinstance(output, str) else None
+    mode = "w|xz" if output_path and output_path.endswith((".xz", ".txz")) else "w|gz"
+    total_bytes = sum(os.path.getsize(path) for path, _, _ in entries)
+    if status_callback: status_callback(f"Exporting {version_id}: {len(entries)} files, {total_bytes / (1024 * 1024):.1f} MB...")
+
+    out = open(output_path, 'wb') if output_path else output
+    try:
+        with tarfile.open(fileobj=out, mode=mode, format=tarfile.PAX_FORMAT) as tar:
+            manifest = json.dumps({"version_id": version_id, "versions": chain, "files": len(entries),
+                                   "bytes": total_bytes, "created": time.strftime('%Y-%m-%dT%H:%M:%S')}).encode("utf-8")
+            info = tarfile.TarInfo(BUNDLE_MANIFEST_NAME)
+            info.size = len(manifest)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(manifest))
+
+            for done, (path, arcname, expected_sha1) in enumerate(entries, 1):
+                info = tar.gettarinfo(path, arcname)
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                info.pax_headers = {BUNDLE_SHA1_HEADER: expected_sha1 or cached_file_sha1(path)}
+                with open(path, 'rb') as f:
+                    tar.addfile(info, f)
+                if status_callback and done % 500 == 0:
+                    status_callback(f"Exporting {version_id}: {done}/{len(entries)} files")
+    finally:
+        if output_path:
+            out.close()
+    if status_callback: status_callback(f"Exported {version_id} ({len(entries)} files).")
+    return {"version_id": version_id, "files": len(entries), "bytes": total_bytes}
+
+def import_version_bundle(source, finalize=True, status_callback=None):
+    """Stream a bundle back into the launcher root, skipping files already present by hash.
+
+    Every written file is verified against the sha1 recorded at export before it is
+    moved into place. With finalize, install_version then extracts natives (all files
+    are present, so nothing is downloaded).
+    """
+    stats = {"written": 0, "skipped": 0, "bytes": 0, "failed": []}
+    manifest = None
+    src = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        with tarfile.open(fileobj=src, mode="r|*") as tar:
+            for member in tar:
+                if member.name == BUNDLE_MANIFEST_NAME:
+                    manifest = json.load(tar.extractfile(member))
+                    if status_callback: status_callback(f"Importing {manifest['version_id']} ({manifest['files']} files)...")
+                    continue
+                if not member.isfile():
+                    continue
+                if not member.name.startswith(BUNDLE_ALLOWED_PREFIXES) or ".." in member.name.split("/"):
+                    stats["failed"].append(f"{member.name}: outside the launcher root")
+                    continue
+                expected_sha1 = member.pax_headers.get(BUNDLE_SHA1_HEADER)
+                dest_path = os.path.join(current_launcher().root, *member.name.split("/"))
+
+                if os.path.isfile(dest_path) and os.path.getsize(dest_path) == member.size:
+                    # Objects are content-addressed; everything else is compared by hash
+                    if member.name.startswith("assets/objects/") or cached_file_sha1(dest_path) == expected_sha1:
+                        stats["skipped"] += 1
+                        continue
+
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                part_path = f"{dest_path}.part{os.getpid()}"
+                digest = hashlib.sha1()
+                with tar.extractfile(member) as data, open(part_path, 'wb') as out:
+                    for chunk in iter(lambda: data.read(1024 * 1024), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+                if expected_sha1 and digest.hexdigest() != expected_sha1:
+                    os.remove(part_path)
+                    stats["failed"].append(f"{member.name}: sha1 mismatch")
+                    continue
+                os.replace(part_path, dest_path)
+                stats["written"] += 1
+                stats["bytes"] += member.size
+                if status_callback and stats["written"] % 500 == 0:
+                    status_callback(f"Imported {stats['written']} files...")
+    finally:
+        if isinstance(source, str):
+            src.close()
+
+    if manifest is None:
+        raise Exception("Not a CatClient install bundle (missing manifest).")
+    if stats["failed"]:
+        raise Exception(f"{len(stats['failed'])} file(s) failed verification, first: {stats['failed'][0]}")
+    if finalize:
+        install_version(manifest["version_id"], status_callback)
+    stats["version_id"] = manifest["version_id"]
+    if status_callback: status_callback(f"Imported {manifest['version_id']}: {stats['written']} written, {stats['skipped']} already present.")
+    return stats
+
+# --- Resource Telemetry ---
+TELEMETRY_INTERVAL = 1.0  # Seconds between samples
+TELEMETRY_HISTORY = 3600  # Samples kept in memory (an hour at the default interval)
+TELEMETRY_SUMMARY_POINTS = 600  # Series length written to the session file
+GC_LOG_FILE = os.path.join("logs", "catclient-gc.log")  # Relative to the game directory; no drive colons for -Xlog
+GC_PAUSE_UNIFIED = re.compile(
+    r'\[(?P<uptime>[\d.]+)s\].*?GC\(\d+\) (?P<kind>Pause(?: (?:\((?:[^()]|\([^()]*\))*\)|[A-Za-z][\w-]*))*)\s+'
+    r'(?:(?P<before>\d+)M->(?P<after>\d+)M\((?P<total>\d+)M\)\s+)?(?P<ms>[\d.]+)ms')
+# Java 8 -Xloggc lines, e.g.
+#   0.123: [GC (Allocation Failure)  33280K->5040K(125952K), 0.0043120 secs]
+#   0.456: [GC pause (G1 Evacuation Pause) (young) 24M->4M(256M), 0.0034 secs]
+#   2.301: [GC remark, 0.0012 secs]
+# Concurrent G1/CMS phases ("GC concurrent-mark-end, ...") aren't pauses and don't match
+GC_PAUSE_LEGACY = re.compile(
+    r'(?P<uptime>[\d.]+): \[(?P<kind>Full GC|GC)(?! concurrent)[^\]]*?'
+    r'(?:(?P<before>[\d.]+[BKMG])->(?P<after>[\d.]+[BKMG])\((?P<total>[\d.]+[BKMG])\))?,? (?P<secs>[\d.]+) secs\]')
+GC_SIZE_UNITS_MB = {"B": 1 / (1024 * 1024), "K": 1 / 1024, "M": 1, "G": 1024}
+
+def read_proc_io(pid):
+    """Bytes read from and written to storage by a process (Linux only, None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/io", 'r') as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {"read_bytes": int(fields["read_bytes"]), "write_bytes": int(fields["write_bytes"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def gc_log_flags(java_version, path=GC_LOG_FILE):
+    """JVM flags that write GC pauses and heap sizes to path"""
+    if java_version and java_version >= 9:
+        return [f"-Xlog:gc:file={path}:uptime,level,tags:filecount=0"]
+    return [f"-Xloggc:{path}"]
+
+def parse_gc_line(line):
+    """A GC pause as {uptime_s, kind, pause_ms, heap_before_mb, heap_after_mb, heap_total_mb}, or None"""
+    match = GC_PAUSE_UNIFIED.search(line)
+    if match:
+        event = {"uptime_s": float(match["uptime"]), "kind": match["kind"].strip(), "pause_ms": float(match["ms"])}
+        if match["after"]:
+            event.update(heap_before_mb=int(match["before"]), heap_after_mb=int(match["after"]),
+                         heap_total_mb=int(match["total"]))
+        return event
+    match = GC_PAUSE_LEGACY.search(line)
+    if match:
+        event = {"uptime_s": float(match["uptime"]), "kind": match["kind"], "pause_ms": float(match["secs"]) * 1000}
+        if match["after"]:
+            event.update(heap_before_mb=_gc_size_mb(match["before"]), heap_after_mb=_gc_size_mb(match["after"]),
+                         heap_total_mb=_gc_size_mb(match["total"]))
+        return event
+    return None
+
+def _gc_size_mb(text):
+    """Whole megabytes of a GC log size such as 33280K, 24M or 1.5G"""
+    return int(float(text[:-1]) * GC_SIZE_UNITS_MB[text[-1]])
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+class ResourceSampler:
+    """Samples a game process from /proc and follows its GC log while it runs.
+
+    Each sample holds the time since start, RSS, CPU usage (percent of one core),
+    thread count, cumulative storage I/O and the heap after the latest GC. /proc
+    fields are None off Linux; the GC log works everywhere.
+    """
+
+    def __init__(self, interval=TELEMETRY_INTERVAL, gc_log_path=None):
+        self.interval = interval
+        self.gc_log_path = gc_log_path
+        self.samples = collections.deque(maxlen=TELEMETRY_HISTORY)
+        self.gc_events = []
+        self.pid = None
+        self._gc_offset = 0
+        self._gc_partial = ""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, pid):
+        self.pid = pid
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2 + 1)
+        self._read_gc_log()
+
+    def _run(self):
+        last_cpu, last_time = None, None
+        while not self._stop.is_set():
+            now = time.monotonic()
+            stats = read_proc_stats(self.pid)
+            io_stats = read_proc_io(self.pid) or {}
+            self._read_gc_log()
+            cpu_percent = None
+            if stats and last_cpu is not None and now > last_time:
+                cpu_percent = (stats["cpu_seconds"] - last_cpu) / (now - last_time) * 100
+            if stats:
+                last_cpu, last_time = stats["cpu_seconds"], now
+            with self._lock:
+                heap = next((e for e in reversed(self.gc_events) if "heap_after_mb" in e), {})
+                self.samples.append({
+                    "t": round(now - self._started, 2),
+                    "rss_mb": stats["rss_mb"] if stats else None,
+                    "cpu_percent": cpu_percent,
+                    "threads": stats["threads"] if stats else None,
+                    "read_bytes": io_stats.get("read_bytes"),
+                    "write_bytes": io_stats.get("write_bytes"),
+                    "heap_after_gc_mb": heap.get("heap_after_mb"),
+                    "heap_total_mb": heap.get("heap_total_mb"),
+                })
+            self._stop.wait(self.interval)
+
+    def _read_gc_log(self):
+        """Parse lines appended to the GC log since the last call"""
+        if not self.gc_log_path:
+            return
+        try:
+            with open(self.gc_log_path, 'r', errors="replace") as f:
+                f.seek(self._gc_offset)
+                chunk = f.read()
+                self._gc_offset = f.tell()
+        except OSError:
+            return
+        lines = (self._gc_partial + chunk).split("\n")
+        self._gc_partial = lines.pop()  # Keep an unfinished last line for the next read
+        events = [e for e in map(parse_gc_line, lines) if e]
+        if events:
+            with self._lock:
+                self.gc_events.extend(events)
+
+    def snapshot(self):
+        """Copies of the samples and GC events so far, safe to use from the UI thread"""
+        with self._lock:
+            return list(self.samples), list(self.gc_events)
+
+    def summary(self):
+        samples, events = self.snapshot()
+        rss = [s["rss_mb"] for s in samples if s["rss_mb"] is not None]
+        cpu = [s["cpu_percent"] for s in samples if s["cpu_percent"] is not None]
+        pauses = [e["pause_ms"] for e in events]
+        live = [e["heap_after_mb"] for e in events if "heap_after_mb" in e]
+        last_io = next((s for s in reversed(samples) if s["read_bytes"] is not None), {})
+        summary = {
+            "duration_s": samples[-1]["t"] if samples else 0,
+            "samples": len(samples),
+            "rss_peak_mb": round(max(rss), 1) if rss else None,
+            "rss_avg_mb": round(statistics.fmean(rss), 1) if rss else None,
+            "cpu_avg_percent": round(statistics.fmean(cpu), 1) if cpu else None,
+            "cpu_peak_percent": round(max(cpu), 1) if cpu else None,
+            "threads_peak": max((s["threads"] for s in samples if s["threads"] is not None), default=None),
+            "io_read_mb": round(last_io["read_bytes"] / (1024 * 1024), 1) if last_io else None,
+            "io_write_mb": round(last_io["write_bytes"] / (1024 * 1024), 1) if last_io else None,
+            "gc_pauses": len(pauses),
+            "gc_pause_total_ms": round(sum(pauses), 1) if pauses else None,
+            "gc_pause_max_ms": round(max(pauses), 1) if pauses else None,
+            "gc_pause_p95_ms": round(_percentile(pauses, 0.95), 1) if pauses else None,
+            "heap_live_peak_mb": max(live) if live else None,
+            "heap_committed_peak_mb": max((e["heap_total_mb"] for e in events if "heap_total_mb" in e), default=None),
+        }
+        if live:
+            # Leave the collector about three times the live set, in RAM spinner steps
+            summary["suggested_ram_mb"] = max(1024, -(-max(live) * 3 // 512) * 512)
+        return summary
+
+    def write_session(self, path, extra=None):
+        """Write the summary plus a thinned copy of the series to a JSON file"""
+        samples, events = self.snapshot()
+        step = max(1, len(samples) // TELEMETRY_SUMMARY_POINTS)
+        session = dict(extra or {})
+        session.update(summary=self.summary(), interval_s=self.interval, samples=samples[::step],
+                       gc_events=events[-TELEMETRY_SUMMARY_POINTS:])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(session, f, indent=1)
+        return path
+
+# --- Game Process Supervision ---
+LOG_RING_BUFFER_LINES = 2000
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Log lines marking startup milestones (first match wins)
+STARTUP_MARKERS = {
+    "window": [
+        re.compile(r"Backend library: LWJGL"),          # 1.13+
+        re.compile(r"LWJGL Version: "),                 # Legacy LWJGL 2
+    ],
+    "main_menu": [
+        re.compile(r"Sound engine started"),
+        re.compile(r"Created: \d+x\d+x\d+ minecraft:textures/atlas/"),
+    ],
+}
+CRASH_MARKERS = [
+    re.compile(r"---- Minecraft Crash Report ----"),
+    re.compile(r"#@!@# Game crashed!"),
+    re.compile(r"A fatal error has been detected by the Java Runtime Environment"),
+]
+
+class GameProcessSupervisor:
+    """Runs the game process, captures its output and records crash/startup metrics."""
+
+    def __init__(self, command, cwd, version_id, status_callback=None, on_exit=None,
+                 launch_info=None, echo=True, popen_kwargs=None, log_name=None, sampler=None,
+                 cpu_affinity=None, niceness=None):
+        self.command = command
+        self.cwd = cwd
+        self.version_id = version_id
+        self.log_name = log_name or version_id
+        self.status_callback = status_callback
+        self.on_exit = on_exit
+        self.launch_info = launch_info or {}
+        self.echo = echo
+        self.popen_kwargs = popen_kwargs or {}
+        self.cpu_affinity = cpu_affinity
+        self.niceness = niceness
+        self.sampler = sampler
+        self.session_file = None
+        self.process = None
+        self.lines = collections.deque(maxlen=LOG_RING_BUFFER_LINES)
+        self.milestones = {}
+        self.crash_lines = []
+        self.metrics = None
+        self._lock = threading.Lock()
+        self._exited = threading.Event()
+        self._logger = None
+        self._log_handler = None
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    @property
+    def returncode(self):
+        return self.process.returncode if self.process else None
+
+    def start(self):
+        """Start the process plus its output readers and exit watcher"""
+        os.makedirs(current_launcher().logs_dir, exist_ok=True)
+        log_path = os.path.join(current_launcher().logs_dir, f"{self.log_name}.log")
+        self._logger = logging.getLogger(f"catclient.game.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._log_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        self._log_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(self._log_handler)
+        self._logger.info(f"=== Launch of {self.version_id} at {time.strftime('%Y-%m-%d %H:%M:%S')} ===")
+
+        self.started_at = time.time()
+        self._start_monotonic = time.monotonic()
+        try:
+            self.process = subprocess.Popen(self.command, cwd=self.cwd, stdout=subprocess.PIPE,
+                                            stderr=subprocess.PIPE, stdin=subprocess.DEVNULL, **self.popen_kwargs)
+        except Exception:
+            self._close_log()
+            raise
+        place_process(self.process.pid, self.cpu_affinity, self.niceness)
+
+        self._readers = [
+            threading.Thread(target=self._read_stream, args=(self.process.stdout, "out"), daemon=True),
+            threading.Thread(target=self._read_stream, args=(self.process.stderr, "err"), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+        if self.sampler:
+            self.sampler.start(self.process.pid)
+        threading.Thread(target=bind_launcher(self._watch), daemon=True).start()
+        return self
+
+    def _read_stream(self, stream, name):
+        for raw in iter(stream.readline, b''):
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            elapsed = time.monotonic() - self._start_monotonic
+            with self._lock:
+                self.lines.append((name, line))
+                for milestone, patterns in STARTUP_MARKERS.items():
+                    if milestone not in self.milestones and any(p.search(line) for p in patterns):
+                        self.milestones[milestone] = round(elapsed, 3)
+                        if self.status_callback:
+                            self.status_callback(f"{self.version_id}: reached {milestone.replace('_', ' ')} after {elapsed:.1f}s")
+                if any(p.search(line) for p in CRASH_MARKERS):
+                    self.crash_lines.append(line)
+            self._logger.info(f"[{name}] {line}")
+            if self.echo:
+                print(line)
+        stream.close()
+
+    def _find_crash_files(self):
+        """Crash reports and JVM error logs written since this launch started"""
+        found = []
+        candidates = []
+        crash_dir = os.path.join(self.cwd, "crash-reports")
+        if os.path.isdir(crash_dir):
+            candidates.extend(os.path.join(crash_dir, name) for name in os.listdir(crash_dir))
+        candidates.append(os.path.join(self.cwd, f"hs_err_pid{self.pid}.log"))
+        for path in candidates:
+            try:
+                if os.path.getmtime(path) >= self.started_at - 1:
+                    found.append(path)
+            except OSError:
+                continue
+        return sorted(found)
+
+    def _watch(self):
+        returncode = self.process.wait()
+        for reader in self._readers:
+            reader.join(timeout=5)
+        crash_files = self._find_crash_files()
+        crashed = returncode != 0 or bool(crash_files) or bool(self.crash_lines)
+        self.metrics = {
+            "version_id": self.version_id,
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            "pid": self.pid,
+            "time_to_window_s": self.milestones.get("window"),
+            "time_to_main_menu_s": self.milestones.get("main_menu"),
+            "duration_s": round(time.monotonic() - self._start_monotonic, 3),
+            "exit_code": returncode,
+            "crashed": crashed,
+            "crash_files": crash_files,
+        }
+        self.metrics.update(self.launch_info)
+        if self.sampler:
+            self.sampler.stop()
+            telemetry = self.sampler.summary()
+            self.metrics.update({f"telemetry_{key}": value for key, value in telemetry.items()
+                                 if key in ("rss_peak_mb", "cpu_avg_percent", "gc_pause_total_ms",
+                                            "gc_pause_max_ms", "heap_live_peak_mb")})
+            session_path = os.path.join(current_launcher().logs_dir, "sessions",
+                                        f"{self.log_name}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}.json")
+            try:
+                self.session_file = self.sampler.write_session(session_path, {"version_id": self.version_id,
+                                                                              "launch": self.launch_info})
+            except OSError as e:
+                print(f"Warning: Could not write session telemetry: {e}")
+        record_launch_metrics(self.metrics)
+        self._logger.info(f"=== Process exited with code {returncode}{' (crashed)' if crashed else ''} ===")
+        self._close_log()
+        self._exited.set()
+        if self.status_callback:
+            if crashed:
+                self.status_callback(f"Minecraft {self.version_id} crashed (exit code {returncode})")
+            else:
+                self.status_callback(f"Minecraft {self.version_id} exited normally")
+        if self.on_exit:
+            self.on_exit(self)
+
+    def _close_log(self):
+        if self._log_handler:
+            self._logger.removeHandler(self._log_handler)
+            self._log_handler.close()
+            self._log_handler = None
+
+    def wait(self, timeout=None):
+        """Wait for the process to exit and its metrics to be recorded; returns the exit code"""
+        self._exited.wait(timeout)
+        return self.returncode
+
+    def tail(self, count=50):
+        """Last captured output lines"""
+        with self._lock:
+            return [line for _, line in list(self.lines)[-count:]]
+
+    def terminate(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+def record_launch_metrics(metrics):
+    """Append one launch record to the metrics log"""
+    try:
+        with open(current_launcher().launch_metrics_file, 'a') as f:
+            f.write(json.dumps(metrics) + "\n")
+    except Exception as e:
+        print(f"Warning: Could not record launch metrics: {e}")
+
+def load_launch_metrics(version_id=None):
+    """Read back recorded launches, optionally for one version"""
+    launcher = current_launcher()
+    records = []
+    if not os.path.isfile(launcher.launch_metrics_file):
+        return records
+    with open(launcher.launch_metrics_file, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if version_id is None or record.get("version_id") == version_id:
+                records.append(record)
+    return records
+
+def summarize_launch_metrics(version_id=None):
+    """Median startup times grouped by version, JVM flag set and prefetch, for spotting regressions.
+
+    Groups that prefetched also get the median seconds saved against launches of the
+    same version and flags without prefetch (None until there are some).
+    """
+    groups = {}
+    for record in load_launch_metrics(version_id):
+        key = (record.get("version_id"), record.get("flags_hash"), bool(record.get("prefetch")))
+        groups.setdefault(key, []).append(record)
+    summary = []
+    for (vid, flags_hash, prefetch), records in sorted(groups.items(), key=lambda item: tuple(str(k) for k in item[0])):
+        def median_of(field):
+            values = [r[field] for r in records if r.get(field) is not None]
+            return statistics.median(values) if values else None
+        summary.append({
+            "version_id": vid,
+            "flags_hash": flags_hash,
+            "prefetch": prefetch,
+            "jvm_profile": records[-1].get("jvm_profile"),
+            "launches": len(records),
+            "crashes": sum(1 for r in records if r.get("crashed")),
+            "median_time_to_window_s": median_of("time_to_window_s"),
+            "median_time_to_main_menu_s": median_of("time_to_main_menu_s"),
+            "median_prefetch_bytes": median_of("prefetch_bytes"),
+        })
+    baselines = {(entry["version_id"], entry["flags_hash"]): entry for entry in summary if not entry["prefetch"]}
+    for entry in summary:
+        if not entry["prefetch"]:
+            continue
+        baseline = baselines.get((entry["version_id"], entry["flags_hash"]))
+        for milestone in ("time_to_window_s", "time_to_main_menu_s"):
+            with_prefetch = entry[f"median_{milestone}"]
+            without = baseline and baseline[f"median_{milestone}"]
+            entry[f"prefetch_saved_{milestone}"] = (round(without - with_prefetch, 3)
+                                                    if with_prefetch is not None and without is not None else None)
+    return summary
+
+# --- Page Cache Prefetch ---
+PREFETCH_WORKERS = 8
+PREFETCH_WAIT_SECONDS = 2.0
+PREFETCH_ASSET_BUDGET_MB = 64
+
+def _prefetch_file(path):
+    """Pull one file into the page cache; returns the number of bytes covered"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+        else:
+            # No fadvise (macOS): a sequential read populates the unified buffer cache
+            while os.read(fd, 1024 * 1024):
+                pass
+        return size
+    finally:
+        os.close(fd)
+
+class PrefetchJob:
+    """Warms the page cache for a list of files on a background thread pool."""
+
+    def __init__(self, paths, workers=PREFETCH_WORKERS):
+        self.paths = list(dict.fromkeys(p for p in paths if p))
+        self.workers = workers
+        self.files = 0
+        self.bytes = 0
+        self.seconds = None
+        self._done = threading.Event()
+
+    def start(self):
+        self._started = time.monotonic()
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for size in executor.map(self._prefetch_quietly, self.paths):
+                    if size is not None:
+                        self.files += 1
+                        self.bytes += size
+        finally:
+            self.seconds = time.monotonic() - self._started
+            self._done.set()
+
+    @staticmethod
+    def _prefetch_quietly(path):
+        try:
+            return _prefetch_file(path)
+        except OSError:
+            return None
+
+    def wait(self, timeout=PREFETCH_WAIT_SECONDS):
+        """Wait (bounded) for the warmup to finish and report what it covered.
+
+        overlap_s is the part of the warmup that ran while the launcher was still
+        building arguments, i.e. disk time taken off the JVM's critical path.
+        """
+        waited_from = time.monotonic()
+        completed = self._done.wait(timeout)
+        wait_s = time.monotonic() - waited_from
+        elapsed = self.seconds if completed else time.monotonic() - self._started
+        return {
+            "prefetch_files": self.files,
+            "prefetch_bytes": self.bytes,
+            "prefetch_seconds": round(elapsed, 3),
+            "prefetch_overlap_s": round(max(0.0, elapsed - wait_s), 3),
+            "prefetch_wait_s": round(wait_s, 3),
+            "prefetch_completed": completed,
+        }
+
+def _java_runtime_files(java_path):
+    """The JDK's big runtime image (lib/modules or rt.jar) for the given java executable"""
+    resolved = shutil.which(java_path) or java_path
+    java_home = os.path.dirname(os.path.dirname(os.path.realpath(resolved)))
+    candidates = [os.path.join(java_home, "lib", "modules"), os.path.join(java_home, "jre", "lib", "rt.jar"),
+                  os.path.join(java_home, "lib", "rt.jar")]
+    return [path for path in candidates if os.path.isfile(path)]
+
+def startup_asset_paths(asset_index_id, budget_mb=PREFETCH_ASSET_BUDGET_MB):
+    """Object store paths of the startup-critical assets of an index, smallest first, within budget"""
+    launcher = current_launcher()
+    idx_path = os.path.join(launcher.assets_dir, "indexes", f"{asset_index_id}.json")
+    try:
+        with open(idx_path, 'r') as f:
+            objects = json.load(f).get("objects", {})
+    except (OSError, json.JSONDecodeError):
+        return []
+    hot = sorted((info.get("size", 0), info["hash"]) for name, info in objects.items()
+                 if info.get("hash") and name.startswith(STARTUP_ASSET_PREFIXES))
+    paths, budget = [], budget_mb * 1024 * 1024
+    for size, hash_val in hot:
+        if size > budget:
+            break
+        budget -= size
+        paths.append(os.path.join(launcher.assets_dir, "objects", hash_val[:2], hash_val))
+    return paths
 
-# --- Lunar Client Support ---
-def setup_lunar_client(version_id, status_callback=None):
-    """Set up necessary files for Lunar Client compatibility"""
-    if status_callback: status_callback(f"Setting up Lunar Client compatibility for {version_id}...")
-    
-    # Create Lunar Client directory structure
-    lunar_dir = os.path.expanduser("~/.lunarclient")
-    lunar_offline_dir = os.path.join(lunar_dir, "offline")
-    lunar_jre_dir = os.path.join(lunar_dir, "jre")
-    
-    os.makedirs(lunar_offline_dir, exist_ok=True)
-    os.makedirs(lunar_jre_dir, exist_ok=True)
-    
-    # Create offline mode marker file if it doesn't exist
-    offline_marker = os.path.join(lunar_offline_dir, ".offline")
-    if not os.path.exists(offline_marker):
-        with open(offline_marker, 'w') as f:
-            f.write("1")  # Just a marker file
-    
-    # Create symbolic link to the Minecraft versions directory
-    lunar_versions_dir = os.path.join(lunar_dir, "game-versions")
-    if not os.path.exists(lunar_versions_dir):
+def place_process(pid, cpu_affinity=None, niceness=None):
+    """Pin a started process to CPUs and/or lower its priority.
+
+    Done from the launcher right after Popen instead of in a preexec_fn, which can
+    deadlock while other launcher threads are running. Both settings are per thread
+    on Linux, so they go to every thread the process has so far; threads it starts
+    later inherit them.
+    """
+    if not cpu_affinity and not niceness:
+        return
+    if os.name != "posix":
+        print("Warning: CPU affinity and niceness are only supported on POSIX systems.")
+        return
+    task_dir = f"/proc/{pid}/task"
+    tids = [int(tid) for tid in os.listdir(task_dir)] if os.path.isdir(task_dir) else [pid]
+    for tid in tids:
         try:
-            os.symlink(VERSIONS_DIR, lunar_versions_dir)
-        except Exception as e:
-            print(f"Warning: Could not create symlink to versions directory: {e}")
-    
-    # Create settings json if needed
-    settings_path = os.path.join(lunar_dir, "settings.json")
-    if not os.path.exists(settings_path):
-        default_settings = {
-            "gameDir": mc_dir,
-            "jreDir": lunar_jre_dir,
-            "width": 854,
-            "height": 480,
-            "lastVersion": version_id,
-            "offline": True
+            if cpu_affinity and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(tid, cpu_affinity)
+            if niceness:
+                os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + niceness)
+        except ProcessLookupError:
+            continue  # Thread already exited
+        except OSError as e:
+            print(f"Warning: Could not set CPU affinity/niceness of process {pid}: {e}")
+            return
+
+def read_proc_stats(pid):
+    """RSS, CPU time and thread count of a process from /proc (Linux only, None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        clock_ticks = os.sysconf("SC_CLK_TCK")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        return {
+            "pid": pid,
+            "cpu_seconds": (int(fields[11]) + int(fields[12])) / clock_ticks,  # utime + stime
+            "threads": int(fields[17]),
+            "rss_mb": int(fields[21]) * page_size / (1024 * 1024),
         }
-        
-        try:
-            with open(settings_path, 'w') as f:
-                json.dump(default_settings, f, indent=4)
-        except Exception as e:
-            print(f"Warning: Could not create Lunar Client settings: {e}")
-    
-    if status_callback: status_callback(f"Lunar Client setup complete for {version_id}")
+    except (OSError, IndexError, ValueError):
+        return None
 
 # --- Game Launch Logic ---
-def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=None, server_ip=None, port=None, 
-               status_callback=None, use_rosetta=False, lunar_client=False, ssl_verify=False):
-    """Constructs and executes the Minecraft launch command."""
+def launch_game(version_id, account, ram_mb=None, java_path="java", game_dir=None, server_ip=None, port=None, 
+               status_callback=None, use_rosetta=False, lunar_client=False, ssl_verify=False,
+               jvm_profile=None, gc=None, jvm_overrides=None, on_exit=None,
+               install=True, instance_name=None, cpu_affinity=None, niceness=None, echo_output=True,
+               prefetch=True, stream_assets=False, telemetry=True, telemetry_interval=TELEMETRY_INTERVAL,
+               gc_log=False):
+    """Constructs and executes the Minecraft launch command.
+
+    ram_mb is the max heap (None lets the tuning profile size it from the mod count),
+    jvm_profile selects an entry of JVM_TUNING_PROFILES, gc forces a collector and
+    jvm_overrides is a list of raw JVM flags replacing the generated ones.
+    Returns the GameProcessSupervisor of the started process; on_exit is called with
+    it once the process has exited and its metrics are recorded.
+    cpu_affinity (a set of CPU ids) and niceness apply to the game process on Linux.
+    prefetch warms the page cache for the classpath, natives and startup assets first.
+    stream_assets starts the game once the critical files are in place (see install_version).
+    telemetry samples the process every telemetry_interval seconds (see ResourceSampler);
+    gc_log additionally makes the JVM log GC pauses for it to parse.
+    """
+    launcher = current_launcher()
     if status_callback: status_callback(f"Preparing to launch {version_id}...")
 
-    effective_game_dir = game_dir if game_dir and os.path.isdir(game_dir) else mc_dir
+    effective_game_dir = game_dir if game_dir and os.path.isdir(game_dir) else launcher.root
     print(f"Using game directory: {effective_game_dir}")
 
     if lunar_client:
         setup_lunar_client(version_id, status_callback)
     
-    try:
-        install_version(version_id, status_callback, ssl_verify)
-    except Exception as e:
-        raise Exception(f"Failed to ensure version '{version_id}' is installed before launch: {e}")
+    if install:
+        try:
+            install_version(version_id, status_callback, ssl_verify, stream_assets)
+        except Exception as e:
+            raise Exception(f"Failed to ensure version '{version_id}' is installed before launch: {e}")
 
-    version_folder = os.path.join(VERSIONS_DIR, version_id)
+    missing = _catalog_call(launcher.catalog.missing, version_id) or {}
+    for kind, info in missing.items():
+        message = f"{info['files']} {kind} files ({info['bytes'] / (1024 * 1024):.1f} MB) of {version_id} are not downloaded"
+        print(f"{'Note' if kind == 'asset' else 'Warning'}: {message}")
+        if kind != "asset" and status_callback: status_callback(f"Warning: {message}")
+
+    version_folder = os.path.join(launcher.versions_dir, version_id)
     version_json_path = os.path.join(version_folder, f"{version_id}.json")
     if not os.path.isfile(version_json_path):
         raise Exception(f"Launch aborted: Version JSON not found for '{version_id}' at {version_json_path}")
@@ -484,7 +3402,7 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
     inherits_from = vdata.get("inheritsFrom")
     if inherits_from:
         try:
-            parent_json_path = os.path.join(VERSIONS_DIR, inherits_from, f"{inherits_from}.json")
+            parent_json_path = os.path.join(launcher.versions_dir, inherits_from, f"{inherits_from}.json")
             with open(parent_json_path, 'r') as pf:
                 parent_data = json.load(pf)
             if not main_class:
@@ -496,25 +3414,13 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
 
     natives_dir_absolute = os.path.abspath(os.path.join(version_folder, "natives"))
     for lib in all_libraries:
-        rules = lib.get("rules", [])
-        allowed = True
-        if rules:
-            allowed = False
-            for rule in rules:
-                action = rule.get("action")
-                os_rule = rule.get("os", {})
-                if action == "allow":
-                    if not os_rule or os_rule.get("name") == 'osx':
-                        allowed = True; break
-                    else: allowed = False
-                elif action == "disallow":
-                    if not os_rule or os_rule.get("name") == 'osx':
-                         allowed = False; break
-            if not allowed: continue
+        # Same rules as install_version, so launch never expects a library install skipped
+        if not library_allowed(lib):
+            continue
 
         artifact = lib.get("downloads", {}).get("artifact")
         if artifact and artifact.get("path"):
-            lib_file = os.path.join(LIBRARIES_DIR, artifact["path"])
+            lib_file = os.path.join(launcher.libraries_dir, artifact["path"])
             if os.path.isfile(lib_file):
                 classpath.add(os.path.abspath(lib_file))
 
@@ -522,10 +3428,18 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
     if os.path.isfile(version_jar_path):
         classpath.add(os.path.abspath(version_jar_path))
     elif inherits_from:
-         parent_jar_path = os.path.join(VERSIONS_DIR, inherits_from, f"{inherits_from}.jar")
+         parent_jar_path = os.path.join(launcher.versions_dir, inherits_from, f"{inherits_from}.jar")
          if os.path.isfile(parent_jar_path):
               classpath.add(os.path.abspath(parent_jar_path))
 
+    # Warm the page cache for the classpath, natives and startup assets while the arguments are built
+    prefetch_job = None
+    if prefetch:
+        asset_index_info = vdata.get("assetIndex") or parent_data.get("assetIndex", {})
+        native_files = [os.path.join(root, name) for root, _, names in os.walk(natives_dir_absolute) for name in names]
+        prefetch_job = PrefetchJob(_java_runtime_files(java_path) + sorted(classpath) + native_files
+                                   + startup_asset_paths(asset_index_info.get("id", "legacy"))).start()
+
     args_data = vdata.get("arguments", {})
     parent_args_data = parent_data.get("arguments", {})
 
@@ -538,6 +3452,9 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
         print("Using legacy minecraftArguments format.")
 
     asset_index_id = (vdata.get("assetIndex") or parent_data.get("assetIndex", {})).get("id", "legacy")
+    # Very old versions (pre-1.6 index) load sounds from <game_dir>/resources
+    materialize_legacy_assets(asset_index_id, effective_game_dir, status_callback)
+    game_assets_dir = legacy_assets_dir(asset_index_id, effective_game_dir) or os.path.abspath(launcher.assets_dir)
     auth_uuid = account.get("uuid", "invalid-uuid")
     auth_token = account.get("token", "invalid-token")
 
@@ -551,33 +3468,31 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
         "${auth_player_name}": account.get("username", "Player"),
         "${version_name}": version_id,
         "${game_directory}": effective_game_dir,
-        "${assets_root}": os.path.abspath(ASSETS_DIR),
+        "${assets_root}": os.path.abspath(launcher.assets_dir),
         "${assets_index_name}": asset_index_id,
+        "${game_assets}": game_assets_dir,
         "${auth_uuid}": auth_uuid,
         "${auth_access_token}": auth_token,
         "${user_type}": "msa" if account.get("type") == "microsoft" else "legacy",
         "${version_type}": vdata.get("type", "release"),
-        "${library_directory}": os.path.abspath(LIBRARIES_DIR),
+        "${library_directory}": os.path.abspath(launcher.libraries_dir),
         "${classpath_separator}": os.pathsep,
         "${launcher_name}": launcher_name,
         "${launcher_version}": "1.2",
         "${natives_directory}": natives_dir_absolute,
     }
 
-    # Add M1-specific JVM args
-    processed_jvm_args = [
-        f"-Xmx{ram_mb}M",
+    # Heap/GC flags come from the selected tuning profile
+    tuning = resolve_jvm_tuning(jvm_profile, ram_mb, java_path, effective_game_dir, gc=gc, overrides=jvm_overrides)
+    for note in tuning["notes"]:
+        print(f"JVM tuning: {note}")
+    processed_jvm_args = tuning["flags"] + [
         f"-Djava.library.path={natives_dir_absolute}",
     ]
-    
-    # Add M1 specific optimizations
+
+    # Add M1 specific options
     if is_arm64():
-        processed_jvm_args.extend([
-            "-XX:+UseG1GC",
-            "-XX:MaxGCPauseMillis=200",
-            "-XX:ParallelGCThreads=4",
-            "-Dapple.awt.application.name=Minecraft"
-        ])
+        processed_jvm_args.append("-Dapple.awt.application.name=Minecraft")
     
     # Add extra args for Lunar Client
     if lunar_client:
@@ -620,6 +3535,14 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
                     processed_jvm_args.append(temp_arg)
 
     cp_string = os.pathsep.join(list(classpath))
+    gc_log_path = None
+    if telemetry and gc_log:
+        processed_jvm_args.extend(gc_log_flags(tuning["java_version"]))
+        gc_log_path = os.path.join(effective_game_dir, GC_LOG_FILE)
+        os.makedirs(os.path.dirname(gc_log_path), exist_ok=True)
+        if os.path.exists(gc_log_path):
+            os.remove(gc_log_path)  # Don't let the sampler read the previous session's pauses
+
     processed_jvm_args.append("-cp")
     processed_jvm_args.append(cp_string)
 
@@ -669,6 +3592,8 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
 
     print("\n--- Launch Command ---")
     print("Java Path:", command[0])
+    print(f"JVM Tuning: profile={tuning['profile']} gc={tuning['gc']} heap={tuning['heap_mb']}MB "
+          f"java={tuning['java_version']} cpus={tuning['cpu_count']} host_mem={tuning['host_memory_mb']}MB mods={tuning['mod_count']}")
     print("JVM Args:", processed_jvm_args)
     print("Main Class:", main_class)
     print("Game Args:", processed_game_args)
@@ -678,30 +3603,628 @@ def launch_game(version_id, account, ram_mb=1024, java_path="java", game_dir=Non
         print("Lunar Client Mode: Yes")
     print("----------------------\n")
 
+    launch_info = {
+        "jvm_profile": tuning["profile"],
+        "gc": tuning["gc"],
+        "java_version": tuning["java_version"],
+        "jvm_flags": tuning["flags"],
+        "flags_hash": hashlib.sha1(" ".join(tuning["flags"]).encode("utf-8")).hexdigest()[:12],
+    }
+    if instance_name:
+        launch_info["instance"] = instance_name
+    if prefetch_job:
+        launch_info["prefetch"] = True
+        launch_info.update(prefetch_job.wait())
+        print(f"Prefetched {launch_info['prefetch_files']} files ({launch_info['prefetch_bytes'] / (1024 * 1024):.1f} MB) "
+              f"in {launch_info['prefetch_seconds']:.2f}s, {launch_info['prefetch_overlap_s']:.2f}s overlapped with launch preparation")
+    supervisor = GameProcessSupervisor(command, effective_game_dir, version_id, status_callback=status_callback,
+                                       on_exit=on_exit, launch_info=launch_info, echo=echo_output,
+                                       log_name=instance_name,
+                                       cpu_affinity=cpu_affinity, niceness=niceness,
+                                       sampler=ResourceSampler(telemetry_interval, gc_log_path) if telemetry else None)
+
     if status_callback: status_callback(f"Launching Minecraft {version_id}...")
     try:
-        process = subprocess.Popen(command, cwd=effective_game_dir)
-        print(f"Minecraft process started with PID: {process.pid}")
+        supervisor.start()
+        print(f"Minecraft process started with PID: {supervisor.pid}")
         if status_callback: status_callback(f"Minecraft {version_id} launched!")
     except FileNotFoundError:
          raise Exception(f"Launch failed: Java executable not found at '{java_path}'. Please check Java Path setting.")
     except Exception as e:
         raise Exception(f"Launch failed: Could not start Minecraft process: {e}")
+    return supervisor
+
+
+# --- Multi-Instance Launching ---
+# Template folders the game only reads, shared between instances via symlinks
+SHARED_INSTANCE_DIRS = ["mods", "resourcepacks", "shaderpacks"]
+# Template folders mods write to at startup, copied so concurrent instances don't race on them
+COPIED_INSTANCE_DIRS = ["config"]
+# options.txt for headless load-test clients: tiny render distance, capped FPS, no sound
+LOW_FOOTPRINT_OPTIONS = {
+    "renderDistance": "2",
+    "simulationDistance": "5",
+    "maxFps": "10",
+    "graphicsMode": "0",
+    "particles": "2",
+    "soundCategory_master": "0.0",
+    "pauseOnLostFocus": "false",
+    "onboardAccessibility": "false",
+}
+
+def create_instance_dir(name, template_dir=None, options=None, base_dir=None):
+    """Create a lightweight game directory for one client instance.
+
+    Folders listed in SHARED_INSTANCE_DIRS are symlinked from template_dir; those in
+    COPIED_INSTANCE_DIRS and options.txt (then updated with options) are copied so
+    every instance can write its own.
+    Assets and libraries are always shared through the launcher root.
+    """
+    instance_dir = os.path.join(base_dir or current_launcher().instances_dir, name)
+    os.makedirs(instance_dir, exist_ok=True)
+
+    if template_dir:
+        for shared in SHARED_INSTANCE_DIRS:
+            source = os.path.abspath(os.path.join(template_dir, shared))
+            link = os.path.join(instance_dir, shared)
+            if os.path.isdir(source) and not os.path.lexists(link):
+                try:
+                    os.symlink(source, link, target_is_directory=True)
+                except OSError as e:
+                    print(f"Warning: Could not link {shared} for instance {name}, copying instead: {e}")
+                    shutil.copytree(source, link)
+        for copied in COPIED_INSTANCE_DIRS:
+            source = os.path.join(template_dir, copied)
+            target = os.path.join(instance_dir, copied)
+            if os.path.islink(target):
+                os.unlink(target)  # Linked to the template by earlier launcher versions
+            if os.path.isdir(source) and not os.path.lexists(target):
+                shutil.copytree(source, target)
+        template_options = os.path.join(template_dir, "options.txt")
+        if os.path.isfile(template_options) and not os.path.isfile(os.path.join(instance_dir, "options.txt")):
+            shutil.copy2(template_options, os.path.join(instance_dir, "options.txt"))
+
+    if options:
+        options_path = os.path.join(instance_dir, "options.txt")
+        current = {}
+        if os.path.isfile(options_path):
+            with open(options_path, 'r') as f:
+                for line in f:
+                    if ":" in line:
+                        key, value = line.rstrip("\n").split(":", 1)
+                        current[key] = value
+        current.update(options)
+        with open(options_path, 'w') as f:
+            f.writelines(f"{key}:{value}\n" for key, value in current.items())
+    return instance_dir
+
+def _instance_cpu_sets(count, cpus_per_instance):
+    """Round-robin blocks of the CPUs this process may use, one block per instance"""
+    if not cpus_per_instance or not hasattr(os, "sched_getaffinity"):
+        return [None] * count
+    available = sorted(os.sched_getaffinity(0))
+    cpu_sets = []
+    for i in range(count):
+        start = (i * cpus_per_instance) % len(available)
+        cpu_sets.append({available[(start + j) % len(available)] for j in range(min(cpus_per_instance, len(available)))})
+    return cpu_sets
+
+def launch_instances(version_id, count, java_path="java", ram_mb=None, name_prefix="client", template_dir=None,
+                     options=None, cpus_per_instance=None, niceness=None, server_ip=None, port=None,
+                     jvm_profile=None, jvm_overrides=None, stagger_seconds=0.0, status_callback=None, ssl_verify=False,
+                     prefetch=True, gc=None):
+    """Launch count isolated clients of one version, each with its own offline account.
+
+    The version is installed once up front; every instance gets a directory under
+    instances/ named <name_prefix><n> and the player name of the same form.
+    Returns the list of GameProcessSupervisors.
+    """
+    install_version(version_id, status_callback, ssl_verify)
+    cpu_sets = _instance_cpu_sets(count, cpus_per_instance)
+    supervisors = []
+    for i in range(count):
+        name = f"{name_prefix}{i + 1}"
+        if len(name) > 16:
+            raise Exception(f"Instance name '{name}' is longer than the 16 character player name limit.")
+        instance_dir = create_instance_dir(name, template_dir, options)
+        if status_callback: status_callback(f"Starting instance {i + 1}/{count}: {name}")
+        supervisors.append(launch_game(
+            version_id, make_offline_account(name), ram_mb=ram_mb, java_path=java_path, game_dir=instance_dir,
+            server_ip=server_ip, port=port, ssl_verify=ssl_verify, jvm_profile=jvm_profile, gc=gc,
+            jvm_overrides=jvm_overrides, install=False, instance_name=name, cpu_affinity=cpu_sets[i],
+            niceness=niceness, echo_output=False, prefetch=prefetch))
+        if stagger_seconds and i < count - 1:
+            time.sleep(stagger_seconds)
+    return supervisors
+
+def summarize_instances(supervisors):
+    """Aggregate state and resource usage over a set of launched instances"""
+    summary = {"instances": len(supervisors), "running": 0, "exited": 0, "crashed": 0,
+               "rss_mb": 0.0, "cpu_seconds": 0.0, "threads": 0, "per_instance": []}
+    for supervisor in supervisors:
+        entry = {"instance": supervisor.log_name, "pid": supervisor.pid, "exit_code": supervisor.returncode}
+        if supervisor.returncode is None:
+            summary["running"] += 1
+            stats = read_proc_stats(supervisor.pid)
+            if stats:
+                entry.update(stats)
+                summary["rss_mb"] += stats["rss_mb"]
+                summary["cpu_seconds"] += stats["cpu_seconds"]
+                summary["threads"] += stats["threads"]
+        else:
+            summary["exited"] += 1
+            if supervisor.metrics and supervisor.metrics.get("crashed"):
+                summary["crashed"] += 1
+        summary["per_instance"].append(entry)
+    return summary
+
+# --- Server List Ping ---
+DEFAULT_SERVER_PORT = 25565
+SERVER_PING_TIMEOUT = 3.0
+SLP_PROTOCOL_VERSION = -1  # "Unknown client version" is accepted by every server for status queries
+FORMATTING_CODE = re.compile(r'§.')
+
+def load_servers():
+    """Saved servers as a list of {"name", "address", "port"} dicts"""
+    launcher = current_launcher()
+    if not os.path.isfile(launcher.servers_file):
+        return []
+    try:
+        with open(launcher.servers_file, 'r') as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read {launcher.servers_file}: {e}. Starting with an empty server list.")
+        return []
+    servers = []
+    for entry in entries:
+        try:
+            entry["port"] = _server_port(entry.get("port") or DEFAULT_SERVER_PORT)
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"Warning: Skipping saved server {entry.get('name') or entry.get('address')}: {e}")
+            continue
+        if entry.get("address"):
+            servers.append(entry)
+    return servers
+
+def save_servers(servers):
+    try:
+        with open(current_launcher().servers_file, 'w') as f:
+            json.dump(servers, f, indent=4)
+    except Exception as e:
+        print(f"Error saving servers: {e}")
+
+def _server_port(value):
+    """value as a TCP port number; ValueError unless it is an integer from 1 to 65535"""
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid port {value!r}") from None
+    if not 0 < port < 65536:
+        raise ValueError(f"port {port} is not between 1 and 65535")
+    return port
+
+def parse_server_address(text, default_port=DEFAULT_SERVER_PORT):
+    """Split "host", "host:port" or "[v6]:port" into (host, port); ValueError for a bad port"""
+    text = text.strip()
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        return host, _server_port(rest.lstrip(":") or default_port)
+    if text.count(":") == 1:
+        host, port = text.split(":")
+        return host, _server_port(port or default_port)
+    return text, _server_port(default_port)
+
+def _pack_varint(value):
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _pack_string(text):
+    data = text.encode("utf-8")
+    return _pack_varint(len(data)) + data
+
+def _pack_packet(packet_id, payload=b""):
+    body = _pack_varint(packet_id) + payload
+    return _pack_varint(len(body)) + body
+
+async def _read_varint(reader):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ValueError("VarInt is too long")
+
+def _unpack_varint(data, offset=0):
+    """(value, offset after it) of a VarInt inside a buffer"""
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+    raise ValueError("VarInt is too long")
+
+async def _read_packet(reader):
+    """(packet id, payload) of the next packet"""
+    length = await _read_varint(reader)
+    data = await reader.readexactly(length)
+    packet_id, offset = _unpack_varint(data)
+    return packet_id, data[offset:]
+
+def _chat_text(component):
+    """Plain text of a chat component (string, dict with extra, or list)"""
+    if isinstance(component, str):
+        text = component
+    elif isinstance(component, list):
+        text = "".join(_chat_text(part) for part in component)
+    elif isinstance(component, dict):
+        text = str(component.get("text", "")) + "".join(_chat_text(part) for part in component.get("extra", []))
+    else:
+        text = ""
+    return FORMATTING_CODE.sub("", text)
+
+def _ping_result(host, port, error=None):
+    return {"host": host, "port": port, "online": False, "latency_ms": None, "motd": "", "players_online": None,
+            "players_max": None, "version": None, "protocol": None, "error": error}
+
+async def ping_server_async(host, port=DEFAULT_SERVER_PORT, timeout=SERVER_PING_TIMEOUT):
+    """Server List Ping: status JSON plus the ping/pong round trip in milliseconds"""
+    result = _ping_result(host, port)
+    connection = {}
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port)
+        connection["writer"] = writer
+        handshake = (_pack_varint(SLP_PROTOCOL_VERSION) + _pack_string(host) +
+                     struct.pack(">H", port) + _pack_varint(1))
+        writer.write(_pack_packet(0x00, handshake) + _pack_packet(0x00))
+        await writer.drain()
+        status_sent = time.perf_counter()
+        packet_id, payload = await _read_packet(reader)
+        status_rtt = (time.perf_counter() - status_sent) * 1000
+        if packet_id != 0x00:
+            raise ValueError(f"unexpected packet 0x{packet_id:02x} in reply to status request")
+        length, offset = _unpack_varint(payload)
+        status = json.loads(payload[offset:offset + length].decode("utf-8"))
+
+        result.update(online=True, latency_ms=status_rtt, motd=_chat_text(status.get("description", "")),
+                      players_online=status.get("players", {}).get("online"),
+                      players_max=status.get("players", {}).get("max"),
+                      version=status.get("version", {}).get("name"),
+                      protocol=status.get("version", {}).get("protocol"))
+
+        # The status reply includes JSON encoding time on the server; ping/pong measures the network alone
+        token = time.monotonic_ns() & 0x7FFFFFFFFFFFFFFF
+        ping_sent = time.perf_counter()
+        writer.write(_pack_packet(0x01, struct.pack(">q", token)))
+        await writer.drain()
+        try:
+            packet_id, payload = await _read_packet(reader)
+            if packet_id == 0x01 and struct.unpack(">q", payload[:8])[0] == token:
+                result["latency_ms"] = (time.perf_counter() - ping_sent) * 1000
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Some servers close after the status reply; keep its round trip
+
+    try:
+        _server_port(port)
+        await asyncio.wait_for(exchange(), timeout)
+    except asyncio.TimeoutError:
+        result["error"] = f"timed out after {timeout:g}s"
+    except (OSError, OverflowError, ValueError, IndexError, asyncio.IncompleteReadError, json.JSONDecodeError) as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        if connection.get("writer"):
+            connection["writer"].close()
+    return result
+
+def rank_servers(results):
+    """Online servers by latency first, then unreachable ones"""
+    return sorted(results, key=lambda r: (not r["online"], r["latency_ms"] if r["latency_ms"] is not None else 0))
+
+def ping_servers(servers, timeout=SERVER_PING_TIMEOUT):
+    """Ping saved-server dicts concurrently; results carry the entry's name and come back ranked"""
+    async def ping_one(server):
+        try:
+            return await ping_server_async(server["address"], _server_port(server.get("port") or DEFAULT_SERVER_PORT),
+                                           timeout)
+        except Exception as e:  # One bad entry must not take down the whole list
+            return _ping_result(server.get("address"), server.get("port"), str(e) or type(e).__name__)
+
+    async def ping_all():
+        results = await asyncio.gather(*(ping_one(server) for server in servers))
+        for server, result in zip(servers, results):
+            result["name"] = server.get("name") or server.get("address")
+        return results
+    return rank_servers(asyncio.run(ping_all())) if servers else []
+
+def fastest_server(servers, timeout=SERVER_PING_TIMEOUT):
+    """Ping result of the lowest-latency reachable server, or None"""
+    ranked = ping_servers(servers, timeout)
+    return ranked[0] if ranked and ranked[0]["online"] else None
+
+# --- Version Browser ---
+VERSION_PAGE_SIZE = 100
+VERSION_FILTER_DELAY_MS = 150
+VERSION_TYPE_LABELS = {"release": "Release", "snapshot": "Snapshot", "old_beta": "Beta", "old_alpha": "Alpha",
+                       "custom": "Custom", "modpack": "Modpack"}
+
+def version_sort_key(version_id):
+    """Natural ordering key so 1.20 sorts above 1.9 (numbers compare as numbers)"""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part)
+                 for part in re.findall(r'\d+|[A-Za-z]+', version_id))
+
+def scan_installed_versions():
+    """Installed version folders with the type and release time from their JSON (runs off the UI thread)"""
+    launcher = current_launcher()
+    installed = {}
+    if not os.path.isdir(launcher.versions_dir):
+        return installed
+    for entry in os.scandir(launcher.versions_dir):
+        json_path = os.path.join(entry.path, f"{entry.name}.json")
+        if not entry.is_dir() or not os.path.isfile(json_path):
+            continue
+        info = {"id": entry.name, "type": "custom", "releaseTime": ""}
+        try:
+            with open(json_path, 'r') as f:
+                data = json.load(f)
+            info["releaseTime"] = data.get("releaseTime", "")
+        except (OSError, json.JSONDecodeError):
+            pass
+        installed[entry.name] = info
+    return installed
+
+class VersionBrowser(ttk.Frame):
+    """Searchable version list that renders rows page by page as the user scrolls.
+
+    Entries are dicts with id, type and releaseTime; the chosen id is written to
+    variable so callers read it like they read the old combobox.
+    """
+
+    def __init__(self, parent, variable, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.variable = variable
+        self._entries = []
+        self._installed = {}
+        self._filtered = []
+        self._rendered = 0
+        self._last_query = None
+        self._filter_job = None
+
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self._schedule_filter())
+        search_row = ttk.Frame(self)
+        search_row.pack(fill="x")
+        ttk.Label(search_row, text="Search:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Entry(search_row, textvariable=self.search_var).pack(side=tk.LEFT, fill="x", expand=True)
+        self.count_var = tk.StringVar()
+        ttk.Label(search_row, textvariable=self.count_var).pack(side=tk.LEFT, padx=5)
+
+        filter_row = ttk.Frame(self)
+        filter_row.pack(fill="x", pady=2)
+        self.type_vars = {}
+        for type_name, label in VERSION_TYPE_LABELS.items():
+            var = tk.BooleanVar(value=type_name in ("release", "custom", "modpack"))
+            ttk.Checkbutton(filter_row, text=label, variable=var, command=self._refilter).pack(side=tk.LEFT, padx=2)
+            self.type_vars[type_name] = var
+        self.installed_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_row, text="Installed only", variable=self.installed_only_var,
+                        command=self._refilter).pack(side=tk.LEFT, padx=8)
+
+        tree_row = ttk.Frame(self)
+        tree_row.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(tree_row, columns=("type", "released", "installed"), height=7, selectmode="browse")
+        self.tree.heading("#0", text="Version")
+        self.tree.heading("type", text="Type")
+        self.tree.heading("released", text="Released")
+        self.tree.heading("installed", text="Installed")
+        self.tree.column("#0", width=230)
+        self.tree.column("type", width=80)
+        self.tree.column("released", width=90)
+        self.tree.column("installed", width=70, anchor="center")
+        scrollbar = ttk.Scrollbar(tree_row, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
 
+    def set_entries(self, entries):
+        """Replace the list: modpacks first, then everything else newest first"""
+        self._entries = self._sorted(entries)
+        self._refilter()
+
+    def set_installed(self, installed):
+        """Merge a background scan: marks installed versions and adds custom ones"""
+        self._installed = installed
+        known = {entry["id"] for entry in self._entries}
+        extra = [info for vid, info in installed.items() if vid not in known]
+        if extra:
+            self._entries = self._sorted(self._entries + extra)
+        self._refilter()
+
+    @staticmethod
+    def _sorted(entries):
+        modpacks = sorted((e for e in entries if e["type"] == "modpack"), key=lambda e: e["id"].lower())
+        others = sorted((e for e in entries if e["type"] != "modpack"),
+                        key=lambda e: (e.get("releaseTime") or "", version_sort_key(e["id"])), reverse=True)
+        return modpacks + others
+
+    def set(self, version_id):
+        """Select version_id, widening the filters if needed to show it"""
+        entry = next((e for e in self._entries if e["id"] == version_id), None)
+        if entry and not self.type_vars[entry["type"]].get():
+            self.type_vars[entry["type"]].set(True)
+        self.search_var.set("")
+        self._refilter()
+        self.variable.set(version_id)
+        while self._rendered < len(self._filtered) and not self.tree.exists(version_id):
+            self._render_more()
+        if self.tree.exists(version_id):
+            self.tree.selection_set(version_id)
+            self.tree.see(version_id)
+
+    def _schedule_filter(self):
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(VERSION_FILTER_DELAY_MS, self._apply_filter)
+
+    def _refilter(self):
+        self._last_query = None  # Filters changed: start again from the full list
+        self._apply_filter()
+
+    def _apply_filter(self):
+        self._filter_job = None
+        query = self.search_var.get().strip().lower()
+        # Typing more characters narrows the previous result instead of rescanning everything
+        if self._last_query is not None and query.startswith(self._last_query):
+            source = self._filtered
+        else:
+            types = {t for t, var in self.type_vars.items() if var.get()}
+            installed_only = self.installed_only_var.get()
+            source = [e for e in self._entries if e["type"] in types
+                      and (not installed_only or e["type"] == "modpack" or e["id"] in self._installed)]
+        self._filtered = [e for e in source if query in e["id"].lower()] if query else source
+        self._last_query = query
+        self.tree.delete(*self.tree.get_children())
+        self._rendered = 0
+        self._render_more()
+        self.count_var.set(f"{len(self._filtered)} shown")
+
+    def _render_more(self):
+        for entry in self._filtered[self._rendered:self._rendered + VERSION_PAGE_SIZE]:
+            installed = "yes" if entry["id"] in self._installed else ""
+            self.tree.insert("", "end", iid=entry["id"], text=entry["id"],
+                             values=(VERSION_TYPE_LABELS.get(entry["type"], entry["type"]),
+                                     (entry.get("releaseTime") or "")[:10], installed))
+        self._rendered = min(len(self._filtered), self._rendered + VERSION_PAGE_SIZE)
+
+    def _on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        if float(last) > 0.9 and self._rendered < len(self._filtered):
+            self._render_more()
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.variable.set(selection[0])
+
+# --- Telemetry Graphs ---
+TELEMETRY_REFRESH_MS = 1000
+TELEMETRY_GRAPH_WIDTH = 560
+TELEMETRY_GRAPH_HEIGHT = 110
+
+class TelemetryWindow(tk.Toplevel):
+    """Live RSS/heap, CPU and GC pause graphs of a running game's ResourceSampler"""
+
+    GRAPHS = (("Memory (MB)", (("rss_mb", "#1f77b4", "RSS"), ("heap_after_gc_mb", "#2ca02c", "Heap after GC"),
+                               ("heap_total_mb", "#98df8a", "Heap committed"))),
+              ("CPU (% of one core)", (("cpu_percent", "#d62728", "CPU"),)),
+              ("Threads", (("threads", "#9467bd", "Threads"),)))
+
+    def __init__(self, parent, supervisor):
+        super().__init__(parent)
+        self.supervisor = supervisor
+        self.title(f"Telemetry - {supervisor.version_id} (PID {supervisor.pid})")
+        self.summary_var = tk.StringVar(value="Waiting for samples...")
+        ttk.Label(self, textvariable=self.summary_var, justify=tk.LEFT).pack(fill="x", padx=8, pady=4)
+        self.canvases = []
+        for title, _ in self.GRAPHS + (("GC pauses (ms)", ()),):
+            ttk.Label(self, text=title).pack(anchor="w", padx=8)
+            canvas = tk.Canvas(self, width=TELEMETRY_GRAPH_WIDTH, height=TELEMETRY_GRAPH_HEIGHT, background="white")
+            canvas.pack(padx=8, pady=(0, 6))
+            self.canvases.append(canvas)
+        self.refresh()
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        sampler = self.supervisor.sampler
+        samples, events = sampler.snapshot()
+        for canvas, (_, series) in zip(self.canvases, self.GRAPHS):
+            self._draw_lines(canvas, samples, series)
+        self._draw_pauses(self.canvases[-1], events)
+        summary = sampler.summary()
+        self.summary_var.set(
+            f"RSS peak {summary['rss_peak_mb']} MB, CPU avg {summary['cpu_avg_percent']}%, "
+            f"threads {summary['threads_peak']}, I/O read {summary['io_read_mb']} MB / write {summary['io_write_mb']} MB\n"
+            f"GC: {summary['gc_pauses']} pauses, max {summary['gc_pause_max_ms']} ms, p95 {summary['gc_pause_p95_ms']} ms, "
+            f"live set peak {summary['heap_live_peak_mb']} MB"
+            + (f" -> suggested RAM {summary['suggested_ram_mb']} MB" if summary.get("suggested_ram_mb") else "")
+            + ("" if self.supervisor.returncode is None else f"\nProcess exited with code {self.supervisor.returncode}"))
+        if self.supervisor.returncode is None:
+            self.after(TELEMETRY_REFRESH_MS, self.refresh)
+
+    @staticmethod
+    def _draw_lines(canvas, samples, series):
+        canvas.delete("all")
+        width, height = TELEMETRY_GRAPH_WIDTH, TELEMETRY_GRAPH_HEIGHT
+        samples = samples[-width:]  # One pixel per sample
+        peak = max((s[key] for s in samples for key, _, _ in series if s.get(key) is not None), default=0)
+        if not peak:
+            return
+        scale = (height - 20) / (peak * 1.1)
+        for offset, (key, color, label) in enumerate(series):
+            points = []
+            for x, sample in enumerate(samples):
+                if sample.get(key) is not None:
+                    points.extend((x, height - 5 - sample[key] * scale))
+            if len(points) >= 4:
+                canvas.create_line(*points, fill=color, width=2)
+            canvas.create_text(5 + offset * 130, 8, text=label, fill=color, anchor="w")
+        canvas.create_text(width - 5, 8, text=f"max {peak:.0f}", anchor="e")
+
+    @staticmethod
+    def _draw_pauses(canvas, events):
+        canvas.delete("all")
+        width, height = TELEMETRY_GRAPH_WIDTH, TELEMETRY_GRAPH_HEIGHT
+        events = events[-(width // 3):]
+        peak = max((e["pause_ms"] for e in events), default=0)
+        if not peak:
+            return
+        scale = (height - 20) / (peak * 1.1)
+        for i, event in enumerate(events):
+            x = i * 3
+            canvas.create_rectangle(x, height - 5 - event["pause_ms"] * scale, x + 2, height - 5,
+                                    fill="#ff7f0e", outline="")
+        canvas.create_text(width - 5, 8, text=f"max {peak:.1f} ms", anchor="e")
 
 # --- GUI ---
+RAM_AUTO = "Auto"  # RAM field value that lets the JVM profile size the heap
+GC_PROFILE_DEFAULT = "Profile GC"
+
 class M1LauncherApp:
     def __init__(self, root):
         self.root = root
+        self.launcher = current_launcher()
         self.root.title("M1 Minecraft Launcher v1.2 (Lunar Compatible)")
         self.root.geometry("650x680")  # Increased height for new options
         
         # Try to load version manifest and show error if failed
         self.version_manifest = {"versions": []}  # Default empty
         self.ssl_verify_var = tk.BooleanVar(value=False)  # Default to no SSL verification for macOS 
+
+        # Option groups sit on tabs so the window keeps its size as groups are added
+        notebook = ttk.Notebook(root)
+        game_tab = ttk.Frame(notebook)
+        options_tab = ttk.Frame(notebook)
+        servers_tab = ttk.Frame(notebook)
+        settings_tab = ttk.Frame(notebook)
+        notebook.add(game_tab, text="Game")
+        notebook.add(options_tab, text="Launch Options")
+        notebook.add(servers_tab, text="Servers")
+        notebook.add(settings_tab, text="Settings")
         
         # --- SSL Configuration Frame ---
-        ssl_frame = ttk.LabelFrame(root, text="SSL Configuration")
+        ssl_frame = ttk.LabelFrame(settings_tab, text="SSL Configuration")
         ssl_frame.pack(fill="x", padx=10, pady=5)
         
         ttk.Checkbutton(ssl_frame, text="Verify SSL Certificates (Disable if you have SSL errors)", 
@@ -714,7 +4237,7 @@ class M1LauncherApp:
         ssl_note.grid(row=1, column=0, columnspan=2, sticky="w", padx=5, pady=2)
 
         # --- M1 Configuration Frame ---
-        m1_frame = ttk.LabelFrame(root, text="M1 Mac Configuration")
+        m1_frame = ttk.LabelFrame(settings_tab, text="M1 Mac Configuration")
         m1_frame.pack(fill="x", padx=10, pady=5)
         
         self.use_rosetta_var = tk.BooleanVar(value=False)
@@ -723,6 +4246,9 @@ class M1LauncherApp:
         # Add Lunar Client option
         self.lunar_client_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(m1_frame, text="Lunar Client Compatibility Mode", variable=self.lunar_client_var).grid(row=1, column=0, sticky="w", padx=5, pady=2)
+
+        self.stream_assets_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(m1_frame, text="Start before sounds/music finish downloading", variable=self.stream_assets_var).grid(row=1, column=1, sticky="w", padx=5, pady=2)
         
         # M1 status indicators
         if is_arm64():
@@ -742,7 +4268,7 @@ class M1LauncherApp:
         ttk.Label(m1_frame, text=f"Rosetta 2: {rosetta_text}").grid(row=3, column=0, sticky="w", padx=5, pady=2)
 
         # --- Account Frame ---
-        acct_frame = ttk.LabelFrame(root, text="Accounts")
+        acct_frame = ttk.LabelFrame(game_tab, text="Accounts")
         acct_frame.pack(fill="x", padx=10, pady=5)
 
         self.acct_type_var = tk.StringVar(value="tlauncher")
@@ -774,23 +4300,27 @@ class M1LauncherApp:
         acct_frame.columnconfigure(2, weight=1)
 
         # --- Version / Modpack Frame ---
-        ver_frame = ttk.LabelFrame(root, text="Game Version / Modpack")
+        ver_frame = ttk.LabelFrame(game_tab, text="Game Version / Modpack")
         ver_frame.pack(fill="x", padx=10, pady=5)
 
         # Version data will be populated after manifest is loaded
         self.version_var = tk.StringVar()
-        self.version_combo = ttk.Combobox(ver_frame, textvariable=self.version_var, values=[], state="readonly", width=50)
-        self.version_combo.grid(row=0, column=0, padx=5, pady=5, sticky="we")
-        
+        self.version_browser = VersionBrowser(ver_frame, self.version_var)
+        self.version_browser.grid(row=0, column=0, padx=5, pady=5, sticky="we")
+        ttk.Button(ver_frame, text="Import Modpack...", command=self.import_modpack).grid(row=0, column=1, padx=5, pady=5, sticky="n")
+        ttk.Button(ver_frame, text="Plan Download", command=self.on_plan).grid(row=0, column=2, padx=5, pady=5, sticky="n")
+        self.local_modpacks = {}
+
         ver_frame.columnconfigure(0, weight=1)
 
         # --- Launch Options Frame ---
-        options_frame = ttk.LabelFrame(root, text="Launch Options")
+        options_frame = ttk.LabelFrame(options_tab, text="Launch Options")
         options_frame.pack(fill="x", padx=10, pady=5)
 
         ttk.Label(options_frame, text="Max RAM (MB):").grid(row=0, column=0, padx=5, pady=3, sticky="e")
-        self.ram_spin = ttk.Spinbox(options_frame, from_=512, to=32768, increment=512, width=10)
-        self.ram_spin.set("4096")
+        self.ram_spin = ttk.Spinbox(options_frame, values=[RAM_AUTO] + [str(mb) for mb in range(512, 32768 + 1, 512)],
+                                    width=10)
+        self.ram_spin.set(RAM_AUTO)
         self.ram_spin.grid(row=0, column=1, pady=3, sticky="w")
 
         ttk.Label(options_frame, text="Java Path:").grid(row=1, column=0, padx=5, pady=3, sticky="e")
@@ -806,8 +4336,69 @@ class M1LauncherApp:
         self.port_entry = ttk.Entry(options_frame, width=8)
         self.port_entry.grid(row=2, column=3, padx=5, pady=3, sticky="w")
 
+        ttk.Label(options_frame, text="JVM Profile:").grid(row=3, column=0, padx=5, pady=3, sticky="e")
+        self.jvm_profile_var = tk.StringVar(value=DEFAULT_JVM_PROFILE)
+        ttk.Combobox(options_frame, textvariable=self.jvm_profile_var, values=list(JVM_TUNING_PROFILES),
+                     state="readonly", width=15).grid(row=3, column=1, padx=5, pady=3, sticky="w")
+        ttk.Button(options_frame, text="Show Flags", command=self.show_jvm_flags).grid(row=3, column=2, padx=5)
+        self.gc_var = tk.StringVar(value=GC_PROFILE_DEFAULT)
+        ttk.Combobox(options_frame, textvariable=self.gc_var, values=[GC_PROFILE_DEFAULT] + list(GC_FLAGS),
+                     state="readonly", width=15).grid(row=3, column=3, padx=5, pady=3, sticky="w")
+
+        ttk.Label(options_frame, text="Extra JVM Args:").grid(row=4, column=0, padx=5, pady=3, sticky="e")
+        self.jvm_args_entry = ttk.Entry(options_frame, width=40)
+        self.jvm_args_entry.grid(row=4, column=1, columnspan=3, padx=5, pady=3, sticky="we")
+
+        self.gc_log_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Log GC pauses", variable=self.gc_log_var).grid(row=5, column=1, padx=5, pady=3, sticky="w")
+        ttk.Button(options_frame, text="Live Graphs", command=self.show_telemetry).grid(row=5, column=2, padx=5)
+        self.prefetch_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Prefetch game files", variable=self.prefetch_var).grid(row=5, column=3, padx=5, pady=3, sticky="w")
+        self.game_supervisor = None
+
         options_frame.columnconfigure(1, weight=1)
 
+        # --- Servers Frame ---
+        servers_frame = ttk.LabelFrame(servers_tab, text="Servers")
+        servers_frame.pack(fill="x", padx=10, pady=5)
+
+        self.servers = load_servers()
+        self.server_tree = ttk.Treeview(servers_frame, columns=("address", "latency", "players", "version", "motd"),
+                                        height=4, selectmode="browse")
+        for column, heading, width in (("#0", "Name", 110), ("address", "Address", 130), ("latency", "Ping", 60),
+                                       ("players", "Players", 70), ("version", "Version", 80), ("motd", "MOTD", 180)):
+            self.server_tree.heading(column, text=heading)
+            self.server_tree.column(column, width=width)
+        self.server_tree.grid(row=0, column=0, columnspan=4, padx=5, pady=3, sticky="we")
+        self.server_tree.bind("<<TreeviewSelect>>", self._on_server_select)
+
+        ttk.Button(servers_frame, text="Save Current", command=self.on_save_server).grid(row=1, column=0, padx=5, pady=3, sticky="w")
+        ttk.Button(servers_frame, text="Remove", command=self.on_remove_server).grid(row=1, column=1, padx=5, pady=3, sticky="w")
+        self.ping_btn = ttk.Button(servers_frame, text="Ping All", command=self.ping_saved_servers)
+        self.ping_btn.grid(row=1, column=2, padx=5, pady=3, sticky="w")
+        self.auto_server_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(servers_frame, text="Join fastest server on launch",
+                        variable=self.auto_server_var).grid(row=1, column=3, padx=5, pady=3, sticky="e")
+
+        servers_frame.columnconfigure(3, weight=1)
+
+        # --- Network Frame ---
+        net_frame = ttk.LabelFrame(settings_tab, text="Network")
+        net_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Label(net_frame, text="Bandwidth Limit (KB/s, 0 = unlimited):").grid(row=0, column=0, padx=5, pady=3, sticky="e")
+        self.bandwidth_spin = ttk.Spinbox(net_frame, from_=0, to=1000000, increment=256, width=10)
+        self.bandwidth_spin.set("0")
+        self.bandwidth_spin.grid(row=0, column=1, pady=3, sticky="w")
+        ttk.Label(net_frame, text="Connections per Host:").grid(row=0, column=2, padx=5, pady=3, sticky="e")
+        self.per_host_spin = ttk.Spinbox(net_frame, from_=1, to=64, width=5)
+        self.per_host_spin.set(str(MAX_CONNECTIONS_PER_HOST))
+        self.per_host_spin.grid(row=0, column=3, pady=3, sticky="w")
+        ttk.Button(net_frame, text="Apply", command=self.apply_network_limits).grid(row=0, column=4, padx=5)
+
+        self.throughput_var = tk.StringVar(value="Throughput: idle")
+        ttk.Label(net_frame, textvariable=self.throughput_var).grid(row=1, column=0, columnspan=5, sticky="w", padx=5, pady=2)
+
         # --- Status Bar ---
         self.status_var = tk.StringVar(value="Ready")
         status_bar = ttk.Frame(root, relief=tk.SUNKEN, padding="2 2 2 2")
@@ -816,11 +4407,14 @@ class M1LauncherApp:
 
         # --- Launch Button ---
         launch_frame = ttk.Frame(root)
-        launch_frame.pack(pady=15)
+        launch_frame.pack(side=tk.BOTTOM, pady=15)
         
         self.launch_btn = ttk.Button(launch_frame, text="Launch Game", command=self.on_launch, style="Accent.TButton")
         self.launch_btn.pack(ipadx=20, ipady=10)
 
+        # Packed last so the status bar and launch button keep their space
+        notebook.pack(fill="both", expand=True, padx=10, pady=5)
+
         # --- Styling ---
         style = ttk.Style()
         try:
@@ -832,7 +4426,9 @@ class M1LauncherApp:
 
         # --- Initial Population ---
         self.refresh_account_list()
+        self.refresh_server_list()
         self.load_manifest()
+        self.update_throughput()
 
     def load_manifest(self):
         """Load version manifest and populate version list"""
@@ -846,17 +4442,10 @@ class M1LauncherApp:
             self.set_status(f"Error loading manifest: {e}", "red")
 
     def populate_version_list(self):
-        """Populate version combo box with available versions"""
+        """Populate the version browser; installed versions are scanned in the background"""
         try:
-            # Populate versions list (releases first, then snapshots)
-            release_versions = sorted([v['id'] for v in self.version_manifest['versions'] if v['type'] == 'release'], reverse=True)
-            snapshot_versions = sorted([v['id'] for v in self.version_manifest['versions'] if v['type'] == 'snapshot'], reverse=True)
-            
-            custom_versions = []
-            if os.path.isdir(VERSIONS_DIR):
-                for item in os.listdir(VERSIONS_DIR):
-                    if os.path.isdir(os.path.join(VERSIONS_DIR, item)) and item not in all_versions:
-                         custom_versions.append(item)
+            entries = [{"id": v['id'], "type": v.get('type', 'release'), "releaseTime": v.get('releaseTime', '')}
+                       for v in self.version_manifest['versions']]
 
             # Define popular modpacks
             self.popular_modpacks = {
@@ -867,20 +4456,119 @@ class M1LauncherApp:
                 "DawnCraft (Modpack)": "dawncraft",
                 "Better MC (Modpack)": "better-mc-bmc1-forge",
             }
-            modpack_names = sorted(self.popular_modpacks.keys())
+            self.popular_modpacks.update(self.local_modpacks)
+            entries += [{"id": name, "type": "modpack", "releaseTime": ""} for name in self.popular_modpacks]
 
-            combined_list = modpack_names + sorted(custom_versions, reverse=True) + release_versions + snapshot_versions
-            
-            self.version_combo['values'] = combined_list
-            
-            if release_versions:
-                 self.version_combo.set(release_versions[0])
-            elif combined_list:
-                 self.version_combo.set(combined_list[0])
+            self.version_browser.set_entries(entries)
+            latest_release = next((v['id'] for v in self.version_manifest['versions'] if v.get('type') == 'release'), None)
+            if latest_release and not self.version_var.get():
+                 self.version_browser.set(latest_release)
+
+            threading.Thread(target=bind_launcher(self._scan_versions_task), daemon=True).start()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to populate version list: {e}")
             self.set_status(f"Error populating version list: {e}", "red")
 
+    def _scan_versions_task(self):
+        """Lists installed versions off the UI thread and hands the result to the browser."""
+        try:
+            installed = scan_installed_versions()
+        except OSError as e:
+            print(f"Warning: Could not scan installed versions: {e}")
+            return
+        self.root.after(0, self.version_browser.set_installed, installed)
+
+    def import_modpack(self):
+        """Adds a local .mrpack or CurseForge zip to the version list."""
+        filename = filedialog.askopenfilename(
+            title="Select Modpack Archive",
+            filetypes=[("Modpack Archives", "*.mrpack *.zip"), ("All Files", "*.*")]
+        )
+        if not filename:
+            return
+        display_name = f"{os.path.splitext(os.path.basename(filename))[0]} (Local Modpack)"
+        self.local_modpacks[display_name] = filename
+        self.populate_version_list()
+        self.version_browser.set(display_name)
+
+    def refresh_server_list(self, results=None):
+        """Shows saved servers, in ranked order with their status when ping results are given"""
+        self.server_tree.delete(*self.server_tree.get_children())
+        by_address = {(r["host"], r["port"]): r for r in results or []}
+        order = {(r["host"], r["port"]): i for i, r in enumerate(results or [])}
+        servers = sorted(enumerate(self.servers),
+                         key=lambda item: order.get((item[1]["address"], item[1]["port"]), len(order) + item[0]))
+        for index, server in servers:
+            result = by_address.get((server["address"], server["port"]))
+            if result is None:
+                values = (f"{server['address']}:{server['port']}", "", "", "", "")
+            elif result["online"]:
+                players = f"{result['players_online']}/{result['players_max']}" if result["players_max"] is not None else ""
+                values = (f"{server['address']}:{server['port']}", f"{result['latency_ms']:.0f} ms", players,
+                          f"{result['version']} ({result['protocol']})", result["motd"].replace("\n", " "))
+            else:
+                values = (f"{server['address']}:{server['port']}", "offline", "", "", result["error"])
+            self.server_tree.insert("", "end", iid=str(index), text=server["name"], values=values)
+
+    def _on_server_select(self, event=None):
+        selection = self.server_tree.selection()
+        if not selection:
+            return
+        server = self.servers[int(selection[0])]
+        self.server_entry.delete(0, tk.END)
+        self.server_entry.insert(0, server["address"])
+        self.port_entry.delete(0, tk.END)
+        self.port_entry.insert(0, str(server["port"]))
+
+    def on_save_server(self):
+        """Adds the server in the Server IP/Port fields to the saved list."""
+        address = self.server_entry.get().strip()
+        if not address:
+            messagebox.showerror("Error", "Enter a server address to save.")
+            return
+        try:
+            host, port = parse_server_address(address, self.port_entry.get().strip() or DEFAULT_SERVER_PORT)
+        except ValueError:
+            messagebox.showerror("Error", "Invalid Port number. Must be between 1 and 65535.")
+            return
+        if any(s["address"] == host and s["port"] == port for s in self.servers):
+            self.set_status(f"{host}:{port} is already saved.", "black")
+            return
+        self.servers.append({"name": host, "address": host, "port": port})
+        save_servers(self.servers)
+        self.refresh_server_list()
+
+    def on_remove_server(self):
+        selection = self.server_tree.selection()
+        if not selection:
+            return
+        del self.servers[int(selection[0])]
+        save_servers(self.servers)
+        self.refresh_server_list()
+
+    def ping_saved_servers(self):
+        if not self.servers:
+            self.set_status("No saved servers to ping.", "black")
+            return
+        self.ping_btn.config(state="disabled")
+        self.set_status(f"Pinging {len(self.servers)} servers...", "blue")
+        threading.Thread(target=bind_launcher(self._ping_servers_task), args=(list(self.servers),), daemon=True).start()
+
+    def _ping_servers_task(self, servers):
+        """Pings all servers concurrently off the UI thread."""
+        try:
+            results = ping_servers(servers)
+            online = sum(1 for r in results if r["online"])
+            self.root.after(0, self.refresh_server_list, results)
+            self.set_status(f"{online}/{len(results)} servers reachable"
+                            + (f", fastest: {results[0]['name']} ({results[0]['latency_ms']:.0f} ms)" if online else ""), "black")
+        except Exception as e:
+            print(f"ERROR: Pinging servers failed: {e}")
+            traceback.print_exc()
+            self.set_status(f"Error pinging servers: {e}", "red")
+        finally:
+            self.root.after(0, self.ping_btn.config, {"state": "normal"})
+
     def find_java(self):
         """Find Java executable on macOS, prioritizing ARM64 Java if on M1"""
         # Common Java install locations on macOS
@@ -924,6 +4612,61 @@ class M1LauncherApp:
             self.java_entry.delete(0, tk.END)
             self.java_entry.insert(0, filename)
 
+    def selected_ram(self):
+        """Max heap in MB from the RAM field, None for automatic sizing; ValueError if not a number."""
+        value = self.ram_spin.get().strip()
+        return None if value in ("", RAM_AUTO) else int(value)
+
+    def selected_gc(self):
+        value = self.gc_var.get()
+        return None if value == GC_PROFILE_DEFAULT else value
+
+    def show_jvm_flags(self):
+        """Shows the JVM flags the selected tuning profile would apply."""
+        try:
+            ram_val = self.selected_ram()
+        except ValueError:
+            ram_val = None
+        java_path_val = self.java_entry.get().strip() or self.find_java()
+        try:
+            tuning = resolve_jvm_tuning(self.jvm_profile_var.get(), ram_val, java_path_val, gc=self.selected_gc(),
+                                        overrides=shlex.split(self.jvm_args_entry.get()))
+        except Exception as e:
+            messagebox.showerror("JVM Tuning", f"Could not resolve JVM flags: {e}")
+            return
+        details = (f"Profile: {tuning['profile']} ({JVM_TUNING_PROFILES[tuning['profile']]['description']})\n"
+                   f"Java: {tuning['java_version']}   CPUs: {tuning['cpu_count']}   Host RAM: {tuning['host_memory_mb']} MB\n\n"
+                   + "\n".join(tuning["flags"]))
+        if tuning["notes"]:
+            details += "\n\nNotes:\n" + "\n".join(tuning["notes"])
+        messagebox.showinfo("JVM Flags", details)
+
+    def apply_network_limits(self):
+        """Applies the bandwidth cap and per-host connection budget to all downloads."""
+        try:
+            limit_kb = int(self.bandwidth_spin.get())
+            per_host = int(self.per_host_spin.get())
+            if limit_kb < 0 or per_host < 1: raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Bandwidth limit must be 0 or more and connections per host at least 1.")
+            return
+        bandwidth.set_limit(limit_kb * 1024)
+        bandwidth.set_max_per_host(per_host)
+        self.set_status(f"Network limits applied: {format_rate(bandwidth.limit)}, {per_host} connections per host.", "green")
+
+    def update_throughput(self):
+        """Refreshes the live throughput line once a second."""
+        stats = bandwidth.stats()
+        if stats["active_connections"] or stats["rate"]:
+            text = (f"Throughput: {format_rate(stats['rate'])} (limit {format_rate(stats['limit'])}), "
+                    f"{stats['active_connections']} connections, {download_scheduler.pending()} queued")
+            if len(stats["shares"]) > 1:
+                text += " | " + ", ".join(f"{s['name']}: {format_rate(s['rate'])}" for s in stats["shares"])
+        else:
+            text = f"Throughput: idle (limit {format_rate(stats['limit'])})"
+        self.throughput_var.set(text)
+        self.root.after(1000, self.update_throughput)
+
     def set_status(self, message, color="black"):
         """Updates the status bar message and color."""
         self.root.after(0, self._update_status_ui, message, color)
@@ -963,7 +4706,7 @@ class M1LauncherApp:
 
     def refresh_account_list(self):
         """Reloads the account list into the combobox."""
-        display_names = [f"{acc.get('type','N/A').capitalize()}: {acc.get('username','Unknown')}" for acc in accounts]
+        display_names = [f"{acc.get('type','N/A').capitalize()}: {acc.get('username','Unknown')}" for acc in self.launcher.accounts]
         self.account_combo['values'] = display_names
         if display_names:
             current_selection = self.account_var.get()
@@ -974,6 +4717,28 @@ class M1LauncherApp:
         else:
             self.account_combo.set('')
 
+    def on_plan(self):
+        """Shows what installing the selected version would download, without downloading it."""
+        version_id = self.version_var.get()
+        if not version_id:
+            messagebox.showerror("Error", "Please select a version.")
+            return
+        if version_id in getattr(self, "popular_modpacks", {}):
+            messagebox.showinfo("Install Plan", "Download plans cover game versions; modpack files are listed by the pack itself.")
+            return
+        self.set_status(f"Planning install of {version_id}...", "blue")
+        threading.Thread(target=bind_launcher(self._plan_task), args=(version_id, self.ssl_verify_var.get()),
+                         daemon=True).start()
+
+    def _plan_task(self, version_id, ssl_verify):
+        try:
+            plan = plan_install(version_id, ssl_verify)
+        except Exception as e:
+            self.set_status(f"Could not plan {version_id}: {e}", "red")
+            return
+        self.set_status(f"{version_id}: {plan['files']} files, {format_size(plan['bytes'])} to download", "green")
+        self.root.after(0, messagebox.showinfo, "Install Plan", format_plan(plan, bandwidth.limit))
+
     def on_launch(self):
         """Handles the launch button click."""
         selected_version_display = self.version_var.get()
@@ -981,11 +4746,12 @@ class M1LauncherApp:
             messagebox.showerror("Error", "Please select a version or modpack.")
             return
 
+        accounts = self.launcher.accounts
         account_index = self.account_combo.current()
         if account_index == -1 and not accounts:
             result = messagebox.askyesno("No Account Selected", "No accounts are configured. Launch in Offline mode with username 'Player'?")
             if result:
-                selected_account = {"type": "offline", "username": "Player", "uuid": str(uuidlib.uuid3(uuidlib.NAMESPACE_DNS, "Player")), "token": "0"}
+                selected_account = make_offline_account("Player")
             else:
                 return
         elif account_index == -1 and accounts:
@@ -995,9 +4761,9 @@ class M1LauncherApp:
             selected_account = accounts[account_index]
 
         try:
-            ram_val = int(self.ram_spin.get())
+            ram_val = self.selected_ram()
         except ValueError:
-            messagebox.showerror("Error", "Invalid RAM value. Please enter a number (MB).")
+            messagebox.showerror("Error", f"Invalid RAM value. Please enter a number (MB) or {RAM_AUTO}.")
             return
 
         java_path_val = self.java_entry.get().strip() or self.find_java()
@@ -1020,6 +4786,17 @@ class M1LauncherApp:
         use_rosetta = self.use_rosetta_var.get()
         lunar_client = self.lunar_client_var.get()
         ssl_verify = self.ssl_verify_var.get()
+        jvm_profile = self.jvm_profile_var.get()
+        gc = self.selected_gc()
+        stream_assets = self.stream_assets_var.get()
+        gc_log = self.gc_log_var.get()
+        prefetch = self.prefetch_var.get()
+        server_candidates = list(self.servers) if self.auto_server_var.get() else None
+        try:
+            jvm_overrides = shlex.split(self.jvm_args_entry.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid extra JVM arguments: {e}")
+            return
 
         # Disable UI elements during launch process
         self.launch_btn.config(state="disabled")
@@ -1027,15 +4804,17 @@ class M1LauncherApp:
 
         # Run install/launch in a separate thread to keep UI responsive
         launch_thread = threading.Thread(
-            target=self._launch_task,
+            target=bind_launcher(self._launch_task),
             args=(version_to_process, is_modpack, selected_account, ram_val, java_path_val, 
-                  server_ip_val, port_val, use_rosetta, lunar_client, ssl_verify),
+                  server_ip_val, port_val, use_rosetta, lunar_client, ssl_verify, jvm_profile, jvm_overrides, stream_assets,
+                  server_candidates, gc_log, prefetch, gc),
             daemon=True
         )
         launch_thread.start()
 
     def _launch_task(self, item_to_launch, is_modpack, account, ram, java, server, port, 
-                    use_rosetta, lunar_client, ssl_verify):
+                    use_rosetta, lunar_client, ssl_verify, jvm_profile=None, jvm_overrides=None, stream_assets=False,
+                    server_candidates=None, gc_log=False, prefetch=True, gc=None):
         """Background task for installing (if needed) and launching."""
         try:
             final_version_id = None
@@ -1043,21 +4822,30 @@ class M1LauncherApp:
 
             if is_modpack:
                 self.set_status(f"Installing modpack '{item_to_launch}'...", "blue")
-                # Modpack handling logic would go here - this is simplified
-                messagebox.showinfo("Modpack Support", "Modpack installation functionality is included in the code but not fully implemented in this example.")
-                self.set_status("Ready", "black")
-                # Re-enable the launch button
-                self.root.after(0, self.launch_btn.config, {"state": "normal"}) 
-                return
-                
+                pack = install_modpack(item_to_launch, java_path=java, status_callback=self.set_status, ssl_verify=ssl_verify)
+                final_version_id = pack["version_id"]
+                game_directory = pack["game_dir"]
+                self.set_status(f"Modpack '{pack['name']}' ready. Preparing launch...", "blue")
+
             else:
                 final_version_id = item_to_launch
                 self.set_status(f"Checking installation for version '{final_version_id}'...", "blue")
-                install_version(final_version_id, status_callback=self.set_status, ssl_verify=ssl_verify)
+                install_version(final_version_id, status_callback=self.set_status, ssl_verify=ssl_verify,
+                                stream_assets=stream_assets)
                 self.set_status(f"Version '{final_version_id}' ready. Preparing launch...", "blue")
 
+            if server_candidates:
+                self.set_status(f"Pinging {len(server_candidates)} servers...", "blue")
+                ranked = ping_servers(server_candidates)
+                self.root.after(0, self.refresh_server_list, ranked)
+                if ranked and ranked[0]["online"]:
+                    server, port = ranked[0]["host"], ranked[0]["port"]
+                    self.set_status(f"Joining fastest server {ranked[0]['name']} ({ranked[0]['latency_ms']:.0f} ms)", "blue")
+                else:
+                    print("Warning: No saved server is reachable; using the Server IP field.")
+
             # Launch the game
-            launch_game(
+            self.game_supervisor = launch_game(
                 version_id=final_version_id,
                 account=account,
                 ram_mb=ram,
@@ -1068,21 +4856,305 @@ class M1LauncherApp:
                 status_callback=self.set_status,
                 use_rosetta=use_rosetta,
                 lunar_client=lunar_client,
-                ssl_verify=ssl_verify
+                ssl_verify=ssl_verify,
+                jvm_profile=jvm_profile,
+                gc=gc,
+                jvm_overrides=jvm_overrides,
+                on_exit=self._on_game_exit,
+                stream_assets=stream_assets,
+                gc_log=gc_log,
+                prefetch=prefetch
             )
 
         except Exception as e:
             error_message = f"Error during launch: {e}"
             print(f"ERROR: {error_message}")
-            import traceback
             traceback.print_exc()
             self.set_status(f"Error: {e}", "red")
             self.root.after(0, messagebox.showerror, "Launch Failed", error_message)
         finally:
             self.root.after(0, self.launch_btn.config, {"state": "normal"})
 
+    def show_telemetry(self):
+        """Opens live graphs for the game started from this window."""
+        if not self.game_supervisor or not self.game_supervisor.sampler:
+            messagebox.showinfo("Telemetry", "Launch the game first to see its resource usage.")
+            return
+        TelemetryWindow(self.root, self.game_supervisor)
+
+    def _on_game_exit(self, supervisor):
+        """Reports how the game session ended, with the output tail on crashes."""
+        metrics = supervisor.metrics
+        startup = ""
+        if metrics.get("time_to_main_menu_s") is not None:
+            startup = f" (main menu after {metrics['time_to_main_menu_s']:.1f}s)"
+        if metrics["crashed"]:
+            self.set_status(f"Minecraft crashed with exit code {metrics['exit_code']}{startup}", "red")
+            details = "\n".join(supervisor.tail(25))
+            if metrics["crash_files"]:
+                details += "\n\nCrash reports:\n" + "\n".join(metrics["crash_files"])
+            self.root.after(0, messagebox.showerror, "Minecraft Crashed",
+                            f"Minecraft exited with code {metrics['exit_code']}.\n\n{details}")
+        else:
+            suggested_ram = supervisor.sampler.summary().get("suggested_ram_mb") if supervisor.sampler else None
+            suggestion = f"; GC data suggests {suggested_ram} MB RAM" if suggested_ram else ""
+            self.set_status(f"Minecraft exited normally{startup}{suggestion}", "black")
+        if supervisor.session_file:
+            print(f"Session telemetry written to {supervisor.session_file}")
+
+# --- Headless Entry Point ---
+def _cli_instances(args):
+    load_version_manifest(args.ssl_verify)
+    supervisors = launch_instances(
+        args.version, args.count, java_path=args.java, ram_mb=args.ram, name_prefix=args.prefix,
+        template_dir=args.template, options=LOW_FOOTPRINT_OPTIONS if args.low_footprint else None,
+        cpus_per_instance=args.cpus_per_instance, niceness=args.nice, server_ip=args.server, port=args.port,
+        jvm_profile=args.profile, stagger_seconds=args.stagger, status_callback=print, ssl_verify=args.ssl_verify,
+        prefetch=not args.no_prefetch, gc=args.gc)
+    try:
+        while True:
+            summary = summarize_instances(supervisors)
+            print(f"[instances] running={summary['running']} exited={summary['exited']} crashed={summary['crashed']} "
+                  f"rss={summary['rss_mb']:.0f}MB cpu={summary['cpu_seconds']:.1f}s threads={summary['threads']}")
+            if not summary["running"]:
+                break
+            time.sleep(args.summary_interval)
+    except KeyboardInterrupt:
+        print("Stopping all instances...")
+        for supervisor in supervisors:
+            supervisor.terminate()
+        for supervisor in supervisors:
+            supervisor.wait(30)
+    summary = summarize_instances(supervisors)
+    print(json.dumps(summary, indent=4))
+    return 1 if summary["crashed"] else 0
+
+def _cli_install(args):
+    load_version_manifest(args.ssl_verify)
+    errors = {}
+    plans = {}
+    for spec in args.versions:
+        version_id = spec.partition(":")[0]
+        try:
+            plans[version_id] = plan_install(version_id, args.ssl_verify, save_metadata=True)
+        except Exception as e:
+            errors[version_id] = e
+    plan = combine_plans(plans.values())
+    print(format_plan(plan, bandwidth.limit))
+    start_bytes = bandwidth.meter.total
+
+    def install_one(version_id, weight):
+        try:
+            install_version(version_id, lambda message: None, args.ssl_verify, weight=weight)
+        except Exception as e:
+            errors[version_id] = e
+
+    threads = []
+    for spec in args.versions:
+        version_id, _, weight = spec.partition(":")
+        if version_id in errors:
+            continue
+        thread = threading.Thread(target=bind_launcher(install_one), args=(version_id, float(weight or 1.0)), daemon=True)
+        thread.start()
+        threads.append((version_id, thread))
+    while any(thread.is_alive() for _, thread in threads):
+        stats = bandwidth.stats()
+        shares = ", ".join(f"{s['name']}={format_rate(s['rate'])}" for s in stats["shares"])
+        done = stats["total_bytes"] - start_bytes
+        eta = max(0, plan["bytes"] - done) / stats["rate"] if stats["rate"] else None
+        print(f"[install] {format_size(done)}/{format_size(plan['bytes'])} ETA {format_eta(eta)} "
+              f"{format_rate(stats['rate'])} (limit {format_rate(stats['limit'])}) "
+              f"connections={stats['active_connections']} queued={download_scheduler.pending()} {shares}")
+        time.sleep(args.progress_interval)
+    for _, thread in threads:
+        thread.join()
+    for spec in args.versions:
+        version_id = spec.partition(":")[0]
+        print(f"{version_id}: {'FAILED - ' + str(errors[version_id]) if version_id in errors else 'installed'}")
+    return 1 if errors else 0
+
+def _cli_plan(args):
+    load_version_manifest(args.ssl_verify)
+    plans = []
+    for version_id in args.versions:
+        try:
+            plans.append(plan_install(version_id, args.ssl_verify))
+        except Exception as e:
+            print(f"{version_id}: cannot plan - {e}", file=sys.stderr)
+    if not plans:
+        return 1
+    status = 0 if len(plans) == len(args.versions) else 1
+    combined = combine_plans(plans) if len(plans) > 1 else plans[0]
+    if args.json:
+        print(json.dumps(combined if args.items else {k: v for k, v in combined.items() if k != "items"}, indent=4))
+        return status
+    rate = args.rate * 1024 if args.rate else bandwidth.limit
+    for plan in plans:
+        print(format_plan(plan, rate))
+    if len(plans) > 1:
+        print(f"Combined (shared files counted once): {combined['files']} files, {format_size(combined['bytes'])}"
+              + (f", about {format_eta(combined['bytes'] / rate)}" if rate else ""))
+    if args.items:
+        for item in combined["items"]:
+            size = format_size(item["size"]) if item["size"] is not None else "?"
+            print(f"{item['kind']:<8} {size:>9}  {item['path']}")
+    return status
+
+def _cli_export(args):
+    output = sys.stdout.buffer if args.output == "-" else args.output
+    result = export_version_bundle(args.version, output, status_callback=lambda m: print(m, file=sys.stderr))
+    print(f"Exported {result['files']} files ({result['bytes'] / (1024 * 1024):.1f} MB)", file=sys.stderr)
+    return 0
+
+def _cli_import(args):
+    source = sys.stdin.buffer if args.archive == "-" else args.archive
+    stats = import_version_bundle(source, finalize=not args.no_finalize, status_callback=print)
+    print(f"{stats['version_id']}: {stats['written']} files written ({stats['bytes'] / (1024 * 1024):.1f} MB), "
+          f"{stats['skipped']} already present")
+    return 0
+
+def _cli_servers(args):
+    if args.addresses:
+        servers = []
+        for address in args.addresses:
+            try:
+                host, port = parse_server_address(address)
+            except ValueError as e:
+                print(f"CatClient servers: error: {address}: {e}", file=sys.stderr)
+                return 2
+            servers.append({"name": address, "address": host, "port": port})
+    else:
+        servers = load_servers()
+    if not servers:
+        print("No servers given and none saved.", file=sys.stderr)
+        return 1
+    results = ping_servers(servers, args.timeout)
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return 0 if any(r["online"] for r in results) else 1
+    for rank, r in enumerate(results, 1):
+        if r["online"]:
+            print(f"{rank:>2}. {r['name']:<24} {r['latency_ms']:>7.1f} ms  {r['players_online']}/{r['players_max']}  "
+                  f"{r['version']} (protocol {r['protocol']})  {r['motd'].splitlines()[0] if r['motd'] else ''}")
+        else:
+            print(f"{rank:>2}. {r['name']:<24} offline     {r['error']}")
+    return 0 if any(r["online"] for r in results) else 1
+
+def _cli_metrics(args):
+    summary = summarize_launch_metrics(args.version)
+    if args.json:
+        print(json.dumps(summary, indent=4))
+        return 0
+    if not summary:
+        print("No launches recorded yet.")
+    def seconds(value):
+        return f"{value:.2f}s" if value is not None else "-"
+    for entry in summary:
+        line = (f"{entry['version_id']:<16} {entry['jvm_profile'] or '-':<12} flags={entry['flags_hash']} "
+                f"prefetch={'on ' if entry['prefetch'] else 'off'} launches={entry['launches']} crashes={entry['crashes']} "
+                f"window={seconds(entry['median_time_to_window_s'])} menu={seconds(entry['median_time_to_main_menu_s'])}")
+        if entry["prefetch"]:
+            line += f" saved={seconds(entry['prefetch_saved_time_to_main_menu_s'])}"
+        print(line)
+    return 0
+
+def _cli_catalog(args):
+    catalog = current_launcher().catalog
+    if args.action == "stats":
+        print(json.dumps(catalog.stats(), indent=4))
+    elif args.action == "missing":
+        missing = catalog.missing(args.target)
+        for kind, info in sorted(missing.items()):
+            print(f"{kind:<8} {info['files']:>6} files  {info['bytes'] / (1024 * 1024):>8.1f} MB")
+        if not missing:
+            print(f"Nothing missing for {args.target}")
+    elif args.action == "uses":
+        print("\n".join(catalog.versions_using(args.target)) or f"No installed version uses {args.target}")
+    elif args.action == "verify":
+        counts = catalog.verify(args.target, status_callback=print)
+        print(", ".join(f"{state}: {count}" for state, count in sorted(counts.items())) or "No files recorded")
+        return 1 if counts.get("missing") else 0
+    return 0
+
+def run_cli(argv):
+    """Headless commands for scripts and servers without a display."""
+    parser = argparse.ArgumentParser(prog="CatClient", description="Headless launcher commands")
+    parser.add_argument("--ssl-verify", action="store_true", help="Verify SSL certificates")
+    parser.add_argument("--root", help=f"Launcher directory (default: {MINECRAFT_DIR_ENV} or the platform's .minecraft)")
+    parser.add_argument("--bandwidth-limit", type=int, default=0, help="Total download limit in KB/s (0 = unlimited)")
+    parser.add_argument("--max-per-host", type=int, default=MAX_CONNECTIONS_PER_HOST, help="Concurrent connections per host")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    install = subparsers.add_parser("install", help="Install versions concurrently, sharing bandwidth by weight")
+    install.add_argument("versions", nargs="+", metavar="VERSION[:WEIGHT]")
+    install.add_argument("--progress-interval", type=float, default=2.0)
+    install.set_defaults(func=_cli_install)
+
+    plan = subparsers.add_parser("plan", help="Show what installing versions would download, without downloading")
+    plan.add_argument("versions", nargs="+", metavar="VERSION")
+    plan.add_argument("--items", action="store_true", help="List every file, not just totals")
+    plan.add_argument("--rate", type=int, default=0, help="Throughput in KB/s for the time estimate "
+                                                         "(default: --bandwidth-limit)")
+    plan.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    plan.set_defaults(func=_cli_plan)
+
+    export = subparsers.add_parser("export", help="Write an installed version's full closure to a bundle")
+    export.add_argument("version")
+    export.add_argument("output", help="Bundle path (.tar.gz or .tar.xz) or - for stdout")
+    export.set_defaults(func=_cli_export)
+
+    imp = subparsers.add_parser("import", help="Install a version from a bundle without network access")
+    imp.add_argument("archive", help="Bundle path or - for stdin")
+    imp.add_argument("--no-finalize", action="store_true", help="Only unpack files, skip natives extraction")
+    imp.set_defaults(func=_cli_import)
+
+    cat = subparsers.add_parser("catalog", help="Query or verify the launcher catalog")
+    cat.add_argument("action", choices=["stats", "missing", "uses", "verify"])
+    cat.add_argument("target", nargs="?", help="Version id (missing, verify) or library group:artifact[:version] (uses)")
+    cat.set_defaults(func=_cli_catalog)
+
+    met = subparsers.add_parser("metrics", help="Median startup times, with and without prefetch")
+    met.add_argument("version", nargs="?")
+    met.add_argument("--json", action="store_true", help="Print the raw summary")
+    met.set_defaults(func=_cli_metrics)
+
+    srv = subparsers.add_parser("servers", help="Ping servers concurrently and rank them by latency")
+    srv.add_argument("addresses", nargs="*", metavar="HOST[:PORT]", help="Defaults to the saved server list")
+    srv.add_argument("--timeout", type=float, default=SERVER_PING_TIMEOUT)
+    srv.add_argument("--json", action="store_true", help="Print the raw ping results")
+    srv.set_defaults(func=_cli_servers)
+
+    inst = subparsers.add_parser("instances", help="Launch many offline clients concurrently (load testing)")
+    inst.add_argument("version")
+    inst.add_argument("--count", type=int, default=1)
+    inst.add_argument("--java", default=shutil.which("java") or "java")
+    inst.add_argument("--ram", type=int, help="Max heap per instance in MB (default: sized by the JVM profile)")
+    inst.add_argument("--prefix", default="client", help="Instance directory and player name prefix")
+    inst.add_argument("--template", help="Game directory whose mods/config/resourcepacks are shared")
+    inst.add_argument("--low-footprint", action="store_true", help="Minimal render distance, FPS and sound")
+    inst.add_argument("--cpus-per-instance", type=int, help="Pin each instance to this many CPUs")
+    inst.add_argument("--nice", type=int, help="Niceness increment for each instance")
+    inst.add_argument("--server")
+    inst.add_argument("--port", type=int)
+    inst.add_argument("--profile", choices=list(JVM_TUNING_PROFILES), default="low-memory")
+    inst.add_argument("--gc", choices=list(GC_FLAGS), help="Garbage collector (default: the profile's)")
+    inst.add_argument("--stagger", type=float, default=0.0, help="Seconds between instance starts")
+    inst.add_argument("--summary-interval", type=float, default=10.0)
+    inst.add_argument("--no-prefetch", action="store_true", help="Don't warm the page cache before starting")
+    inst.set_defaults(func=_cli_instances)
+
+    args = parser.parse_args(argv)
+    if args.command == "catalog" and args.action != "stats" and not args.target:
+        parser.error(f"catalog {args.action} needs a target")
+    bandwidth.set_limit(args.bandwidth_limit * 1024)
+    bandwidth.set_max_per_host(args.max_per_host)
+    with (Launcher(args.root) if args.root else default_launcher()).active():
+        return args.func(args)
+
 # --- Main Execution ---
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     try:
         root = tk.Tk()
         app = M1LauncherApp(root)
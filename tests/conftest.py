@@ -0,0 +1,23 @@
+"""Shared fixtures: the launcher module (its file name isn't importable) and a throwaway launcher root."""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CatClient1.0a.py")
+
+
+@pytest.fixture(scope="session")
+def catclient():
+    spec = importlib.util.spec_from_file_location("catclient", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["catclient"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def launcher(catclient, tmp_path):
+    with catclient.Launcher(str(tmp_path / "minecraft")).active() as launcher:
+        yield launcher
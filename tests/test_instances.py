@@ -0,0 +1,105 @@
+"""Multi-instance launching against a stub java executable."""
+import json
+import os
+import stat
+import uuid
+
+import pytest
+
+VERSION_ID = "1.20.4"
+LIBRARY_PATH = os.path.join("com", "example", "lib", "1.0", "lib-1.0.jar")
+
+# Answers -version like a JDK, then "runs" until the test creates $STUB_RELEASE
+STUB_JAVA = """#!/bin/sh
+if [ "$1" = "-version" ]; then echo 'openjdk version "17.0.2" 2022-01-18' >&2; exit 0; fi
+echo "[Render thread/INFO]: Backend library: LWJGL version 3.3.1"
+while [ ! -e "$STUB_RELEASE" ]; do sleep 0.05; done
+exit 0
+"""
+
+
+def make_version(launcher):
+    version_dir = os.path.join(launcher.versions_dir, VERSION_ID)
+    os.makedirs(version_dir)
+    with open(os.path.join(version_dir, f"{VERSION_ID}.json"), "w") as f:
+        json.dump({
+            "id": VERSION_ID, "type": "release", "mainClass": "net.minecraft.client.main.Main",
+            "assetIndex": {"id": "12"},
+            "arguments": {"jvm": [], "game": ["--username", "${auth_player_name}", "--uuid", "${auth_uuid}",
+                                              "--gameDir", "${game_directory}", "--assetsDir", "${assets_root}"]},
+            "libraries": [{"name": "com.example:lib:1.0", "downloads": {"artifact": {"path": LIBRARY_PATH}}}],
+        }, f)
+    with open(os.path.join(version_dir, f"{VERSION_ID}.jar"), "wb") as f:
+        f.write(b"jar")
+    os.makedirs(os.path.dirname(os.path.join(launcher.libraries_dir, LIBRARY_PATH)))
+    with open(os.path.join(launcher.libraries_dir, LIBRARY_PATH), "wb") as f:
+        f.write(b"lib")
+
+
+def arg(command, name):
+    return command[command.index(name) + 1]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stub java is a shell script")
+def test_launch_instances_with_stub_java(catclient, launcher, tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    java = bin_dir / "java"
+    java.write_text(STUB_JAVA)
+    java.chmod(java.stat().st_mode | stat.S_IXUSR)
+    release = tmp_path / "release"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_RELEASE", str(release))
+
+    make_version(launcher)
+    template = tmp_path / "template"
+    (template / "mods").mkdir(parents=True)
+    (template / "config").mkdir()
+    (template / "config" / "mod.toml").write_text("enabled = true\n")
+
+    pin = hasattr(os, "sched_getaffinity")
+    cpus = sorted(os.sched_getaffinity(0)) if pin else []
+    base_nice = os.getpriority(os.PRIO_PROCESS, 0)
+    supervisors = catclient.launch_instances(VERSION_ID, 3, template_dir=str(template),
+                                             cpus_per_instance=1 if pin else None, niceness=5)
+    try:
+        summary = catclient.summarize_instances(supervisors)
+        assert summary["instances"] == 3
+        assert summary["running"] == 3
+        if os.path.isdir("/proc"):
+            assert summary["threads"] >= 3
+            assert summary["rss_mb"] > 0
+
+        game_dirs = set()
+        for i, supervisor in enumerate(supervisors, 1):
+            name = f"client{i}"
+            command = supervisor.command
+            game_dir = arg(command, "--gameDir")
+            game_dirs.add(game_dir)
+            assert game_dir == os.path.join(launcher.instances_dir, name)
+            assert os.path.islink(os.path.join(game_dir, "mods"))
+            assert not os.path.islink(os.path.join(game_dir, "config"))
+            assert (template / "config" / "mod.toml").read_text() == \
+                open(os.path.join(game_dir, "config", "mod.toml")).read()
+
+            # Assets and libraries come from the shared launcher root
+            assert arg(command, "--assetsDir") == os.path.abspath(launcher.assets_dir)
+            assert os.path.join(launcher.libraries_dir, LIBRARY_PATH) in [
+                os.path.abspath(path) for path in arg(command, "-cp").split(os.pathsep)]
+
+            assert arg(command, "--username") == name
+            assert arg(command, "--uuid") == str(uuid.uuid3(uuid.NAMESPACE_DNS, name))
+
+            if pin:
+                assert os.sched_getaffinity(supervisor.pid) == {cpus[(i - 1) % len(cpus)]}
+            assert os.getpriority(os.PRIO_PROCESS, supervisor.pid) == min(19, base_nice + 5)
+        assert len(game_dirs) == 3
+    finally:
+        release.touch()
+        for supervisor in supervisors:
+            supervisor.wait(30)
+
+    summary = catclient.summarize_instances(supervisors)
+    assert summary["running"] == 0
+    assert summary["exited"] == 3
+    assert summary["crashed"] == 0
@@ -0,0 +1,166 @@
+"""Server List Ping against stub servers on localhost."""
+import asyncio
+import json
+import socket
+import struct
+import threading
+
+import pytest
+
+
+class StubServer:
+    """Answers the status handshake with a fixed status JSON and echoes pings, after delay seconds."""
+
+    def __init__(self, catclient, status, delay=0.0):
+        self.catclient = catclient
+        self.status = status
+        self.delay = delay
+        self.handshakes = []
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(started,), daemon=True)
+        self.thread.start()
+        started.wait(5)
+
+    def _run(self, started):
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        started.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        cc = self.catclient
+        try:
+            _, handshake = await cc._read_packet(reader)
+            protocol, offset = cc._unpack_varint(handshake)
+            length, offset = cc._unpack_varint(handshake, offset)
+            host = handshake[offset:offset + length].decode("utf-8")
+            port, = struct.unpack(">H", handshake[offset + length:offset + length + 2])
+            next_state, _ = cc._unpack_varint(handshake, offset + length + 2)
+            self.handshakes.append((protocol, host, port, next_state))
+            await cc._read_packet(reader)  # Status request
+            await asyncio.sleep(self.delay)
+            writer.write(cc._pack_packet(0x00, cc._pack_string(json.dumps(self.status))))
+            packet_id, payload = await cc._read_packet(reader)
+            await asyncio.sleep(self.delay)
+            writer.write(cc._pack_packet(packet_id, payload))
+            await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        async def shutdown():
+            self.server.close()
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+
+def status_json(motd, online, protocol=765):
+    return {"version": {"name": "1.20.4", "protocol": protocol},
+            "players": {"online": online, "max": 20, "sample": []},
+            "description": {"text": "§a" + motd, "extra": [{"text": " server"}]}}
+
+
+@pytest.fixture
+def stub_server(catclient):
+    servers = []
+
+    def start(status, delay=0.0):
+        servers.append(StubServer(catclient, status, delay))
+        return servers[-1]
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def silent_port():
+    """A listening socket that accepts connections but never answers"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+@pytest.fixture
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return port
+
+
+def test_ping_online_server(catclient, stub_server):
+    server = stub_server(status_json("Fast", 3))
+    result = asyncio.run(catclient.ping_server_async("127.0.0.1", server.port, timeout=5))
+    assert result["online"] and result["error"] is None
+    assert result["motd"] == "Fast server"
+    assert (result["players_online"], result["players_max"]) == (3, 20)
+    assert (result["version"], result["protocol"]) == ("1.20.4", 765)
+    assert result["latency_ms"] is not None and result["latency_ms"] >= 0
+    assert server.handshakes == [(catclient.SLP_PROTOCOL_VERSION & 0xFFFFFFFF, "127.0.0.1", server.port, 1)]
+
+
+def test_ping_servers_ranks_by_latency(catclient, stub_server, silent_port, closed_port):
+    fast = stub_server(status_json("Fast", 1))
+    slow = stub_server(status_json("Slow", 2), delay=0.2)
+    servers = [
+        {"name": "closed", "address": "127.0.0.1", "port": closed_port},
+        {"name": "slow", "address": "127.0.0.1", "port": slow.port},
+        {"name": "silent", "address": "127.0.0.1", "port": silent_port},
+        {"name": "fast", "address": "127.0.0.1", "port": fast.port},
+    ]
+    ranked = catclient.ping_servers(servers, timeout=1.0)
+    assert [r["name"] for r in ranked[:2]] == ["fast", "slow"]
+    assert ranked[0]["latency_ms"] < ranked[1]["latency_ms"]
+    offline = {r["name"]: r for r in ranked[2:]}
+    assert set(offline) == {"closed", "silent"}
+    assert not any(r["online"] for r in offline.values())
+    assert offline["silent"]["error"] == "timed out after 1s"
+    assert offline["closed"]["error"]
+    assert catclient.fastest_server(servers, timeout=1.0)["port"] == fast.port
+
+
+def test_ping_bad_inputs_are_reported_offline(catclient, closed_port):
+    ranked = catclient.ping_servers([{"name": "bad port", "address": "127.0.0.1", "port": "abc"},
+                                     {"name": "no address", "address": None, "port": closed_port}], timeout=1.0)
+    by_name = {r["name"]: r for r in ranked}
+    assert not by_name["bad port"]["online"] and "abc" in by_name["bad port"]["error"]
+    assert not by_name["no address"]["online"] and by_name["no address"]["error"]
+    result = asyncio.run(catclient.ping_server_async("127.0.0.1", 70000, timeout=1.0))
+    assert not result["online"] and "65535" in result["error"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("play.example.com", ("play.example.com", 25565)),
+    ("play.example.com:25570", ("play.example.com", 25570)),
+    ("play.example.com:", ("play.example.com", 25565)),
+    ("  10.0.0.5:1 ", ("10.0.0.5", 1)),
+    ("[::1]:25566", ("::1", 25566)),
+    ("[::1]", ("::1", 25565)),
+    ("[2001:db8::1]:", ("2001:db8::1", 25565)),
+    ("::1", ("::1", 25565)),
+])
+def test_parse_server_address(catclient, text, expected):
+    assert catclient.parse_server_address(text) == expected
+
+
+@pytest.mark.parametrize("text", ["host:abc", "host:0", "host:65536", "[::1]:x"])
+def test_parse_server_address_rejects_bad_ports(catclient, text):
+    with pytest.raises(ValueError):
+        catclient.parse_server_address(text)
+
+
+def test_load_servers_skips_bad_entries(catclient, launcher):
+    with open(launcher.servers_file, "w") as f:
+        json.dump([{"name": "ok", "address": "a.example", "port": "25570"},
+                   {"name": "default", "address": "b.example"},
+                   {"name": "bad", "address": "c.example", "port": "abc"},
+                   {"name": "no address", "port": 25565}], f)
+    assert [(s["name"], s["port"]) for s in catclient.load_servers()] == [("ok", 25570), ("default", 25565)]